@@ -0,0 +1,110 @@
+"""
+This file labels batches of configurations, i.e., (B, N, 2) arrays of the locations of the robots of B networks of N robots,
+with their cycle topologies. Labeling the networks one by one costs the Python overhead of building each robot and its sets,
+which dominates the small networks the datasets are made of. Here the distances, the reliable and critical masks, and the
+sorted order of the robots of a whole block of configurations are computed by broadcasting, so each network is only built from
+its masks, already sorted, and only the topology synthesis itself runs per configuration.
+
+The configurations may come from anywhere, e.g., the logs of real robots: the i-th robot of a configuration is given the id
+i + 1, which is also the id the i-th robot drawn by create_robot_network() gets. The topologies are the same as those of
+generate_configuration(), i.e., of synthesize_cycle_topology_for_robot_network() over the sorted network. The functions take
+the context of the data generator (see GenerationContext) whose hyper-parameters they label or draw the configurations with;
+without one, the labeling runs under a new context of the current hyper-parameters of the data generator, so it neither reads
+nor changes the module state while it runs.
+"""
+
+import numpy as np
+
+import OpTopNET_DataGenerator as data_generator
+
+
+"""
+This function computes the reliable and critical masks of a batch of configurations, i.e., two (B, N, N) boolean arrays whose
+[b, i, j] entries tell whether the robots i and j of the b-th configuration are reliable and critical peers. The distances are
+computed the same way as compute_distances() does, so the masks are identical to those of the networks labeled one by one.
+"""
+def compute_reliable_and_critical_masks(locations, context = None):
+    differences = locations[:, :, np.newaxis, :] - locations[:, np.newaxis, :, :]
+    reliable_mask, critical_mask = data_generator.classify_distances(
+        np.sqrt(differences[..., 0] ** 2 + differences[..., 1] ** 2), context)
+    # a robot is not a peer of itself
+    diagonal = np.arange(locations.shape[1])
+    reliable_mask[:, diagonal, diagonal] = False
+    critical_mask[:, diagonal, diagonal] = False
+    return reliable_mask, critical_mask
+
+
+"""
+This function returns the orders of the robots of a batch of configurations, given their masks, which sort_robot_network()
+sorts their networks in, i.e., a (B, N) array of the indices of the robots in the descending order of the cardinalities of
+their reliable sets and then of those of their critical sets, keeping the order of their ids among equal cardinalities.
+"""
+def compute_sorted_orders(reliable_mask, critical_mask):
+    number_of_robots_in_network = reliable_mask.shape[1]
+    keys = reliable_mask.sum(axis=2) * (number_of_robots_in_network + 1) + critical_mask.sum(axis=2)
+    return np.argsort(-keys, axis=1, kind="stable")
+
+
+"""
+This function builds the sorted network of a configuration from its masks and its sorted order.
+"""
+def build_sorted_robot_network(locations, reliable_mask, critical_mask, order, context = None):
+    context = data_generator.create_context(context)
+    robot_ids = np.arange(1, len(locations) + 1)
+    sorted_robot_network = []
+    for index in order.tolist():
+        robot = data_generator.Robot(locations[index], robot_ids[reliable_mask[index]].tolist(),
+                                     robot_ids[critical_mask[index]].tolist(), context = context)
+        robot.id = index + 1
+        sorted_robot_network.append(robot)
+    return sorted_robot_network
+
+
+"""
+This function labels a batch of configurations, given as a (B, N, 2) array (or a nested list) of their locations, and returns
+two (B, N) integer arrays: the backbone cycles, padded with zeros after the last robot of each cycle, and the cluster vectors,
+whose i-th entry is the cluster of the robot whose id is i + 1, the same as extract_cycle_clusters() gives for a network all of
+whose robots have peers. (An orphan robot without any peer does not have any cluster, and its entry is 0.) The configurations
+which do not have any topology, i.e., any backbone cycle or any cluster of one of their orphan robots, have zero rows in both
+arrays. The masks are computed for batch_size configurations at a time to bound the memory of the (batch_size, N, N) arrays.
+"""
+def label_configurations(locations, time_budget = None, node_budget = None, batch_size = 256, context = None):
+    context = data_generator.create_context(context)
+    locations = np.asarray(locations, dtype=float)
+    if locations.ndim != 3 or locations.shape[2] != 2:
+        raise ValueError("the configurations must be a (B, N, 2) array of locations, got an array of shape {}".format(
+            locations.shape))
+    number_of_configurations, number_of_robots_in_network = locations.shape[:2]
+    backbone_cycles = np.zeros((number_of_configurations, number_of_robots_in_network), dtype=np.int64)
+    clusters = np.zeros((number_of_configurations, number_of_robots_in_network), dtype=np.int64)
+    for first_configuration in range(0, number_of_configurations, batch_size):
+        block = locations[first_configuration:first_configuration + batch_size]
+        reliable_masks, critical_masks = compute_reliable_and_critical_masks(block, context)
+        orders = compute_sorted_orders(reliable_masks, critical_masks)
+        for offset in range(len(block)):
+            sorted_robot_network = build_sorted_robot_network(
+                block[offset].tolist(), reliable_masks[offset], critical_masks[offset], orders[offset], context)
+            try:
+                cycle_topology = data_generator.synthesize_cycle_topology_for_robot_network(
+                    sorted_robot_network, time_budget, node_budget, context = context)
+            except data_generator.no_cycle_topology_errors:
+                continue
+            index = first_configuration + offset
+            backbone_cycles[index, :len(cycle_topology.backbone_cycle)] = cycle_topology.backbone_cycle
+            for id, cluster_id in cycle_topology.clusters:
+                clusters[index, id - 1] = cluster_id
+    return backbone_cycles, clusters
+
+
+"""
+This function draws a batch of configurations by create_robot_network(), i.e., with the hyper-parameters of the data generator
+(of the given context), and returns their locations as a (B, N, 2) array, each in the order of the ids of its robots.
+"""
+def sample_configurations(number_of_configurations, sampling_method = "rejection", context = None):
+    context = data_generator.get_context(context)
+    locations = np.zeros((number_of_configurations, context.number_of_robots, 2))
+    for index in range(number_of_configurations):
+        context.reset_robot_ids()
+        robot_network = data_generator.create_robot_network(sampling_method, context)
+        locations[index] = [robot.location for robot in robot_network]
+    return locations
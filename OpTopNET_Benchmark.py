@@ -0,0 +1,328 @@
+"""
+This file benchmarks the stages of the topology pipeline of the data generator, i.e., create_robot_network,
+set_reliable_and_critical_sets (of the robot network), generate_backbone_cycle_links, find_the_backbone_cycle_of_robot_network
+and synthesize_cycle_topology_for_robot_network, over a sweep of number_of_robots and scale_factor. The configurations of each
+point of the sweep are seeded from benchmark_seed, so every run times the same networks. Besides the time of each stage, the
+throughput of the whole pipeline in configurations per second and its peak memory (traced by tracemalloc in a separate pass,
+so the tracing does not slow down the timed one) are reported.
+
+The results may be saved as a json baseline, and a later run may be compared with it: a stage (or the whole pipeline) of a point
+of the sweep is flagged as a regression if it gets slower than the baseline by more than the tolerance. To keep the noise of
+the timer and of the machine out of the comparison, each configuration is timed number_of_repeats times and the fastest time
+of each stage is kept, and the stages are compared by their median times.
+"""
+
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+import OpTopNET_DataGenerator as data_generator
+from OpTopNET_CycleFinder import (NoCycleError, find_the_backbone_cycle_of_robot_network,
+                                  find_the_backbone_cycle_within_budget)
+
+"""
+Hyper-parameters
+
+numbers_of_robots:        the values of number_of_robots swept by the benchmark
+scale_factors:            the values of scale_factor swept by the benchmark
+number_of_configurations: the number of the configurations timed at each point of the sweep
+number_of_repeats:        the number of the times each configuration is timed (the fastest time of each stage is kept)
+number_of_traced_configurations: the number of the configurations (the first ones) whose peak memory is traced at each point
+                          of the sweep (tracemalloc slows the pipeline down by an order of magnitude)
+benchmark_seed:           the seed from which the seeds of the configurations are spawned
+time_budget:              the wall-clock budget (in seconds) of each backbone cycle search (None: unbounded, i.e., exact)
+node_budget:              the node-expansion budget of each backbone cycle search (None: unbounded, i.e., exact)
+baseline_file_name:       the json baseline which the results are compared with (None: no comparison)
+save_baseline:            whether the results are saved as the baseline (into baseline_file_name)
+tolerance:                the relative slowdown beyond which a stage is flagged as a regression
+"""
+numbers_of_robots = [10, 15, 20]
+scale_factors = [0.1, 0.2]
+number_of_configurations = 10
+number_of_repeats = 3
+number_of_traced_configurations = 3
+benchmark_seed = 2023
+time_budget = None
+node_budget = None
+baseline_file_name = None
+save_baseline = False
+tolerance = 0.2
+
+#The stages of the pipeline, in the order they run.
+stage_names = ["create_robot_network", "set_reliable_and_critical_sets", "generate_backbone_cycle_links",
+               "find_the_backbone_cycle_of_robot_network", "synthesize_cycle_topology_for_robot_network"]
+
+#The short names of the stages in the printed tables.
+stage_labels = {"create_robot_network": "create", "set_reliable_and_critical_sets": "sets",
+                "generate_backbone_cycle_links": "links", "find_the_backbone_cycle_of_robot_network": "backbone",
+                "synthesize_cycle_topology_for_robot_network": "synthesize"}
+
+#The stages which make up a configuration of the dataset (the links and the backbone cycle are also computed by the synthesis,
+#so they are timed separately but are not counted twice in the throughput).
+pipeline_stage_names = ["create_robot_network", "set_reliable_and_critical_sets",
+                        "synthesize_cycle_topology_for_robot_network"]
+
+#Changes of less than this many seconds per configuration are considered as noise and never flagged.
+minimum_flagged_slowdown = 1e-4
+
+
+"""
+This function seeds the context of a point of the sweep for the configuration of the given index, so each configuration only
+depends on benchmark_seed, the point and its index.
+"""
+def seed_configuration(seed, point_index, configuration_index, context):
+    context.seed(np.random.SeedSequence(seed, spawn_key=(point_index, configuration_index)).generate_state(4))
+    context.reset_robot_ids()
+
+
+"""
+This function runs the stages of the pipeline on a configuration and returns the time (in seconds) of each of them. The times
+of the stages following a failed one (e.g., the backbone cycle search of an acyclic network, or the topology synthesis of a
+network one of whose orphan robots does not get any cluster) are None. The configuration is drawn from the given context.
+"""
+def time_the_stages_of_configuration(time_budget = None, node_budget = None, context = None):
+    context = data_generator.get_context(context)
+    stage_times = dict.fromkeys(stage_names)
+
+    start_time = time.perf_counter()
+    robot_network = data_generator.create_robot_network(context.sampling_method, context)
+    stage_times["create_robot_network"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    data_generator.set_reliable_and_critical_sets_of_robot_network(robot_network, context=context)
+    sorted_robot_network = data_generator.sort_robot_network(robot_network)
+    stage_times["set_reliable_and_critical_sets"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    backbone_cycle_links = data_generator.generate_backbone_cycle_links(sorted_robot_network)
+    stage_times["generate_backbone_cycle_links"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    try:
+        if time_budget is None and node_budget is None:
+            find_the_backbone_cycle_of_robot_network(backbone_cycle_links)
+        elif not find_the_backbone_cycle_within_budget(backbone_cycle_links, time_budget, node_budget).best_cycle:
+            return stage_times
+    except NoCycleError:
+        return stage_times
+    stage_times["find_the_backbone_cycle_of_robot_network"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    try:
+        data_generator.synthesize_cycle_topology_for_robot_network(sorted_robot_network, time_budget, node_budget,
+                                                                  context=context)
+    except data_generator.no_cycle_topology_errors:
+        return stage_times
+    stage_times["synthesize_cycle_topology_for_robot_network"] = time.perf_counter() - start_time
+    return stage_times
+
+
+"""
+This function measures the peak memory (in bytes) traced while running the whole pipeline on a configuration.
+"""
+def measure_the_peak_memory_of_configuration(time_budget = None, node_budget = None, context = None):
+    tracemalloc.start()
+    try:
+        time_the_stages_of_configuration(time_budget, node_budget, context)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+"""
+This function summarizes the times of a stage over the configurations of a point of the sweep.
+"""
+def summarize_stage_times(times):
+    times = [t for t in times if t is not None]
+    if not times:
+        return {"number_of_runs": 0, "total": 0.0, "mean": None, "median": None, "minimum": None}
+    return {"number_of_runs": len(times), "total": sum(times), "mean": sum(times) / len(times),
+            "median": float(np.median(times)), "minimum": min(times)}
+
+
+"""
+This function benchmarks a point of the sweep, i.e., a number of robots and a scale factor, over number_of_configurations
+seeded configurations, each of which is timed number_of_repeats times, and returns its results. The peak memory is the largest
+one traced over the first number_of_traced_configurations configurations. The configurations are drawn from a context of the
+point, i.e., of the hyper-parameters of the given context (those of the data generator by default) updated by the point.
+"""
+def benchmark_point(point_index, number_of_robots, scale_factor, number_of_configurations, seed, number_of_repeats = 1,
+                    number_of_traced_configurations = 1, time_budget = None, node_budget = None, context = None):
+    hyper_parameters = data_generator.get_context(context).get_hyper_parameters()
+    hyper_parameters.update(number_of_robots=number_of_robots, scale_factor=scale_factor)
+    context = data_generator.GenerationContext(hyper_parameters)
+    stage_times = {name: [] for name in stage_names}
+    number_of_acyclic_configurations = 0
+    number_of_configurations_with_unassigned_orphan_robots = 0
+    for configuration_index in range(number_of_configurations):
+        configuration_stage_times = None
+        for _ in range(number_of_repeats):
+            seed_configuration(seed, point_index, configuration_index, context)
+            repeat_stage_times = time_the_stages_of_configuration(time_budget, node_budget, context)
+            if configuration_stage_times is None:
+                configuration_stage_times = repeat_stage_times
+            else:
+                # the repeats run the same configuration, so the same stages fail in all of them
+                configuration_stage_times = {name: None if t is None else min(t, repeat_stage_times[name])
+                                             for name, t in configuration_stage_times.items()}
+        if configuration_stage_times["find_the_backbone_cycle_of_robot_network"] is None:
+            number_of_acyclic_configurations += 1
+        elif configuration_stage_times["synthesize_cycle_topology_for_robot_network"] is None:
+            number_of_configurations_with_unassigned_orphan_robots += 1
+        for name in stage_names:
+            stage_times[name].append(configuration_stage_times[name])
+
+    peak_memory = 0
+    for configuration_index in range(min(number_of_traced_configurations, number_of_configurations)):
+        seed_configuration(seed, point_index, configuration_index, context)
+        peak_memory = max(peak_memory, measure_the_peak_memory_of_configuration(time_budget, node_budget, context))
+
+    # only the configurations which went through the whole pipeline count in the throughput
+    pipeline_times = [sum(times) for times in zip(*(stage_times[name] for name in pipeline_stage_names))
+                      if None not in times]
+    stages = {name: summarize_stage_times(stage_times[name]) for name in stage_names}
+    stages["pipeline"] = summarize_stage_times(pipeline_times)
+    return {"number_of_robots": number_of_robots, "scale_factor": scale_factor,
+            "number_of_configurations": number_of_configurations,
+            "number_of_acyclic_configurations": number_of_acyclic_configurations,
+            "number_of_configurations_with_unassigned_orphan_robots":
+                number_of_configurations_with_unassigned_orphan_robots,
+            "stages": stages,
+            "configurations_per_second": len(pipeline_times) / sum(pipeline_times) if pipeline_times else None,
+            "peak_memory": peak_memory}
+
+
+"""
+This function runs the benchmark over the sweep of numbers_of_robots and scale_factors and returns its results, together with
+its settings and the environment it ran in. The other hyper-parameters of the data generator are those of the given context
+(those of the data generator by default), which is left unchanged.
+"""
+def run_benchmark(numbers_of_robots = numbers_of_robots, scale_factors = scale_factors,
+                  number_of_configurations = number_of_configurations, number_of_repeats = number_of_repeats,
+                  number_of_traced_configurations = number_of_traced_configurations, seed = benchmark_seed,
+                  time_budget = time_budget, node_budget = node_budget, context = None):
+    hyper_parameters = data_generator.get_context(context).get_hyper_parameters()
+    points = [benchmark_point(point_index, number_of_robots, scale_factor, number_of_configurations, seed,
+                              number_of_repeats, number_of_traced_configurations, time_budget, node_budget, context)
+              for point_index, (number_of_robots, scale_factor) in enumerate(
+                  itertools.product(numbers_of_robots, scale_factors))]
+    return {"created": datetime.now().isoformat(timespec="seconds"),
+            "settings": {"numbers_of_robots": list(numbers_of_robots), "scale_factors": list(scale_factors),
+                         "number_of_configurations": number_of_configurations, "number_of_repeats": number_of_repeats,
+                         "number_of_traced_configurations": number_of_traced_configurations, "seed": seed,
+                         "time_budget": time_budget, "node_budget": node_budget,
+                         "sampling_method": hyper_parameters["sampling_method"]},
+            "environment": {"python": sys.version.split()[0], "numpy": np.__version__, "platform": platform.platform()},
+            "points": points}
+
+
+"""
+This function saves the results of a benchmark as a json baseline.
+"""
+def save_benchmark_baseline(results, file_name):
+    with open(file_name, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+"""
+This function loads a json baseline.
+"""
+def load_benchmark_baseline(file_name):
+    with open(file_name) as f:
+        return json.load(f)
+
+
+"""
+This function compares the results of a benchmark with a baseline, point by point (the points missing from either of them
+are skipped), and returns the regressions, i.e., the stages (and the whole pipeline) whose median time per configuration got
+worse than the baseline by more than the tolerance. (The throughput is not compared, since a single slow configuration sways
+it.)
+"""
+def compare_with_baseline(results, baseline, tolerance = tolerance):
+    baseline_points = {(point["number_of_robots"], point["scale_factor"]): point for point in baseline["points"]}
+    regressions = []
+    for point in results["points"]:
+        baseline_point = baseline_points.get((point["number_of_robots"], point["scale_factor"]))
+        if baseline_point is None:
+            continue
+        for name in stage_names + ["pipeline"]:
+            median = point["stages"][name]["median"]
+            baseline_median = baseline_point["stages"].get(name, {}).get("median")
+            if median is None or baseline_median is None:
+                continue
+            if median > baseline_median * (1 + tolerance) and median - baseline_median > minimum_flagged_slowdown:
+                regressions.append({"number_of_robots": point["number_of_robots"], "scale_factor": point["scale_factor"],
+                                    "metric": name, "baseline": baseline_median, "current": median,
+                                    "ratio": median / baseline_median})
+    return regressions
+
+
+"""
+This function prints the results of a benchmark as a table of the mean time (in milliseconds) of each stage per configuration.
+"""
+def print_benchmark_results(results):
+    header = ["robots", "scale"] + [stage_labels[name] for name in stage_names] + ["configs/s", "peak MiB"]
+    print(" | ".join(header))
+    for point in results["points"]:
+        row = [str(point["number_of_robots"]), str(point["scale_factor"])]
+        for name in stage_names:
+            mean = point["stages"][name]["mean"]
+            row.append("-" if mean is None else "{:.3f}".format(1000 * mean))
+        throughput = point["configurations_per_second"]
+        row.append("-" if throughput is None else "{:.1f}".format(throughput))
+        row.append("{:.2f}".format(point["peak_memory"] / 2**20))
+        print(" | ".join(row))
+
+
+"""
+This function prints the regressions found by compare_with_baseline().
+"""
+def print_regressions(regressions, tolerance = tolerance):
+    if not regressions:
+        print("No regression beyond {:.0%} against the baseline.".format(tolerance))
+        return
+    for regression in regressions:
+        print("REGRESSION: {} with {} robots and scale factor {}: {:.6g} (baseline {:.6g}, {:.2f}x worse)".format(
+            regression["metric"], regression["number_of_robots"], regression["scale_factor"], regression["current"],
+            regression["baseline"], regression["ratio"]))
+
+"""
+This function runs the benchmark with the hyper-parameters of this file, prints its results, and compares them with the baseline
+or saves them as the baseline, if baseline_file_name is given. It returns the results and the regressions found.
+"""
+def benchmark_against_baseline():
+    results = run_benchmark(numbers_of_robots, scale_factors, number_of_configurations, number_of_repeats,
+                            number_of_traced_configurations, benchmark_seed, time_budget, node_budget)
+
+    print_benchmark_results(results)
+
+    regressions = []
+    if baseline_file_name is not None and not save_baseline:
+        regressions = compare_with_baseline(results, load_benchmark_baseline(baseline_file_name), tolerance)
+        print_regressions(regressions, tolerance)
+
+    if baseline_file_name is not None and save_baseline:
+        save_benchmark_baseline(results, baseline_file_name)
+        print("The baseline is saved into {}.".format(baseline_file_name))
+
+    return results, regressions
+
+###################################################################################################################
+###################################################################################################################
+###################################################################################################################
+
+"""
+Here is the main function of this benchmark. (The hyper-parameters may also be given on the command line, see
+OpTopNET_CommandLine.)
+"""
+if __name__ == "__main__":
+
+    results, regressions = benchmark_against_baseline()
+
+    sys.exit(1 if regressions else 0)
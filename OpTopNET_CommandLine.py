@@ -0,0 +1,230 @@
+"""
+This file is the command-line entry point of the data generator, the preprocessor and the benchmark, so their hyper-parameters
+do not have to be edited in their files:
+
+    python OpTopNET_CommandLine.py generate --number-of-robots 20 --number-of-configurations 100000 --number-of-workers 8
+    python OpTopNET_CommandLine.py preprocess --dataset-file-name dataset.csv --output-directory partitions
+    python OpTopNET_CommandLine.py benchmark --numbers-of-robots 10 20 --baseline-file-name baseline.json
+
+Each hyper-parameter of a command is an option named after it (see the "Hyper-parameters" of the files of the commands), and
+the hyper-parameters which are not given keep the values of their files. The hyper-parameters may also be given by a json config
+file (--config), an object whose entries are either hyper-parameters, which apply to every command having them, or the names of
+the commands, whose objects of hyper-parameters only apply to those commands and take precedence over the former entries. The
+options take precedence over the config file. An optional hyper-parameter may be set to None by the option value "none", or
+by null in the config file.
+
+Nothing but the standard library is imported before a command runs, and the command only imports the modules it uses, so the
+startup stays a small fraction of a short job, e.g., --help or a small benchmark. (The data generator does not import
+matplotlib, nor the preprocessor pandas and sklearn, until they are used.)
+"""
+
+import argparse
+import json
+import sys
+
+
+"""
+This function returns a parser of an optional value, which maps "none" to None and parses the other values by value_type.
+"""
+def optional(value_type):
+    def parse(value):
+        return None if value.lower() == "none" else value_type(value)
+    parse.__name__ = value_type.__name__
+    return parse
+
+
+"""
+This function parses a boolean value.
+"""
+def boolean(value):
+    if value.lower() in ("true", "yes", "1"):
+        return True
+    elif value.lower() in ("false", "no", "0"):
+        return False
+    raise ValueError("not a boolean: {!r}".format(value))
+
+
+#The hyper-parameters of the commands: their names, their parsers, the number of their values (None for a single value) and
+#their help.
+command_hyper_parameters = {
+    "generate": [
+        ("number_of_configurations", int, None, "the number of the network configurations to be generated"),
+        ("number_of_robots", int, None, "the number of robots existing in the network"),
+        ("zone_range", float, None, "the length of each dimension of the network's field"),
+        ("connectivity_threshold", float, None, "the reliable connectivity threshold of each pair of robots"),
+        ("epsilon", float, None, "the width of the critical band beyond the connectivity threshold"),
+        ("scale_factor", float, None, "the factor to further control the connectivity distribution of robots"),
+        ("sampling_method", str, None, "the sampling method of the robot networks ('rejection' or 'disc_union')"),
+        ("time_budget", optional(float), None, "the wall-clock budget (in seconds) of each backbone cycle search"),
+        ("node_budget", optional(int), None, "the node-expansion budget of each backbone cycle search"),
+        ("master_seed", optional(int), None, "the seed from which the seeds of all of the configurations are spawned"),
+        ("number_of_workers", int, None, "the number of the processes generating the configurations in parallel"),
+        ("dataset_file_name", optional(str), None, "the name of the dataset file, which is resumed if it has a checkpoint"),
+        ("checkpoint_interval", int, None, "the number of the records between two consecutive checkpoints"),
+        ("dataset_format", str, None, "the format of the dataset ('csv' or 'binary')"),
+        ("progress_file_name", optional(str), None, "the json-lines file of the progress, the timers and the counters"),
+        ("progress_interval", float, None, "the number of the seconds between two consecutive progress records"),
+    ],
+    "preprocess": [
+        ("dataset_file_name", str, None, "the dataset (a csv file or a binary dataset directory) to be preprocessed"),
+        ("output_directory", str, None, "the directory of the binary datasets of the partitions (required)"),
+        ("test_size_ratio", float, None, "the ratio of the rows held out for the test"),
+        ("validation_size_ratio", float, None, "the ratio of the rest of the rows held out for the validation"),
+        ("chunk_size", int, None, "the number of the rows read at a time"),
+        ("random_state", optional(int), None, "the seed of the assignment of the rows to the partitions"),
+        ("location_dtype", str, None, "the data type of the locations of the partitions"),
+    ],
+    "benchmark": [
+        ("numbers_of_robots", int, "+", "the values of number_of_robots swept by the benchmark"),
+        ("scale_factors", float, "+", "the values of scale_factor swept by the benchmark"),
+        ("number_of_configurations", int, None, "the number of the configurations timed at each point of the sweep"),
+        ("number_of_repeats", int, None, "the number of the times each configuration is timed"),
+        ("number_of_traced_configurations", int, None, "the number of the configurations whose peak memory is traced"),
+        ("benchmark_seed", int, None, "the seed from which the seeds of the configurations are spawned"),
+        ("time_budget", optional(float), None, "the wall-clock budget (in seconds) of each backbone cycle search"),
+        ("node_budget", optional(int), None, "the node-expansion budget of each backbone cycle search"),
+        ("baseline_file_name", optional(str), None, "the json baseline which the results are compared with"),
+        ("save_baseline", boolean, None, "whether the results are saved as the baseline"),
+        ("tolerance", float, None, "the relative slowdown beyond which a stage is flagged as a regression"),
+        ("zone_range", float, None, "the length of each dimension of the network's field"),
+        ("connectivity_threshold", float, None, "the reliable connectivity threshold of each pair of robots"),
+        ("epsilon", float, None, "the width of the critical band beyond the connectivity threshold"),
+        ("sampling_method", str, None, "the sampling method of the robot networks ('rejection' or 'disc_union')"),
+    ],
+}
+
+#The hyper-parameters which a command requires, either by the options or by the config file.
+required_hyper_parameter_names = {"preprocess": ["output_directory"]}
+
+#The hyper-parameters of the data generator which the benchmark takes.
+benchmark_data_generator_hyper_parameter_names = ["zone_range", "connectivity_threshold", "epsilon", "sampling_method"]
+
+
+"""
+This function creates the parser of the command line.
+"""
+def create_parser():
+    parser = argparse.ArgumentParser(prog="OpTopNET_CommandLine.py",
+                                     description="Generate, preprocess and benchmark the cycle topology datasets.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    descriptions = {"generate": "generate (or resume) a dataset of configurations and their cycle topologies",
+                    "preprocess": "split a dataset into train, validation and test binary datasets out of core",
+                    "benchmark": "benchmark the stages of the topology pipeline"}
+    for command, hyper_parameters in command_hyper_parameters.items():
+        subparser = subparsers.add_parser(command, help=descriptions[command], description=descriptions[command])
+        subparser.add_argument("--config", help="a json config file of hyper-parameters (see OpTopNET_CommandLine)")
+        for name, value_type, nargs, help in hyper_parameters:
+            # the hyper-parameters which are not given are left out of the parsed arguments
+            subparser.add_argument("--" + name.replace("_", "-"), dest=name, type=value_type, nargs=nargs, help=help,
+                                   default=argparse.SUPPRESS)
+    return parser
+
+
+"""
+This function reads the hyper-parameters of a command from a json config file (see the top of this file).
+"""
+def read_config_file(file_name, command):
+    with open(file_name) as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError("the config file {} must hold a json object".format(file_name))
+    all_names = {name for hyper_parameters in command_hyper_parameters.values() for name, _, _, _ in hyper_parameters}
+    unknown_names = set(config) - all_names - set(command_hyper_parameters)
+    if unknown_names:
+        raise ValueError("unknown hyper-parameters in {}: {}".format(file_name, sorted(unknown_names)))
+    names = {name for name, _, _, _ in command_hyper_parameters[command]}
+    section = config.get(command, {})
+    unknown_names = set(section) - names
+    if unknown_names:
+        raise ValueError("unknown hyper-parameters of {} in {}: {}".format(command, file_name, sorted(unknown_names)))
+    hyper_parameters = {name: value for name, value in config.items() if name in names}
+    hyper_parameters.update(section)
+    return hyper_parameters
+
+
+"""
+This function returns the hyper-parameters of a command given by the parsed arguments and the config file, if any.
+"""
+def get_given_hyper_parameters(arguments):
+    arguments = dict(vars(arguments))
+    command, config_file_name = arguments.pop("command"), arguments.pop("config")
+    hyper_parameters = {} if config_file_name is None else read_config_file(config_file_name, command)
+    hyper_parameters.update(arguments)
+    return hyper_parameters
+
+
+"""
+This function generates a dataset.
+"""
+def run_generate(hyper_parameters):
+    import OpTopNET_DataGenerator as data_generator
+
+    data_generator.set_hyper_parameters(hyper_parameters)
+    data_generator.generate_dataset()
+    return 0
+
+
+"""
+This function preprocesses a dataset out of core.
+"""
+def run_preprocess(hyper_parameters):
+    import OpTopNET_PreProcessor as preprocessor
+
+    argument_names = {"dataset_file_name": "file_name", "output_directory": "output_directory",
+                      "test_size_ratio": "test_size", "validation_size_ratio": "validation_size",
+                      "chunk_size": "chunk_size", "random_state": "random_state", "location_dtype": "location_dtype"}
+    arguments = {argument_names[name]: value for name, value in hyper_parameters.items()}
+    arguments.setdefault("file_name", preprocessor.dataset_file_name)
+    numbers_of_rows = preprocessor.preprocess_dataset_in_chunks(**arguments)
+    print("The partitions of {} are written into {}: {}.".format(
+        arguments["file_name"], arguments["output_directory"],
+        ", ".join("{} {} rows".format(name, number) for name, number in numbers_of_rows.items())))
+    return 0
+
+
+"""
+This function runs the benchmark, and returns 1 if it regressed against the baseline.
+"""
+def run_benchmark(hyper_parameters):
+    import OpTopNET_Benchmark as benchmark
+    import OpTopNET_DataGenerator as data_generator
+
+    data_generator.set_hyper_parameters({name: hyper_parameters.pop(name)
+                                         for name in benchmark_data_generator_hyper_parameter_names
+                                         if name in hyper_parameters})
+    for name, value in hyper_parameters.items():
+        setattr(benchmark, name, value)
+    _, regressions = benchmark.benchmark_against_baseline()
+    return 1 if regressions else 0
+
+
+#The functions running the commands.
+command_functions = {"generate": run_generate, "preprocess": run_preprocess, "benchmark": run_benchmark}
+
+
+"""
+This function runs the command of the command line, and returns its exit status.
+"""
+def main(argv = None):
+    parser = create_parser()
+    arguments = parser.parse_args(argv)
+    command = arguments.command
+    try:
+        hyper_parameters = get_given_hyper_parameters(arguments)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    for name in required_hyper_parameter_names.get(command, []):
+        if name not in hyper_parameters:
+            parser.error("{} requires --{}".format(command, name.replace("_", "-")))
+    return command_functions[command](hyper_parameters)
+
+###################################################################################################################
+###################################################################################################################
+###################################################################################################################
+
+"""
+Here is the main function of the command line.
+"""
+if __name__ == "__main__":
+
+    sys.exit(main())
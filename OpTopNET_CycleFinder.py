@@ -1,58 +1,409 @@
-"""
-This code is adapted to this project based on the answer of user
-"LetterRip" (https://stackoverflow.com/users/2384638/letterrip) in the following thread of stackoverflow:
-https://stackoverflow.com/questions/12367801/finding-all-cycles-in-undirected-graphs
-"""
-
-cycles = []
-
-
-def find_the_backbone_cycle_of_robot_network(graph):
-    cycles = find_cycles_of_robot_network(graph)
-    return max(cycles, key=len)
-
-def find_cycles_of_robot_network(graph):
-    for edge in graph:
-        for node in edge:
-            findNewCycles([node], graph)
-    return cycles
-
-def findNewCycles(path, graph):
-    start_node = path[0]
-    next_node= None
-    sub = []
-
-    #visit each edge and each node of each edge
-    for edge in graph:
-        node1, node2 = edge
-        if start_node in edge:
-                if node1 == start_node:
-                    next_node = node2
-                else:
-                    next_node = node1
-                if not visited(next_node, path):
-                        # neighbor node not on path yet
-                        sub = [next_node]
-                        sub.extend(path)
-                        # explore extended path
-                        findNewCycles(sub, graph);
-                elif len(path) > 2  and next_node == path[-1]:
-                        # cycle found
-                        p = rotate_to_smallest(path);
-                        inv = invert(p)
-                        if isNew(p) and isNew(inv):
-                            cycles.append(p)
-
-def invert(path):
-    return rotate_to_smallest(path[::-1])
-
-#  rotate cycle path such that it begins with the smallest node
-def rotate_to_smallest(path):
-    n = path.index(min(path))
-    return path[n:]+path[:n]
-
-def isNew(path):
-    return not path in cycles
-
-def visited(node, path):
-    return node in path
\ No newline at end of file
+"""
+This code is adapted to this project based on the answer of user
+"LetterRip" (https://stackoverflow.com/users/2384638/letterrip) in the following thread of stackoverflow:
+https://stackoverflow.com/questions/12367801/finding-all-cycles-in-undirected-graphs
+"""
+
+import time
+
+from OpTopNET_Graph import AdjacencyGraph
+from OpTopNET_Instrumentation import instrumentation
+
+
+"""
+This class is the exception raised when the graph of a robot network does not have any cycle, so the network does not have any
+cycle topology.
+"""
+class NoCycleError(ValueError):
+    pass
+
+
+"""
+This class is the exception raised when the budget of a backbone cycle search runs out before any cycle of the graph is found,
+so it is unknown whether the robot network has any cycle topology.
+"""
+class SearchBudgetExhaustedError(NoCycleError):
+    pass
+
+
+"""
+This class stores the cycles found by the enumeration of a graph, in the order they are found, together with a set of them
+which makes each check of a new cycle O(1). Each enumeration uses its own store, so the cycles of a graph never leak into
+those of the next one.
+"""
+class CycleStore():
+    def __init__(self):
+        self.cycles = []
+        self.cycle_set = set()
+
+
+    """
+    This function adds a cycle to the store.
+    """
+    def append(self, cycle):
+        self.cycles.append(cycle)
+        self.cycle_set.add(tuple(cycle))
+
+
+    """
+    This overridden function checks whether a cycle is in the store.
+    """
+    def __contains__(self, cycle):
+        return tuple(cycle) in self.cycle_set
+
+
+"""
+This function finds the backbone cycle, i.e., the longest cycle, of a robot network's graph using one of the registered
+backbone cycle solvers (see backbone_cycle_solvers at the end of this file). The graph is either an AdjacencyGraph or a list of
+[node1, node2] links. All of the solvers return the same backbone,
+say, the first longest cycle the enumeration below would find for the graph.
+"""
+def find_the_backbone_cycle_of_robot_network(graph, solver="bitmask_branch_and_bound"):
+    if solver not in backbone_cycle_solvers:
+        raise ValueError("unknown backbone cycle solver {!r}; the available ones are {}".format(
+            solver, sorted(backbone_cycle_solvers)))
+    return backbone_cycle_solvers[solver](graph)
+
+
+"""
+This function finds the backbone cycle by enumerating every simple cycle of the graph and picking the longest one. Its cost
+is exponential in the number of robots, so it is only kept as the reference solver.
+"""
+def find_the_backbone_cycle_by_enumeration(graph):
+    cycles = find_cycles_of_robot_network(graph)
+    if not cycles:
+        raise NoCycleError("the graph of the robot network does not have any cycle")
+    return max(cycles, key=len)
+
+def find_cycles_of_robot_network(graph):
+    graph = get_adjacency_graph(graph)
+    cycle_store = CycleStore()
+    #each node is a start node once, in the order of its first appearance in the links
+    for node in graph.nodes:
+        findNewCycles([node], graph, cycle_store)
+    return cycle_store.cycles
+
+def findNewCycles(path, graph, cycle_store):
+    start_node = path[0]
+    next_node= None
+    sub = []
+    if instrumentation.enabled:
+        instrumentation.count("dfs_node_expansions")
+
+    #visit each neighbor of the start node, in the order of their links
+    for next_node in graph.get_neighbors(start_node):
+        if not visited(next_node, path):
+            # neighbor node not on path yet
+            sub = [next_node]
+            sub.extend(path)
+            # explore extended path
+            findNewCycles(sub, graph, cycle_store);
+        elif len(path) > 2  and next_node == path[-1]:
+            # cycle found
+            p = rotate_to_smallest(path);
+            inv = invert(p)
+            if isNew(p, cycle_store) and isNew(inv, cycle_store):
+                cycle_store.append(p)
+                if instrumentation.enabled:
+                    instrumentation.count("cycles_found")
+
+def invert(path):
+    return rotate_to_smallest(path[::-1])
+
+#  rotate cycle path such that it begins with the smallest node
+def rotate_to_smallest(path):
+    n = path.index(min(path))
+    return path[n:]+path[:n]
+
+def isNew(path, cycle_store):
+    return not path in cycle_store
+
+def visited(node, path):
+    return node in path
+
+"""
+This function returns the AdjacencyGraph of a graph given either as one or as a list of [node1, node2] links.
+"""
+def get_adjacency_graph(graph):
+    if isinstance(graph, AdjacencyGraph):
+        return graph
+    return AdjacencyGraph(graph)
+
+#############################################################################################################
+
+"""
+This class holds the bitmask representation of a graph given as an AdjacencyGraph or a list of [node1, node2] links. Nodes are
+indexed in the order of their first appearance in the links, which is the order the enumeration above uses as its start nodes,
+and the neighbors of each node keep the order of the links they come from (see OpTopNET_Graph). So, a depth-first search over
+this representation visits paths in the same order as findNewCycles(path, graph).
+"""
+class BitmaskGraph():
+    def __init__(self, graph):
+        graph = get_adjacency_graph(graph)
+        #nodes[i] is the robot id of the node whose bit is (1 << i).
+        self.nodes = graph.nodes
+        self.neighbors = graph.neighbor_lists
+        self.adjacency = [sum(1 << neighbor for neighbor in neighbors) for neighbors in self.neighbors]
+
+
+    """
+    This function returns the node indices of the biconnected components (blocks) of the graph as bitmasks. Each cycle of a
+    graph lies inside exactly one of its blocks, so the size of a block bounds the length of the cycles passing through it.
+    """
+    def find_biconnected_components(self):
+        number_of_nodes = len(self.nodes)
+        discovery = [-1] * number_of_nodes
+        low = [0] * number_of_nodes
+        blocks = []
+        discovery_time = 0
+        for root in range(number_of_nodes):
+            if discovery[root] != -1:
+                continue
+            discovery[root] = low[root] = discovery_time
+            discovery_time += 1
+            edge_stack = []
+            stack = [(root, -1, iter(self.neighbors[root]))]
+            while stack:
+                node, parent, neighbors = stack[-1]
+                advanced = False
+                for neighbor in neighbors:
+                    if discovery[neighbor] == -1:
+                        edge_stack.append((node, neighbor))
+                        discovery[neighbor] = low[neighbor] = discovery_time
+                        discovery_time += 1
+                        stack.append((neighbor, node, iter(self.neighbors[neighbor])))
+                        advanced = True
+                        break
+                    elif neighbor != parent and discovery[neighbor] < discovery[node]:
+                        edge_stack.append((node, neighbor))
+                        low[node] = min(low[node], discovery[neighbor])
+                if advanced:
+                    continue
+                stack.pop()
+                if parent != -1:
+                    low[parent] = min(low[parent], low[node])
+                    if low[node] >= discovery[parent]:
+                        block = 0
+                        while True:
+                            edge = edge_stack.pop()
+                            block |= (1 << edge[0]) | (1 << edge[1])
+                            if edge == (parent, node):
+                                break
+                        blocks.append(block)
+        return blocks
+
+
+    """
+    This function returns the bitmask of the nodes reachable from node through the nodes of the free bitmask.
+    """
+    def reach(self, node, free):
+        adjacency = self.adjacency
+        frontier = adjacency[node] & free
+        reached = frontier
+        while frontier:
+            expanded = 0
+            while frontier:
+                lowest_bit = frontier & -frontier
+                expanded |= adjacency[lowest_bit.bit_length() - 1]
+                frontier ^= lowest_bit
+            frontier = expanded & free & ~reached
+            reached |= frontier
+        return reached
+
+
+"""
+This class searches a graph for its first longest cycle in the enumeration order of findNewCycles(path, graph) using a
+bitmask branch-and-bound. A path is only extended if the nodes still reachable from its head may close a cycle longer than
+the best one found so far (or, if target_length is given, a cycle of that length), and the nodes which have already served
+as start nodes are skipped, since every cycle through them has been examined before. Since only strictly longer cycles
+replace the best one, the final cycle is the same as max(cycles, key=len) over the full enumeration.
+
+The search is anytime: stream_candidate_cycles() yields every improving cycle as soon as it is found, and it stops when a
+cycle as long as the largest biconnected component of the graph (e.g., a Hamiltonian cycle) is found, or when the
+time_budget (in seconds) or the node_budget (the number of path expansions) runs out. proven_optimal tells whether the
+best_cycle is known to be the backbone cycle or it is only the best one found within the budget.
+"""
+class BackboneCycleSearch():
+    def __init__(self, graph, target_length=None, time_budget=None, node_budget=None):
+        self.bitmask_graph = graph if isinstance(graph, BitmaskGraph) else BitmaskGraph(graph)
+        self.target_length = target_length
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.best_cycle = []
+        self.proven_optimal = False
+        self.budget_exhausted = False
+        self.node_expansions = 0
+        self.elapsed_time = 0.0
+
+
+    """
+    This function yields the improving cycles of the graph, each of which is rotated to begin with its smallest node.
+    """
+    def stream_candidate_cycles(self):
+        self.start_time = time.perf_counter()
+        self.stopped = False
+        try:
+            blocks = [block for block in self.bitmask_graph.find_biconnected_components() if bin(block).count("1") > 2]
+            # A cycle of this length may not be improved upon, so the search stops as soon as it is found.
+            self.upper_bound = max((bin(block).count("1") for block in blocks), default=0)
+            if self.target_length is not None:
+                self.upper_bound = min(self.upper_bound, self.target_length)
+            if self.upper_bound >= 3:
+                for start in range(len(self.bitmask_graph.nodes)):
+                    # every cycle through start lies inside one of the blocks containing it and avoids the previous start
+                    # nodes
+                    free = 0
+                    for block in blocks:
+                        if block >> start & 1 and bin(block).count("1") > len(self.best_cycle):
+                            free |= block
+                    free &= ~((1 << start) - 1)
+                    if not free:
+                        continue
+                    yield from self.extend([start], start, 1 << start, free)
+                    if self.stopped:
+                        break
+            self.proven_optimal = not self.budget_exhausted
+        finally:
+            self.elapsed_time = time.perf_counter() - self.start_time
+            instrumentation.count("dfs_node_expansions", self.node_expansions)
+
+
+    """
+    This function extends the path, whose head is its first node and whose start is its last node, in depth-first order.
+    """
+    def extend(self, path, head, visited, free):
+        self.node_expansions += 1
+        if ((self.node_budget is not None and self.node_expansions > self.node_budget) or
+                (self.time_budget is not None and time.perf_counter() - self.start_time > self.time_budget)):
+            self.budget_exhausted = self.stopped = True
+            return
+        nodes = self.bitmask_graph.nodes
+        adjacency = self.bitmask_graph.adjacency
+        start = path[-1]
+        # cycles closing at this head have the length of the path, and the extended paths are one node longer
+        if (len(path) > 2 and len(path) > len(self.best_cycle) and
+                (self.target_length is None or len(path) == self.target_length) and adjacency[head] >> start & 1):
+            self.best_cycle = rotate_to_smallest([nodes[index] for index in path])
+            if instrumentation.enabled:
+                instrumentation.count("cycles_found")
+            yield self.best_cycle
+            if len(self.best_cycle) >= self.upper_bound:
+                self.stopped = True
+                return
+        for neighbor in self.bitmask_graph.neighbors[head]:
+            if visited >> neighbor & 1 or not free >> neighbor & 1:
+                continue
+            reachable = self.bitmask_graph.reach(neighbor, free & ~visited & ~(1 << neighbor))
+            bound = len(path) + 1 + bin(reachable).count("1")
+            if bound <= len(self.best_cycle) or (self.target_length is not None and bound < self.target_length):
+                continue
+            if not (adjacency[start] >> neighbor & 1 or adjacency[start] & reachable):
+                continue
+            path.insert(0, neighbor)
+            yield from self.extend(path, neighbor, visited | (1 << neighbor), free)
+            path.pop(0)
+            if self.stopped:
+                return
+
+
+    """
+    This function runs the search to its end, or until its budget runs out, and returns the search itself.
+    """
+    def run(self):
+        for _ in self.stream_candidate_cycles():
+            pass
+        return self
+
+
+"""
+This function searches the graph for its first longest cycle without any budget.
+"""
+def search_the_longest_cycle(bitmask_graph, target_length=None):
+    return BackboneCycleSearch(bitmask_graph, target_length=target_length).run().best_cycle
+
+
+"""
+This function returns the length of the longest cycle of the graph by a dynamic programming over the subsets of the nodes of
+each of its blocks: for each subset containing a start node s as its smallest node, it stores the bitmask of the nodes at
+which a simple path from s visiting exactly that subset may end. Blocks larger than maximum_block_size are skipped to keep the
+number of the subsets tractable; since their sizes only bound their longest cycles, the length is unknown, and None is returned,
+if such a block is larger than the longest cycle of the other blocks.
+"""
+def find_the_length_of_the_longest_cycle_by_subset_dp(bitmask_graph, maximum_block_size=16):
+    adjacency = bitmask_graph.adjacency
+    longest = 0
+    largest_skipped_block_size = 0
+    for block in bitmask_graph.find_biconnected_components():
+        block_size = bin(block).count("1")
+        if block_size <= max(longest, 2):
+            continue
+        if block_size > maximum_block_size:
+            largest_skipped_block_size = max(largest_skipped_block_size, block_size)
+            continue
+        remaining = block
+        while remaining and bin(remaining).count("1") > max(longest, 2):
+            start_bit = remaining & -remaining
+            start = start_bit.bit_length() - 1
+            remaining ^= start_bit
+            layer = {start_bit: start_bit}
+            length = 1
+            while layer:
+                length += 1
+                next_layer = {}
+                for subset, ends in layer.items():
+                    while ends:
+                        end_bit = ends & -ends
+                        ends ^= end_bit
+                        extensions = adjacency[end_bit.bit_length() - 1] & remaining & ~subset
+                        while extensions:
+                            extension_bit = extensions & -extensions
+                            extensions ^= extension_bit
+                            next_subset = subset | extension_bit
+                            next_layer[next_subset] = next_layer.get(next_subset, 0) | extension_bit
+                layer = next_layer
+                if length > max(longest, 2) and any(ends & adjacency[start] for ends in layer.values()):
+                    longest = length
+            if longest == block_size:
+                break
+    if largest_skipped_block_size > max(longest, 2):
+        return None
+    return longest
+
+
+"""
+This function finds the backbone cycle with the bitmask branch-and-bound search.
+"""
+def find_the_backbone_cycle_by_bitmask_branch_and_bound(graph):
+    backbone_cycle = search_the_longest_cycle(BitmaskGraph(graph))
+    if not backbone_cycle:
+        raise NoCycleError("the graph of the robot network does not have any cycle")
+    return backbone_cycle
+
+
+"""
+This function finds the length of the backbone cycle by the subset dynamic programming and then only searches for the first
+cycle of that length, which allows the branch-and-bound to prune every path that may not reach that length. If the length is
+unknown, i.e., a block is too large for the dynamic programming, the search is not targeted.
+"""
+def find_the_backbone_cycle_by_subset_dp(graph):
+    bitmask_graph = BitmaskGraph(graph)
+    backbone_cycle = search_the_longest_cycle(
+        bitmask_graph, target_length=find_the_length_of_the_longest_cycle_by_subset_dp(bitmask_graph))
+    if not backbone_cycle:
+        raise NoCycleError("the graph of the robot network does not have any cycle")
+    return backbone_cycle
+
+
+"""
+This function runs the anytime backbone cycle search within a wall-clock (in seconds) and/or a node-expansion budget and
+returns the search, whose best_cycle is the backbone found so far and whose proven_optimal tells whether it is the exact one.
+"""
+def find_the_backbone_cycle_within_budget(graph, time_budget=None, node_budget=None):
+    return BackboneCycleSearch(graph, time_budget=time_budget, node_budget=node_budget).run()
+
+
+backbone_cycle_solvers = {
+    "enumeration": find_the_backbone_cycle_by_enumeration,
+    "bitmask_branch_and_bound": find_the_backbone_cycle_by_bitmask_branch_and_bound,
+    "subset_dp": find_the_backbone_cycle_by_subset_dp,
+}
@@ -1,423 +1,1143 @@
-import numpy as np
-import matplotlib.pyplot as plt
-from math import sqrt
-import itertools
-from collections import Counter
-import csv
-from datetime import datetime
-
-from OpTopNET_CycleFinder import find_the_backbone_cycle_of_robot_network
-
-"""
-Hyper-parameters
-
-number_of_configurations: the number of the records of the dataset
-number_of_robots:         the number of robots existing in the network                
-zone_range:               the length of each dimension of the network's field           
-connectivity_threshold:   the maximum allowed distance between robots violation of which disconnects the network
-epsilon:                  the width of the tension bound 
-scale_factor:             the factor to further control the connectivity distribution of robots
-"""
-number_of_configurations = 10
-number_of_robots = 10
-zone_range = 1
-connectivity_threshold = 0.5
-epsilon = 0.1
-scale_factor = 0.1
-
-
-
-"""
-This class creates robot instances supported by the native computational functions of the class.
-"""
-class Robot():
-    id = itertools.count(start=1)
-
-    def __init__(self, location = None, reliable_id_set = [], critical_id_set = [], degree = 0):
-        self.id = next(Robot.id)
-        self.location = np.random.uniform(0, zone_range, size=(1, 2)).tolist()[0]
-        self.reliable_id_set = reliable_id_set
-        self.critical_id_set = critical_id_set
-        self.degree = degree
-
-
-    """
-    This function makes the instances of Robot class iterable.
-    """
-    def __iter__(self):
-        for _ in self.__dict__.values():
-            yield _
-
-
-    """
-    This function computes the distance between two robots.
-    """
-    def compute_distance(self, other_robot):
-        return sqrt((self.location[0] - other_robot.location[0]) ** 2 + (self.location[1] - other_robot.location[1]) ** 2)
-
-
-    """
-    This function checks whether new_robot is connected to the network of the previously-available robots.
-    """
-    def check_connectivity(self, robot_network):
-        if (len(robot_network) == 0):
-            return True
-        else:
-            return any([robot for robot in robot_network if self.compute_distance(robot) < scale_factor*(connectivity_threshold + epsilon)])
-
-
-    """
-    This function computes the reliable sets associated with the robots of a network.
-    """
-    def compute_reliable_set(self):
-        other_robots = robot_network.copy()
-        other_robots.remove(self)
-        self.reliable_id_set = [other_robot.id for other_robot in other_robots
-                             if self.compute_distance(other_robot) <= scale_factor*connectivity_threshold]
-
-
-    """
-    This function computes the critical sets associated with the robots of a network.
-    """
-    def compute_critical_set(self):
-        other_robots = robot_network.copy()
-        other_robots.remove(self)
-        self.critical_id_set = [other_robot.id for other_robot in other_robots
-                                if ((self.compute_distance(other_robot) > scale_factor*connectivity_threshold) and
-                                    self.compute_distance(other_robot) <= scale_factor*(connectivity_threshold + epsilon))]
-
-
-    """
-    This function sets the computed relibale and critical set of a robot network. 
-    """
-    def set_reliable_and_critical_sets(self):
-        self.compute_reliable_set()
-        self.compute_critical_set()
-
-
-    """
-    This overridden function defines the measure of comparability between two instances of Robot class.
-    """
-    def __lt__(self, other):
-        if (len(self.reliable_id_set) < len(other.reliable_id_set)):
-            return True
-        elif (len(self.reliable_id_set) == len(other.reliable_id_set)):
-            return len(self.critical_id_set) < len(other.critical_id_set)
-
-
-    """
-    This overridden function provides a formatted output for the objects of Robot class. 
-    """
-    def __str__(self):
-        return "id: {!s:<5}, location: {!s:<45}, reliable set: {!s:<22}, critical set: {!s:<30}, degree: {}".format(
-            self.id, self.location, self.reliable_id_set, self.critical_id_set, self.degree)
-
-#############################################################################################################
-
-"""
-This class represents cycle topology objects each of which includes a backbone cycle and a set of clusters associated
-with those robots which does not reside on the backbone cycle.
-"""
-class CycleTopology():
-    def __init__(self, backbone_cycle = [], clusters = []):
-        #backbone_cycle is the list of the robot constructing the backbone cycle.
-        self.backbone_cycle = backbone_cycle
-        #clusters include [a, b] lists in which orphan robot 'a' is connected to backbone robot 'b'.
-        self.clusters = clusters
-
-
-    """
-    This overridden function makes the objects of the class iterable.
-    """
-    def __iter__(self):
-        for _ in self.__dict__.values():
-            yield _
-
-
-    """
-    This overridden function provides a formatted output for the objects of CycleTopology class. 
-    """
-    def __str__(self):
-        return "backbone cycle: {!s:<5}, clusters: {}".format(self.backbone_cycle, self.clusters)
-
-#############################################################################################################
-
-"""
-This function plot a robot network configuration.
-"""
-def plot_locations_of_robot_network(robot_network):
-    ### removing the extra nesting of the robot's list
-    formatted_robot_network = [[attribute for attribute in my_class] for my_class in robot_network]
-    locations = [[subitem for subitem in item[1]] for item in formatted_robot_network]
-    plt.scatter(np.asarray(locations)[:, 0], np.asarray(locations)[:, 1])
-    plt.xlim([0, zone_range])
-    plt.ylim([0, zone_range])
-    plt.show()
-
-
-"""
-This function create a robot network and computes all of the properties of its robot members.
-"""
-def create_robot_network():
-    robot_network = []
-    first_robot = Robot()
-    robot_network.append(first_robot)
-    counter = 1
-    while counter != number_of_robots:
-        next_robot = Robot()
-        if next_robot.check_connectivity(robot_network):
-            robot_network.append(next_robot)
-            counter += 1
-        else:
-            del next_robot
-            Robot.id = itertools.count(counter + 1)
-    return robot_network
-
-
-"""
-This function sort robots based on the criticality of their connectedness. The larger the cardinality of a reliable set, 
-the higher its priority. If reliable sets' cardinalities are equal, then those of the critical sets decide, say, the larger
-one will be prioritized. This function plays a crucial rule in the expected functionality of the 
-synthesize_ring_topology_for_robot_network(robot_network) function. For more information, please refer to that function's 
-comments.
-"""
-def sort_robot_network(robot_network):
-    sorted_robot_network = sorted(robot_network, reverse=True)
-    return sorted_robot_network
-
-
-"""
-This function generates the backbone cycle of a robot network. 
-"""
-def generate_backbone_cycle_links(robot_network):
-    backbone_cycle_links = []
-    for robot in robot_network:
-        for item in robot.reliable_id_set:
-            if [item, robot.id] not in backbone_cycle_links:
-                backbone_cycle_links.append([robot.id, item])
-    return backbone_cycle_links
-
-
-"""
-This function initializes the degree values of the links of a cycle backbone.
-"""
-def update_degrees_of_robot_network(robot_network, links):
-    flat_links = [item for sublist in links for item in sublist]
-    counter = Counter(flat_links)
-    for robot in robot_network:
-        for key, value in counter.items():
-            if robot.id == key:
-                robot.degree = value
-
-
-"""
-This function returns the relibale peers (of an orphan robot) on the backbone cycle of their topology. 
-"""
-def get_reliable_peers_in_cycle(orphan_robot, backbone_cycle):
-    reliable_id_list = []
-    for id in orphan_robot.reliable_id_set:
-        if id in backbone_cycle:
-            reliable_id_list.append(id)
-    return reliable_id_list
-
-
-"""
-This function returns the critical peers (of an orphan robot) on the backbone cycle of their topology. 
-"""
-def get_critical_peers_in_cycle(orphan_robot, backbone_cycle):
-    critical_id_list = []
-    for id in orphan_robot.critical_id_set:
-        if id in backbone_cycle:
-            critical_id_list.append(id)
-    return critical_id_list
-
-
-"""
-This function employs a heuristic estimation for the case none of the peers of an orphan robot has been already assigned to 
-a backbone robot. Using this heuristics, the nearest backbone robot to an orphan robot is found.
-"""
-def find_the_nearest_backbone_robot(orphan_robot, robot_network, backbone_cycle):
-    backbone_robots = [robot for robot in robot_network for id in backbone_cycle if robot.id == id]
-    nearest_backbone_robot_id = min(robot.id for robot in backbone_robots
-                                    if orphan_robot.compute_distance(robot))
-    return nearest_backbone_robot_id
-
-
-"""
-This function finds the nearesr least-connected peer of a orphan robot residing on the backbone cycle of their topology. 
-"""
-def get_the_nearest_least_connected_peer_in_cycle(robot_network, id_list, orphan_robot):
-    minimum_degree = min(robot.degree for robot in robot_network for id in id_list if robot.id == id)
-    robots_cycle_with_minimum_degree = [robot for robot in robot_network if robot.degree == minimum_degree]
-    # If the minimum-degree robot is unique, so the distance constraint may be ignored.
-    if (len(robots_cycle_with_minimum_degree) == 1):
-        return robots_cycle_with_minimum_degree[0].id
-    # else if there are more than one robot with the minimum degree, pick the nearest one to the orphan robot.
-    else:
-        minimum_distance = min(orphan_robot.compute_distance(robot) for robot in robots_cycle_with_minimum_degree)
-        nearest_robots_cycle_with_minimum_degree = [robot for robot in robots_cycle_with_minimum_degree
-                                                             if orphan_robot.compute_distance(robot) == minimum_distance]
-        return nearest_robots_cycle_with_minimum_degree[0].id
-
-
-"""
-The function below computes the cycle topology of a robot network. Please refer to the internal comments to better understand
-the functionality of this routine. (Note that the robot network is sorted in a descending order first by the cardinality of 
-its reliable_id_set and then by that of its critical_id_set. So, this order is also conserved while processing of orphan robots
-to connect them to the backbone cycle of the robot network's topology. Accordingly, the earlier orphan robots are closer to \
-the backbone cycle compared to those which come later to be processed.)
-"""
-def synthesize_cycle_topology_for_robot_network(robot_network):
-    cycle_topology = CycleTopology([], [])
-
-    #List of the the links of the backbone cycle
-    backbone_cycle_links = generate_backbone_cycle_links(robot_network)
-
-    update_degrees_of_robot_network(robot_network, backbone_cycle_links)
-
-    cycle_topology.backbone_cycle = find_the_backbone_cycle_of_robot_network(backbone_cycle_links)
-
-    #Add each item of backbone cycle as its own cluster to the clusters list
-    for item in cycle_topology.backbone_cycle:
-        cycle_topology.clusters.append([item, item])
-
-    #Orphan robots are those which do not belong to the robot network cycle.
-    orphan_robots = [robot for robot in robot_network if (robot.id not in cycle_topology.backbone_cycle)]
-    for orphan_robot in orphan_robots:
-        if any(orphan_robot.reliable_id_set):
-            # If there is any of the reliable peers of the orphan robot which belong to the cycle
-            reliable_temp = get_reliable_peers_in_cycle(orphan_robot, cycle_topology.backbone_cycle)
-            if any(reliable_temp):
-                # the id captured below is indeed the cluster id of the orphan robot
-                id_of_the_nearest_reliable_robot_cycle_with_minimum_degree = get_the_nearest_least_connected_peer_in_cycle(
-                    robot_network, reliable_temp, orphan_robot)
-                # connect the orphan robot to the reliable peer of which owns the least degree
-                cycle_topology.clusters.append(
-                    [orphan_robot.id, id_of_the_nearest_reliable_robot_cycle_with_minimum_degree])
-            # In this case, none of the reliable peers of the orphan robot belong to the cycle
-            else:
-                #Does the orphan robot have any reliable peer which has been already assigned to a cluster
-                temp = [cluster[1] for id in orphan_robot.reliable_id_set for cluster in cycle_topology.clusters if
-                        cluster[0] == id]
-                # If so, get the list of clusters associated with those peers and assign the orphan robot to the first one of them
-                if any(temp):
-                    cycle_topology.clusters.append([orphan_robot.id, temp[0]])
-                # Otherwise, Do the same this time for the critical peers of it
-                else:
-                    temp1 = [cluster[1] for id in orphan_robot.critical_id_set for cluster in cycle_topology.clusters if
-                            cluster[0] == id]
-                    if any(temp1):
-                        cycle_topology.clusters.append([orphan_robot.id, temp1[0]])
-                    else:
-                        #If that set is empty, then use the heurisics below, say assign the orphan robot to its nearest backbone
-                        #robot
-                        nearest_backbone_robot_id = find_the_nearest_backbone_robot(
-                            orphan_robot, robot_network, cycle_topology.backbone_cycle)
-                        cycle_topology.clusters.append([orphan_robot.id, nearest_backbone_robot_id])
-        elif any(orphan_robot.critical_id_set):
-            critical_temp = get_critical_peers_in_cycle(orphan_robot, cycle_topology.backbone_cycle)
-            # If there is any of the critical peers of the orphan robot which belong to the cycle
-            if any(critical_temp):
-                # the id captured below is indeed the cluster id of the orphan robot
-                id_of_the_nearest_critical_robot_cycle_with_minimum_degree = get_the_nearest_least_connected_peer_in_cycle(
-                    robot_network, critical_temp, orphan_robot)
-                # connect the orphan robot to the critical peer of which owns the least degree
-                cycle_topology.clusters.append(
-                    [orphan_robot.id, id_of_the_nearest_critical_robot_cycle_with_minimum_degree])
-            # In this case, none of the critical peers of the orphan robot belong to the cycle
-            else:
-                #Get its critical peers which been already assigned to clusters
-                temp = [cluster[1] for id in orphan_robot.critical_id_set for cluster in cycle_topology.clusters if cluster[0] == id]
-                #Assign the orphan robot to the cluster
-                cycle_topology.clusters.append([orphan_robot.id, temp[0]])
-    cycle_topology.clusters = sorted(cycle_topology.clusters, key=lambda id_and_name: id_and_name[0])
-    return cycle_topology
-
-
-"""
-This function extracts the locations of the robots of the network.
-"""
-def extract_robot_locations(robot_network):
-    raw_locations = [robot.location for robot in robot_network]
-    flat_list = [item for sublist in raw_locations for item in sublist]
-    return flat_list
-
-
-"""
-This function extracts the cycle clusters of the topology of a robot network.
-"""
-def extract_cycle_clusters(cycle_topology):
-    return [item[1] for item in cycle_topology.clusters]
-
-
-"""
-This helper function creates the header of the dataset csv fine.
-"""
-def create_header(number_of_robots):
-    header = []
-    for i in range(1, number_of_robots + 1):
-        header.append("X" + str(i))
-        header.append("Y" + str(i))
-    for i in range(1, number_of_robots + 1):
-        header.append("C" + str(i))
-    return header
-
-
-"""
-This function wraps the data into a csv dataset file/
-"""
-def create_cycle_Topo_dataset(robots_locations, cycles_clusters):
-    header = create_header(len(robots_locations[0])//2)
-
-    with open("cycle_Topo_dataset_"+str(len(robots_locations[0])//2)+"___"+datetime.now().strftime("%Y_%m_%d-%I_%M_%S_%p")+".csv", "w", newline="") as f:
-        writer = csv.writer(f, delimiter=" ")
-        writer.writerow(header)
-        for robot_location, cycle_cluster in zip(robots_locations, cycles_clusters):
-            writer.writerow(robot_location + cycle_cluster)
-
-
-"""
-This function logs the progression of the accumulation of records in the csv dataset.
-"""
-def log_the_dataset_creation_process(counter):
-    if counter%10 == 0 and counter > 0:
-        print("The configuration number {}/{} is just added to the dataset.".format(counter, number_of_configurations))
-
-###################################################################################################################
-###################################################################################################################
-###################################################################################################################
-
-"""
-Here is the main function of this data generator.
-"""
-if __name__ == "__main__":
-
-    robots_locations = []
-    cycles_clusters = []
-
-    counter = 1
-
-    while counter < number_of_configurations + 1:
-
-        robot_network = create_robot_network()
-
-        for robot in robot_network:
-            robot.set_reliable_and_critical_sets()
-
-        sorted_robot_network = sort_robot_network(robot_network)
-
-        cycle_topology = synthesize_cycle_topology_for_robot_network(sorted_robot_network)
-
-        robot_location = extract_robot_locations(sorted_robot_network)
-        cycle_cluster = extract_cycle_clusters(cycle_topology)
-
-        robots_locations.append(robot_location)
-        cycles_clusters.append(cycle_cluster)
-
-        Robot.id = itertools.count(1)
-
-        log_the_dataset_creation_process(counter)
-
-        counter = counter + 1
-
-    create_cycle_Topo_dataset(robots_locations, cycles_clusters)
\ No newline at end of file
+import numpy as np
+from math import sqrt
+import itertools
+from collections import Counter
+import csv
+from datetime import datetime
+import multiprocessing
+
+from OpTopNET_CycleFinder import (NoCycleError, SearchBudgetExhaustedError, find_the_backbone_cycle_of_robot_network,
+                                  find_the_backbone_cycle_within_budget)
+from OpTopNET_Graph import AdjacencyGraph, build_adjacency_graph_of_robot_network
+from OpTopNET_SpatialIndex import UniformGrid, build_uniform_grid_of_robot_network
+from OpTopNET_DatasetIO import create_header, CSVDatasetWriter, BinaryDatasetWriter
+from OpTopNET_Instrumentation import instrumentation, ProgressReporter
+
+"""
+Hyper-parameters
+
+number_of_configurations: the number of the records of the dataset
+number_of_robots:         the number of robots existing in the network                
+zone_range:               the length of each dimension of the network's field           
+connectivity_threshold:   the maximum allowed distance between robots violation of which disconnects the network
+epsilon:                  the width of the tension bound 
+scale_factor:             the factor to further control the connectivity distribution of robots
+sampling_method:          the way the robots of a configuration are sampled ("rejection" or "disc_union", see
+                          create_robot_network)
+time_budget:              the wall-clock budget (in seconds) of the backbone cycle search of each configuration
+                          (None: unbounded)
+node_budget:              the node-expansion budget of the backbone cycle search of each configuration (None: unbounded)
+master_seed:              the seed from which the seeds of all of the configurations are spawned (None: fresh entropy)
+number_of_workers:        the number of the processes generating the configurations in parallel
+dataset_file_name:        the name of the dataset file (None: a time-stamped name); the generation resumes from the last
+                          checkpoint of the file if it has any
+checkpoint_interval:      the number of the records between two consecutive checkpoints of the dataset file
+dataset_format:           the format of the dataset ("csv" or "binary", see OpTopNET_DatasetIO)
+progress_file_name:       the json-lines file into which the progress, the stage timers and the counters of the run are
+                          written (None: the instrumentation is disabled; see OpTopNET_Instrumentation)
+progress_interval:        the number of the seconds between two consecutive progress records
+"""
+number_of_configurations = 10
+number_of_robots = 10
+zone_range = 1
+connectivity_threshold = 0.5
+epsilon = 0.1
+scale_factor = 0.1
+sampling_method = "rejection"
+time_budget = None
+node_budget = None
+master_seed = None
+number_of_workers = 1
+dataset_file_name = None
+checkpoint_interval = 10000
+dataset_format = "csv"
+progress_file_name = None
+progress_interval = 10
+
+hyper_parameter_names = ["number_of_configurations", "number_of_robots", "zone_range", "connectivity_threshold", "epsilon",
+                         "scale_factor", "sampling_method", "time_budget", "node_budget", "master_seed", "number_of_workers",
+                         "dataset_file_name", "checkpoint_interval", "dataset_format", "progress_file_name",
+                         "progress_interval"]
+
+
+"""
+This class holds the state of a run of the data generator, or of the labeling of a network, so that several of them may run
+concurrently, e.g., in threads: its own hyper-parameters (those of the module by default, updated by the given ones), which it
+exposes as its attributes, its random number generator and the allocator of the ids of its robots. The functions of the
+pipeline take it as their context argument. Without one, they use module_context, i.e., the module-level hyper-parameters,
+np.random and Robot.id, as they always did.
+"""
+class GenerationContext():
+    def __init__(self, hyper_parameters = None, seed = None):
+        self.hyper_parameters = get_hyper_parameters()
+        if hyper_parameters is not None:
+            unknown_names = set(hyper_parameters) - set(hyper_parameter_names)
+            if unknown_names:
+                raise ValueError("unknown hyper-parameters: {}".format(sorted(unknown_names)))
+            self.hyper_parameters.update(hyper_parameters)
+        self.seed(seed)
+        self.reset_robot_ids()
+
+
+    """
+    This overridden function exposes the hyper-parameters of the context as its attributes, and creates the unseeded random
+    number generator of the context on its first use.
+    """
+    def __getattr__(self, name):
+        hyper_parameters = self.__dict__.get("hyper_parameters", {})
+        if name in hyper_parameters:
+            return hyper_parameters[name]
+        if name == "random_state":
+            self.random_state = np.random.RandomState()
+            return self.random_state
+        raise AttributeError("{!r} is neither an attribute nor a hyper-parameter of the context".format(name))
+
+
+    """
+    This function returns a copy of the hyper-parameters of the context.
+    """
+    def get_hyper_parameters(self):
+        return dict(self.hyper_parameters)
+
+
+    """
+    This function seeds the random number generator of the context. (An unseeded one is only created on its first use, since
+    most of the contexts only label networks and never draw anything.)
+    """
+    def seed(self, seed = None):
+        if seed is None:
+            self.__dict__.pop("random_state", None)
+        else:
+            self.random_state = np.random.RandomState(seed)
+
+
+    """
+    This function seeds the random number generator of the context for the configuration of the given index by its own seed,
+    which is spawned from the entropy of the master seed (see generate_seeded_configuration()).
+    """
+    def seed_configuration(self, entropy, index):
+        self.seed(np.random.SeedSequence(entropy, spawn_key=(index,)).generate_state(4))
+
+
+    """
+    This function makes the next robots get the ids first_id, first_id + 1, ...
+    """
+    def reset_robot_ids(self, first_id = 1):
+        self.robot_ids = itertools.count(first_id)
+
+
+    """
+    This function allocates the id of a new robot.
+    """
+    def allocate_robot_id(self):
+        return next(self.robot_ids)
+
+
+"""
+This class is the default context of the pipeline, which reads the module-level hyper-parameters (so set_hyper_parameters()
+and the assignments to them take effect at once), draws from np.random and allocates the ids by Robot.id.
+"""
+class ModuleGenerationContext(GenerationContext):
+    def __init__(self):
+        pass
+
+
+    def __getattr__(self, name):
+        if name in hyper_parameter_names:
+            return globals()[name]
+        raise AttributeError("{!r} is neither an attribute nor a hyper-parameter of the context".format(name))
+
+
+    @property
+    def random_state(self):
+        return np.random
+
+
+    def get_hyper_parameters(self):
+        return get_hyper_parameters()
+
+
+    def seed(self, seed = None):
+        np.random.seed(seed)
+
+
+    def reset_robot_ids(self, first_id = 1):
+        Robot.id = itertools.count(first_id)
+
+
+    def allocate_robot_id(self):
+        return next(Robot.id)
+
+
+module_context = ModuleGenerationContext()
+
+
+"""
+This function returns the given context, or the default one if it is None.
+"""
+def get_context(context):
+    return module_context if context is None else context
+
+
+"""
+This function returns the given context, or, if it is None, a new one with the current hyper-parameters of the module, e.g.,
+for a labeling which must neither read nor change the module state while it runs.
+"""
+def create_context(context = None):
+    return GenerationContext() if context is None else context
+
+
+"""
+This function returns the radii of the reliable and the critical peers, i.e., scale_factor*connectivity_threshold and
+scale_factor*(connectivity_threshold + epsilon), of a context.
+"""
+def get_peer_radii(context = None):
+    context = get_context(context)
+    return (context.scale_factor*context.connectivity_threshold,
+            context.scale_factor*(context.connectivity_threshold + context.epsilon))
+
+
+"""
+This class creates robot instances supported by the native computational functions of the class. The ids and the random
+locations of the robots are drawn from the given context (see GenerationContext).
+"""
+class Robot():
+    id = itertools.count(start=1)
+
+    def __init__(self, location = None, reliable_id_set = [], critical_id_set = [], degree = 0, context = None):
+        context = get_context(context)
+        self.id = context.allocate_robot_id()
+        self.location = (context.random_state.uniform(0, context.zone_range, size=(1, 2)).tolist()[0] if location is None
+                         else list(location))
+        self.reliable_id_set = reliable_id_set
+        self.critical_id_set = critical_id_set
+        self.degree = degree
+
+
+    """
+    This function makes the instances of Robot class iterable.
+    """
+    def __iter__(self):
+        for _ in self.__dict__.values():
+            yield _
+
+
+    """
+    This function computes the distance between two robots.
+    """
+    def compute_distance(self, other_robot):
+        return sqrt((self.location[0] - other_robot.location[0]) ** 2 + (self.location[1] - other_robot.location[1]) ** 2)
+
+
+    """
+    This function checks whether new_robot is connected to the network of the previously-available robots. If a spatial index
+    of those robots is given, only the robots around new_robot are checked.
+    """
+    def check_connectivity(self, robot_network, spatial_index = None, context = None):
+        critical_radius = get_peer_radii(context)[1]
+        if (len(robot_network) == 0):
+            return True
+        elif spatial_index is not None:
+            return len(spatial_index.query_radius(self.location, critical_radius, strict = True)) > 0
+        else:
+            return any([robot for robot in robot_network if self.compute_distance(robot) < critical_radius])
+
+
+    """
+    This function computes the reliable sets associated with the robots of a network.
+    """
+    def compute_reliable_set(self, robot_network, context = None):
+        reliable_radius = get_peer_radii(context)[0]
+        other_robots = robot_network.copy()
+        other_robots.remove(self)
+        self.reliable_id_set = [other_robot.id for other_robot in other_robots
+                             if self.compute_distance(other_robot) <= reliable_radius]
+
+
+    """
+    This function computes the critical sets associated with the robots of a network.
+    """
+    def compute_critical_set(self, robot_network, context = None):
+        reliable_radius, critical_radius = get_peer_radii(context)
+        other_robots = robot_network.copy()
+        other_robots.remove(self)
+        self.critical_id_set = [other_robot.id for other_robot in other_robots
+                                if ((self.compute_distance(other_robot) > reliable_radius) and
+                                    self.compute_distance(other_robot) <= critical_radius)]
+
+
+    """
+    This function sets the computed relibale and critical set of a robot network. If the distances of the robot to the
+    robots whose ids are robot_ids (e.g., a row of compute_distance_matrix(robot_network)) are given, they are reused
+    instead of being computed again; otherwise, they are computed to the other robots of the given robot_network.
+    """
+    def set_reliable_and_critical_sets(self, distances = None, robot_ids = None, robot_network = None, context = None):
+        if distances is None and robot_network is None:
+            raise TypeError("the reliable and critical sets of robot {} need either its distances or its robot network".format(
+                self.id))
+        if distances is None:
+            self.compute_reliable_set(robot_network, context)
+            self.compute_critical_set(robot_network, context)
+        else:
+            robot_ids = np.asarray(robot_ids)
+            reliable_mask, critical_mask = classify_distances(np.asarray(distances), context)
+            self.reliable_id_set = robot_ids[reliable_mask & (robot_ids != self.id)].tolist()
+            self.critical_id_set = robot_ids[critical_mask & (robot_ids != self.id)].tolist()
+
+
+    """
+    This overridden function defines the measure of comparability between two instances of Robot class.
+    """
+    def __lt__(self, other):
+        if (len(self.reliable_id_set) < len(other.reliable_id_set)):
+            return True
+        elif (len(self.reliable_id_set) == len(other.reliable_id_set)):
+            return len(self.critical_id_set) < len(other.critical_id_set)
+
+
+    """
+    This overridden function provides a formatted output for the objects of Robot class. 
+    """
+    def __str__(self):
+        return "id: {!s:<5}, location: {!s:<45}, reliable set: {!s:<22}, critical set: {!s:<30}, degree: {}".format(
+            self.id, self.location, self.reliable_id_set, self.critical_id_set, self.degree)
+
+#############################################################################################################
+
+"""
+This class is the exception raised when an orphan robot may not be assigned to any cluster, i.e., none of its peers, which are
+all critical ones, belongs to the backbone cycle or has been assigned to a cluster before it (or all of the backbone robots are
+co-located with it), so its network does not have any cycle topology.
+"""
+class UnassignedOrphanRobotError(ValueError):
+    pass
+
+
+#The exceptions raised for a robot network which does not have any cycle topology.
+no_cycle_topology_errors = (NoCycleError, UnassignedOrphanRobotError)
+
+
+"""
+This class represents cycle topology objects each of which includes a backbone cycle and a set of clusters associated
+with those robots which does not reside on the backbone cycle.
+"""
+class CycleTopology():
+    def __init__(self, backbone_cycle = [], clusters = [], proven_optimal = True):
+        #backbone_cycle is the list of the robot constructing the backbone cycle.
+        self.backbone_cycle = backbone_cycle
+        #clusters include [a, b] lists in which orphan robot 'a' is connected to backbone robot 'b'.
+        self.clusters = clusters
+        #proven_optimal is False if the backbone cycle search ran out of its budget before proving backbone_cycle longest.
+        self.proven_optimal = proven_optimal
+
+
+    """
+    This overridden function makes the objects of the class iterable.
+    """
+    def __iter__(self):
+        yield self.backbone_cycle
+        yield self.clusters
+
+
+    """
+    This overridden function provides a formatted output for the objects of CycleTopology class. 
+    """
+    def __str__(self):
+        return "backbone cycle: {!s:<5}, clusters: {}".format(self.backbone_cycle, self.clusters)
+
+#############################################################################################################
+
+"""
+This function plot a robot network configuration. (matplotlib is only imported here, so the generation itself, e.g., in the
+worker processes, does not pay for importing it.)
+"""
+def plot_locations_of_robot_network(robot_network):
+    import matplotlib.pyplot as plt
+
+    if hasattr(robot_network, "locations"):
+        # the locations of an array-backed robot network (see OpTopNET_RobotNetwork) are already an array
+        locations = robot_network.locations
+    else:
+        ### removing the extra nesting of the robot's list
+        formatted_robot_network = [[attribute for attribute in my_class] for my_class in robot_network]
+        locations = [[subitem for subitem in item[1]] for item in formatted_robot_network]
+    plt.scatter(np.asarray(locations)[:, 0], np.asarray(locations)[:, 1])
+    plt.xlim([0, zone_range])
+    plt.ylim([0, zone_range])
+    plt.show()
+
+
+"""
+This function create a robot network and computes all of the properties of its robot members. Each new robot is placed
+uniformly at random on the part of the field which is within the connectivity distance of the previously-placed robots. The
+"rejection" sampling method draws robots over the whole field until one of them lands on that part, and the "disc_union"
+one directly samples that part (see create_robot_network_by_disc_union_sampling()). Both of them place the robots with the
+same distribution, but they consume the random numbers differently. The robots are drawn from the given context.
+"""
+def create_robot_network(sampling_method = "rejection", context = None):
+    context = get_context(context)
+    if sampling_method == "disc_union":
+        return create_robot_network_by_disc_union_sampling(context = context)
+    elif sampling_method != "rejection":
+        raise ValueError("unknown sampling method {!r}; it must be either 'rejection' or 'disc_union'".format(sampling_method))
+    robot_network = []
+    spatial_index = UniformGrid(get_peer_radii(context)[1] or context.zone_range)
+    first_robot = Robot(context = context)
+    robot_network.append(first_robot)
+    spatial_index.insert(first_robot.location, first_robot)
+    counter = 1
+    number_of_robots_in_network = context.number_of_robots
+    while counter != number_of_robots_in_network:
+        next_robot = Robot(context = context)
+        if next_robot.check_connectivity(robot_network, spatial_index, context):
+            robot_network.append(next_robot)
+            spatial_index.insert(next_robot.location, next_robot)
+            counter += 1
+        else:
+            del next_robot
+            context.reset_robot_ids(counter + 1)
+            instrumentation.count("rejected_robot_draws")
+    return robot_network
+
+
+"""
+This function creates a robot network by sampling each new robot directly from the union of the connectivity discs, i.e., the
+open discs of radius scale_factor*(connectivity_threshold + epsilon), around the previously-placed robots (see
+draw_location_from_disc_union()). The candidates are drawn in vectorized batches of batch_size, and no robot is created for
+the rejected ones.
+"""
+def create_robot_network_by_disc_union_sampling(batch_size = 16, context = None):
+    context = get_context(context)
+    connectivity_radius = get_peer_radii(context)[1]
+    spatial_index = UniformGrid(connectivity_radius or context.zone_range)
+    number_of_robots_in_network = context.number_of_robots
+    locations = np.empty((number_of_robots_in_network, 2))
+    robot_network = []
+    while len(robot_network) != number_of_robots_in_network:
+        if len(robot_network) == 0:
+            robot = Robot(context = context)
+        else:
+            robot = Robot(draw_location_from_disc_union(
+                locations[:len(robot_network)], spatial_index, connectivity_radius, batch_size, context), context = context)
+        locations[len(robot_network)] = robot.location
+        robot_network.append(robot)
+        spatial_index.insert(robot.location, robot)
+    return robot_network
+
+
+"""
+This function draws a location uniformly from the union of the open discs of the radius around the given locations inside
+the field. The spatial_index must index the same locations. As long as the total area of the discs is smaller than that of
+the field, a candidate is drawn by picking one of the discs uniformly and a point uniformly in it. Since a point covered by c
+discs is then c times as likely as one covered by a single disc, the candidate is accepted with probability 1/c, which makes
+the accepted locations uniform over the union. Once the discs overlap so much that their total area exceeds that of the
+field, the candidates are drawn uniformly over the field instead, and accepted if any disc covers them. The random numbers are
+drawn from the given context.
+"""
+def draw_location_from_disc_union(locations, spatial_index, radius, batch_size, context = None):
+    context = get_context(context)
+    random_state, zone_range = context.random_state, context.zone_range
+    sample_the_discs = len(locations)*np.pi*radius**2 < zone_range**2
+    number_of_rejected_draws = 0
+    while True:
+        if sample_the_discs:
+            centers = locations[random_state.randint(len(locations), size=batch_size)]
+            radii = radius*np.sqrt(random_state.uniform(size=batch_size))
+            angles = random_state.uniform(0, 2*np.pi, size=batch_size)
+            candidates = centers + np.column_stack((radii*np.cos(angles), radii*np.sin(angles)))
+            acceptance_draws = random_state.uniform(size=batch_size)
+        else:
+            candidates = random_state.uniform(0, zone_range, size=(batch_size, 2))
+            acceptance_draws = np.zeros(batch_size)
+        inside_the_field = np.all((candidates >= 0) & (candidates < zone_range), axis=1)
+        number_of_rejected_draws += batch_size - np.count_nonzero(inside_the_field)
+        for candidate, acceptance_draw in zip(candidates[inside_the_field].tolist(), acceptance_draws[inside_the_field]):
+            coverage = len(spatial_index.query_radius(candidate, radius, strict = True))
+            if coverage > 0 and acceptance_draw*coverage < 1:
+                instrumentation.count("rejected_robot_draws", int(number_of_rejected_draws))
+                return candidate
+            number_of_rejected_draws += 1
+
+
+"""
+This function computes the distances between each of the given locations and each of the other_locations, i.e., an array of
+shape (len(locations), len(other_locations)), in a single vectorized pass. The arithmetic is the same as that of
+Robot.compute_distance, so the results are identical to the scalar ones.
+"""
+def compute_distances(locations, other_locations):
+    locations = np.asarray(locations, dtype=float).reshape(-1, 2)
+    other_locations = np.asarray(other_locations, dtype=float).reshape(-1, 2)
+    differences = locations[:, np.newaxis, :] - other_locations[np.newaxis, :, :]
+    return np.sqrt(differences[..., 0] ** 2 + differences[..., 1] ** 2)
+
+
+"""
+This function computes the matrix of the pairwise distances between the robots of a network.
+"""
+def compute_distance_matrix(robot_network):
+    locations = [robot.location for robot in robot_network]
+    return compute_distances(locations, locations)
+
+
+"""
+This function returns the masks of the distances which make two robots reliable and critical peers, respectively, under the
+hyper-parameters of the given context.
+"""
+def classify_distances(distances, context = None):
+    reliable_radius, critical_radius = get_peer_radii(context)
+    reliable_mask = distances <= reliable_radius
+    critical_mask = (distances > reliable_radius) & (distances <= critical_radius)
+    return reliable_mask, critical_mask
+
+
+"""
+This function sets the reliable and critical sets of all of the robots of a network at once. The distances are either taken
+from the given distance_matrix or computed in blocks of batch_size rows (all of the rows at once by default), so that the
+memory of the distances of a network of thousands of robots may be bounded. Alternatively, if a spatial index of the robot
+network (in the order of the network, see build_uniform_grid_of_robot_network) is given, only the distances to the robots
+around each robot are computed. The sets are the same as those computed by Robot.set_reliable_and_critical_sets(), in the
+order of the robot network, under the hyper-parameters of the given context.
+"""
+def set_reliable_and_critical_sets_of_robot_network(robot_network, distance_matrix = None, batch_size = None,
+                                                    spatial_index = None, context = None):
+    number_of_robots_in_network = len(robot_network)
+    if number_of_robots_in_network == 0:
+        return
+    if hasattr(robot_network, "compute_reliable_and_critical_sets"):
+        # an array-backed robot network (see OpTopNET_RobotNetwork) stores its sets itself
+        robot_network.compute_reliable_and_critical_sets(batch_size, context)
+        return
+    if spatial_index is not None:
+        set_reliable_and_critical_sets_by_spatial_index(robot_network, spatial_index, context)
+        return
+    robot_ids = np.asarray([robot.id for robot in robot_network])
+    if distance_matrix is None:
+        locations = np.asarray([robot.location for robot in robot_network], dtype=float)
+    if batch_size is None:
+        batch_size = number_of_robots_in_network
+    for first_row in range(0, number_of_robots_in_network, batch_size):
+        last_row = min(first_row + batch_size, number_of_robots_in_network)
+        if distance_matrix is None:
+            distances = compute_distances(locations[first_row:last_row], locations)
+        else:
+            distances = np.asarray(distance_matrix[first_row:last_row])
+        reliable_mask, critical_mask = classify_distances(distances, context)
+        # a robot is not a peer of itself
+        rows = np.arange(last_row - first_row)
+        reliable_mask[rows, first_row + rows] = False
+        critical_mask[rows, first_row + rows] = False
+        for row, robot in enumerate(robot_network[first_row:last_row]):
+            robot.reliable_id_set = robot_ids[reliable_mask[row]].tolist()
+            robot.critical_id_set = robot_ids[critical_mask[row]].tolist()
+
+
+"""
+This function sets the reliable and critical sets of the robots of a network using a spatial index of the network, e.g., a
+uniform grid whose cells are as large as scale_factor*(connectivity_threshold + epsilon).
+"""
+def set_reliable_and_critical_sets_by_spatial_index(robot_network, spatial_index, context = None):
+    locations = np.asarray(spatial_index.locations, dtype=float)
+    robot_ids = np.asarray([robot.id for robot in robot_network])
+    critical_radius = get_peer_radii(context)[1]
+    for index, robot in enumerate(robot_network):
+        candidates = np.asarray(spatial_index.query_candidates(robot.location, critical_radius), dtype=int)
+        candidates = candidates[candidates != index]
+        reliable_mask, critical_mask = classify_distances(
+            compute_distances(robot.location, locations[candidates])[0], context)
+        robot.reliable_id_set = robot_ids[candidates[reliable_mask]].tolist()
+        robot.critical_id_set = robot_ids[candidates[critical_mask]].tolist()
+
+
+"""
+This function sort robots based on the criticality of their connectedness. The larger the cardinality of a reliable set, 
+the higher its priority. If reliable sets' cardinalities are equal, then those of the critical sets decide, say, the larger
+one will be prioritized. This function plays a crucial rule in the expected functionality of the 
+synthesize_ring_topology_for_robot_network(robot_network) function. For more information, please refer to that function's 
+comments.
+"""
+def sort_robot_network(robot_network):
+    if hasattr(robot_network, "sorted"):
+        # an array-backed robot network (see OpTopNET_RobotNetwork) is sorted as a whole
+        return robot_network.sorted()
+    sorted_robot_network = sorted(robot_network, reverse=True)
+    return sorted_robot_network
+
+
+"""
+This function generates the backbone cycle of a robot network. (The links are collected by
+build_adjacency_graph_of_robot_network(), whose AdjacencyGraph is what the topology synthesis uses.)
+"""
+def generate_backbone_cycle_links(robot_network):
+    return build_adjacency_graph_of_robot_network(robot_network).links
+
+
+"""
+This function initializes the degree values of the links of a cycle backbone. The links are either an AdjacencyGraph or a list
+of [node1, node2] links. (The robots which do not have any link keep their degrees.)
+"""
+def update_degrees_of_robot_network(robot_network, links):
+    if isinstance(links, AdjacencyGraph):
+        for robot in robot_network:
+            if robot.id in links.index_of_node:
+                robot.degree = links.get_degree(robot.id)
+        return
+    flat_links = [item for sublist in links for item in sublist]
+    counter = Counter(flat_links)
+    for robot in robot_network:
+        if robot.id in counter:
+            robot.degree = counter[robot.id]
+
+
+"""
+This class indexes a robot network and its backbone cycle for assigning the orphan robots to clusters: the robots by their
+ids, the backbone robots in a set and in the ascending order of their ids, the robots of each degree in the order of the
+network, and (lazily) the robots of each degree in a uniform grid to find the nearest ones among them. The degrees of the
+robots must not change after the index is built. The cells of the grids are as large as the critical radius of the given
+context.
+"""
+class CycleTopologyIndex():
+    def __init__(self, robot_network, backbone_cycle = [], context = None):
+        context = get_context(context)
+        self.cell_size = get_peer_radii(context)[1] or context.zone_range
+        self.robots_by_id = {robot.id: robot for robot in robot_network}
+        self.backbone_id_set = set(backbone_cycle)
+        self.sorted_backbone_ids = sorted(self.backbone_id_set)
+        self.robots_by_degree = {}
+        for robot in robot_network:
+            self.robots_by_degree.setdefault(robot.degree, []).append(robot)
+        self.uniform_grids_by_degree = {}
+
+
+    """
+    This function returns the robots of a degree, in the order of the network.
+    """
+    def get_robots_of_degree(self, degree):
+        return self.robots_by_degree.get(degree, [])
+
+
+    """
+    This function returns the nearest robot of a degree to a location, the first one in the order of the network among the
+    equally near ones.
+    """
+    def find_the_nearest_robot_of_degree(self, degree, location):
+        if degree not in self.uniform_grids_by_degree:
+            self.uniform_grids_by_degree[degree] = build_uniform_grid_of_robot_network(
+                self.get_robots_of_degree(degree), self.cell_size)
+        uniform_grid = self.uniform_grids_by_degree[degree]
+        return uniform_grid.items[uniform_grid.query_nearest(location)]
+
+
+"""
+This function returns the relibale peers (of an orphan robot) on the backbone cycle of their topology. (backbone_cycle may be
+a set of the ids of the backbone robots, which makes each membership test O(1).)
+"""
+def get_reliable_peers_in_cycle(orphan_robot, backbone_cycle):
+    reliable_id_list = []
+    for id in orphan_robot.reliable_id_set:
+        if id in backbone_cycle:
+            reliable_id_list.append(id)
+    return reliable_id_list
+
+
+"""
+This function returns the critical peers (of an orphan robot) on the backbone cycle of their topology. (backbone_cycle may be
+a set of the ids of the backbone robots, which makes each membership test O(1).)
+"""
+def get_critical_peers_in_cycle(orphan_robot, backbone_cycle):
+    critical_id_list = []
+    for id in orphan_robot.critical_id_set:
+        if id in backbone_cycle:
+            critical_id_list.append(id)
+    return critical_id_list
+
+
+"""
+This function returns the peers (given by their ids) of an orphan robot which have been already assigned to clusters, in the
+order of the peers. cluster_ids maps the id of each assigned robot to its cluster.
+"""
+def get_assigned_peers(id_list, cluster_ids):
+    return [id for id in id_list if id in cluster_ids]
+
+
+"""
+This function employs a heuristic estimation for the case none of the peers of an orphan robot has been already assigned to 
+a backbone robot. Using this heuristics, the nearest backbone robot to an orphan robot is found. (Note that the heuristics
+picks the backbone robot with the smallest id among those which are not co-located with the orphan robot. The datasets are
+labeled by this rule, so it is kept. If a CycleTopologyIndex is given, the backbone robots are checked in the ascending order of
+their ids until the first one which is not co-located.)
+"""
+def find_the_nearest_backbone_robot(orphan_robot, robot_network, backbone_cycle, cycle_topology_index = None):
+    if cycle_topology_index is not None:
+        for id in cycle_topology_index.sorted_backbone_ids:
+            if orphan_robot.compute_distance(cycle_topology_index.robots_by_id[id]):
+                return id
+        raise UnassignedOrphanRobotError("all of the backbone robots are co-located with the orphan robot {}".format(
+            orphan_robot.id))
+    backbone_robots = [robot for robot in robot_network for id in backbone_cycle if robot.id == id]
+    nearest_backbone_robot_id = min(robot.id for robot in backbone_robots
+                                    if orphan_robot.compute_distance(robot))
+    return nearest_backbone_robot_id
+
+
+"""
+This function finds the nearesr least-connected peer of a orphan robot residing on the backbone cycle of their topology. 
+(Note that the minimum degree is taken over the given peers, but the nearest robot is picked among all of the robots of the
+network with that degree. The datasets are labeled by this rule, so it is kept.) If a CycleTopologyIndex of the robot
+network is not given, one is built.
+"""
+def get_the_nearest_least_connected_peer_in_cycle(robot_network, id_list, orphan_robot, cycle_topology_index = None):
+    if cycle_topology_index is None:
+        cycle_topology_index = CycleTopologyIndex(robot_network)
+    minimum_degree = min(cycle_topology_index.robots_by_id[id].degree for id in id_list)
+    robots_cycle_with_minimum_degree = cycle_topology_index.get_robots_of_degree(minimum_degree)
+    # If the minimum-degree robot is unique, so the distance constraint may be ignored.
+    if (len(robots_cycle_with_minimum_degree) == 1):
+        return robots_cycle_with_minimum_degree[0].id
+    # else if there are more than one robot with the minimum degree, pick the nearest one to the orphan robot.
+    else:
+        return cycle_topology_index.find_the_nearest_robot_of_degree(minimum_degree, orphan_robot.location).id
+
+
+"""
+The function below computes the cycle topology of a robot network. Please refer to the internal comments to better understand
+the functionality of this routine. (Note that the robot network is sorted in a descending order first by the cardinality of 
+its reliable_id_set and then by that of its critical_id_set. So, this order is also conserved while processing of orphan robots
+to connect them to the backbone cycle of the robot network's topology. Accordingly, the earlier orphan robots are closer to \
+the backbone cycle compared to those which come later to be processed.)
+If time_budget (in seconds) or node_budget is given, the backbone cycle is searched within that budget, and the longest cycle
+found so far is used once the budget runs out, in which case the proven_optimal of the returned topology is False (and a
+SearchBudgetExhaustedError is raised if no cycle was found by then). The orphan robots are assigned to clusters through a
+CycleTopologyIndex of the network, so each assignment costs about as much as the sets of the orphan robot instead of the size
+of the network. If assignment_sources is given, the assignment of each orphan robot is recorded in it (see
+assign_orphan_robots_to_clusters()). The topology only depends on the sets of the robots, so the context only sizes the
+index.
+"""
+def synthesize_cycle_topology_for_robot_network(robot_network, time_budget=None, node_budget=None, assignment_sources=None,
+                                                context=None):
+    cycle_topology = CycleTopology([], [])
+
+    with instrumentation.time_stage("generate_backbone_cycle_links"):
+        #The graph of the links of the backbone cycle
+        backbone_cycle_links = build_adjacency_graph_of_robot_network(robot_network)
+
+        update_degrees_of_robot_network(robot_network, backbone_cycle_links)
+
+    with instrumentation.time_stage("find_the_backbone_cycle"):
+        if time_budget is None and node_budget is None:
+            cycle_topology.backbone_cycle = find_the_backbone_cycle_of_robot_network(backbone_cycle_links)
+        else:
+            backbone_cycle_search = find_the_backbone_cycle_within_budget(backbone_cycle_links, time_budget, node_budget)
+            if backbone_cycle_search.budget_exhausted and not backbone_cycle_search.best_cycle:
+                raise SearchBudgetExhaustedError(
+                    "no backbone cycle was found for the robot network within the search budget")
+            if not backbone_cycle_search.best_cycle:
+                raise NoCycleError("the graph of the robot network does not have any cycle")
+            cycle_topology.backbone_cycle = backbone_cycle_search.best_cycle
+            cycle_topology.proven_optimal = backbone_cycle_search.proven_optimal
+
+    with instrumentation.time_stage("assign_orphan_robots"):
+        assign_orphan_robots_to_clusters(robot_network, cycle_topology, assignment_sources, context)
+    return cycle_topology
+
+
+"""
+This function assigns each robot of the network to a cluster of the cycle topology whose backbone cycle has been found, and
+sorts the clusters by the ids of the robots (see synthesize_cycle_topology_for_robot_network()). If the instrumentation is
+enabled, the orphan robots taking each path of the rules below are counted. If assignment_sources is given, the path and the
+source (see assign_orphan_robot()) of the assignment of each orphan robot are recorded in it by the id of the orphan robot.
+"""
+def assign_orphan_robots_to_clusters(robot_network, cycle_topology, assignment_sources = None, context = None):
+    cycle_topology_index = CycleTopologyIndex(robot_network, cycle_topology.backbone_cycle, context)
+    backbone_id_set = cycle_topology_index.backbone_id_set
+    #cluster_ids maps the id of each robot assigned so far to its cluster.
+    cluster_ids = {}
+
+    #Add each item of backbone cycle as its own cluster to the clusters list
+    for item in cycle_topology.backbone_cycle:
+        cycle_topology.clusters.append([item, item])
+        cluster_ids[item] = item
+
+    #Orphan robots are those which do not belong to the robot network cycle.
+    orphan_robots = [robot for robot in robot_network if (robot.id not in backbone_id_set)]
+    for orphan_robot in orphan_robots:
+        cluster_id, assignment_path, source = assign_orphan_robot(
+            orphan_robot, robot_network, cycle_topology, cycle_topology_index, cluster_ids)
+        instrumentation.count(assignment_path)
+        if assignment_sources is not None:
+            assignment_sources[orphan_robot.id] = assignment_path, source
+        if cluster_id is None:
+            continue
+        cycle_topology.clusters.append([orphan_robot.id, cluster_id])
+        cluster_ids[orphan_robot.id] = cluster_id
+    cycle_topology.clusters = sorted(cycle_topology.clusters, key=lambda id_and_name: id_and_name[0])
+
+
+"""
+This function finds the cluster of an orphan robot given the clusters of the robots assigned before it (cluster_ids). It returns
+the cluster id (None for an orphan robot without any peer, which is not assigned), the path of the rules taken, and the source
+of the cluster: the minimum degree of the peers for the least-connected peer rules, the id of the peer whose cluster is taken
+for the rules of the assigned peers, and None otherwise. An UnassignedOrphanRobotError is raised if the orphan robot may not
+be assigned to any cluster.
+"""
+def assign_orphan_robot(orphan_robot, robot_network, cycle_topology, cycle_topology_index, cluster_ids):
+    backbone_id_set = cycle_topology_index.backbone_id_set
+    if any(orphan_robot.reliable_id_set):
+        # If there is any of the reliable peers of the orphan robot which belong to the cycle
+        reliable_temp = get_reliable_peers_in_cycle(orphan_robot, backbone_id_set)
+        if any(reliable_temp):
+            # the id captured below is indeed the cluster id of the orphan robot
+            # connect the orphan robot to the reliable peer of which owns the least degree
+            return (get_the_nearest_least_connected_peer_in_cycle(
+                        robot_network, reliable_temp, orphan_robot, cycle_topology_index),
+                    "orphans_assigned_to_reliable_backbone_peers",
+                    min(cycle_topology_index.robots_by_id[id].degree for id in reliable_temp))
+        # In this case, none of the reliable peers of the orphan robot belong to the cycle
+        #Does the orphan robot have any reliable peer which has been already assigned to a cluster
+        temp = get_assigned_peers(orphan_robot.reliable_id_set, cluster_ids)
+        # If so, get the list of clusters associated with those peers and assign the orphan robot to the first one of them
+        if any(temp):
+            return cluster_ids[temp[0]], "orphans_assigned_to_clusters_of_reliable_peers", temp[0]
+        # Otherwise, Do the same this time for the critical peers of it
+        temp1 = get_assigned_peers(orphan_robot.critical_id_set, cluster_ids)
+        if any(temp1):
+            return cluster_ids[temp1[0]], "orphans_assigned_to_clusters_of_critical_peers", temp1[0]
+        #If that set is empty, then use the heurisics below, say assign the orphan robot to its nearest backbone
+        #robot
+        return (find_the_nearest_backbone_robot(
+                    orphan_robot, robot_network, cycle_topology.backbone_cycle, cycle_topology_index),
+                "orphans_assigned_to_the_nearest_backbone_robot", None)
+    elif any(orphan_robot.critical_id_set):
+        critical_temp = get_critical_peers_in_cycle(orphan_robot, backbone_id_set)
+        # If there is any of the critical peers of the orphan robot which belong to the cycle
+        if any(critical_temp):
+            # the id captured below is indeed the cluster id of the orphan robot
+            # connect the orphan robot to the critical peer of which owns the least degree
+            return (get_the_nearest_least_connected_peer_in_cycle(
+                        robot_network, critical_temp, orphan_robot, cycle_topology_index),
+                    "orphans_assigned_to_critical_backbone_peers",
+                    min(cycle_topology_index.robots_by_id[id].degree for id in critical_temp))
+        # In this case, none of the critical peers of the orphan robot belong to the cycle
+        #Get its critical peers which been already assigned to clusters
+        temp = get_assigned_peers(orphan_robot.critical_id_set, cluster_ids)
+        if not temp:
+            raise UnassignedOrphanRobotError("none of the critical peers of the orphan robot {} has any cluster".format(
+                orphan_robot.id))
+        #Assign the orphan robot to the cluster
+        return cluster_ids[temp[0]], "orphans_assigned_to_clusters_of_critical_peers", temp[0]
+    return None, "orphans_without_peers", None
+
+
+"""
+This function extracts the locations of the robots of the network.
+"""
+def extract_robot_locations(robot_network):
+    if hasattr(robot_network, "extract_locations"):
+        return robot_network.extract_locations()
+    raw_locations = [robot.location for robot in robot_network]
+    flat_list = [item for sublist in raw_locations for item in sublist]
+    return flat_list
+
+
+"""
+This function extracts the cycle clusters of the topology of a robot network.
+"""
+def extract_cycle_clusters(cycle_topology):
+    return [item[1] for item in cycle_topology.clusters]
+
+
+"""
+This helper function creates a time-stamped name for the dataset csv file (or the binary dataset directory).
+"""
+def create_dataset_file_name(number_of_robots, dataset_format = "csv"):
+    return "cycle_Topo_dataset_"+str(number_of_robots)+"___"+datetime.now().strftime("%Y_%m_%d-%I_%M_%S_%p")+(
+        ".csv" if dataset_format == "csv" else "")
+
+
+"""
+This function opens the writer of a dataset in the given format ("csv" or "binary"), which resumes the dataset from its last
+checkpoint if it has any. The hyper-parameters of the data generator (of the given context) are recorded in the metadata of the
+binary datasets.
+"""
+def open_dataset_writer(file_name, dataset_format, state, context = None):
+    context = get_context(context)
+    if dataset_format == "csv":
+        return CSVDatasetWriter(file_name, context.number_of_robots, state, checkpoint_interval=context.checkpoint_interval,
+                                resume=True)
+    elif dataset_format == "binary":
+        return BinaryDatasetWriter(file_name, context.number_of_robots, state, context.get_hyper_parameters(),
+                                   checkpoint_interval=context.checkpoint_interval, resume=True)
+    raise ValueError("unknown dataset format {!r}; it must be either 'csv' or 'binary'".format(dataset_format))
+
+
+"""
+This function wraps the data into a csv dataset file/
+"""
+def create_cycle_Topo_dataset(robots_locations, cycles_clusters):
+    header = create_header(len(robots_locations[0])//2)
+
+    with open(create_dataset_file_name(len(robots_locations[0])//2), "w", newline="") as f:
+        writer = csv.writer(f, delimiter=" ")
+        writer.writerow(header)
+        for robot_location, cycle_cluster in zip(robots_locations, cycles_clusters):
+            writer.writerow(robot_location + cycle_cluster)
+
+
+"""
+This function returns the current values of the hyper-parameters of the data generator.
+"""
+def get_hyper_parameters():
+    return {name: globals()[name] for name in hyper_parameter_names}
+
+
+"""
+This function sets the hyper-parameters of the data generator, e.g., in a worker process of generate_configurations().
+"""
+def set_hyper_parameters(hyper_parameters):
+    unknown_names = set(hyper_parameters) - set(hyper_parameter_names)
+    if unknown_names:
+        raise ValueError("unknown hyper-parameters: {}".format(sorted(unknown_names)))
+    globals().update(hyper_parameters)
+
+
+"""
+This function counts an event of the generation, e.g., a configuration drawn again, in the instrumentation and in the
+statistics of the run, if given.
+"""
+def count_generation_statistic(name, statistics = None, increment = 1):
+    instrumentation.count(name, increment)
+    if statistics is not None:
+        statistics[name] = statistics.get(name, 0) + increment
+
+
+"""
+This function adds the statistics of a part of a run, e.g., of a configuration generated in a worker process, to those of the
+run. (The counters are added up, and the lists, e.g., of the indices of the records, are concatenated.)
+"""
+def merge_generation_statistics(statistics, other_statistics):
+    for name, value in other_statistics.items():
+        statistics[name] = statistics[name] + value if name in statistics else value
+
+
+"""
+This function generates a configuration, i.e., a robot network, and computes its cycle topology. It returns the locations of
+the robots of the configuration and their clusters, say, a record of the dataset. A configuration whose network does not have
+any topology, i.e., any backbone cycle (acyclic_configurations), any backbone cycle found within the budget of the search
+(configurations_without_cycle_within_budget) or any cluster of one of its orphan robots
+(configurations_with_unassigned_orphan_robots), is drawn again, and counted by its reason and as one of the
+redrawn_configurations in the statistics, if given, and in the instrumentation. A record whose backbone cycle is only the best
+one found within the budget is counted as one of the labels_not_proven_optimal. The configuration is drawn from the given
+context with its hyper-parameters, so contexts of their own may generate configurations concurrently.
+"""
+def generate_configuration(context = None, statistics = None):
+    context = get_context(context)
+    while True:
+        context.reset_robot_ids()
+
+        with instrumentation.time_stage("create_robot_network"):
+            robot_network = create_robot_network(context.sampling_method, context)
+
+        with instrumentation.time_stage("set_reliable_and_critical_sets"):
+            set_reliable_and_critical_sets_of_robot_network(robot_network, context = context)
+
+            sorted_robot_network = sort_robot_network(robot_network)
+
+        try:
+            with instrumentation.time_stage("synthesize_cycle_topology"):
+                cycle_topology = synthesize_cycle_topology_for_robot_network(
+                    sorted_robot_network, context.time_budget, context.node_budget, context = context)
+        except no_cycle_topology_errors as error:
+            count_generation_statistic("redrawn_configurations", statistics)
+            if isinstance(error, SearchBudgetExhaustedError):
+                count_generation_statistic("configurations_without_cycle_within_budget", statistics)
+            elif isinstance(error, NoCycleError):
+                count_generation_statistic("acyclic_configurations", statistics)
+            else:
+                count_generation_statistic("configurations_with_unassigned_orphan_robots", statistics)
+            continue
+
+        if not cycle_topology.proven_optimal:
+            count_generation_statistic("labels_not_proven_optimal", statistics)
+
+        return extract_robot_locations(sorted_robot_network), extract_cycle_clusters(cycle_topology)
+
+
+"""
+This function generates the configuration of the given index in the given context using its own seed, which is spawned from
+the entropy of the master seed (the same as the index-th child of np.random.SeedSequence(entropy).spawn(...)). So, a
+configuration only depends on the master seed and its index. Without a context, the configuration is generated in a new one
+with the current hyper-parameters of the data generator. The statistics of its generation (see generate_configuration()) are
+added to the given statistics, if any, where the index of the configuration is also appended to records_not_proven_optimal if
+its backbone cycle is not proven longest.
+"""
+def generate_seeded_configuration(entropy_and_index, context = None, statistics = None):
+    context = create_context(context)
+    entropy, index = entropy_and_index
+    context.seed_configuration(entropy, index)
+    configuration_statistics = {}
+    record = generate_configuration(context, configuration_statistics)
+    if configuration_statistics.get("labels_not_proven_optimal"):
+        configuration_statistics["records_not_proven_optimal"] = [index]
+    if statistics is not None:
+        merge_generation_statistics(statistics, configuration_statistics)
+    return record
+
+
+#The context of the run of a worker process of generate_configurations() (see initialize_worker()).
+worker_context = None
+
+
+"""
+This function generates a seeded configuration in the context of a worker process, and returns its record together with the
+statistics of its generation and, if the instrumentation is enabled, the timers and the counters collected meanwhile, so the
+main process may merge them into its own.
+"""
+def generate_worker_configuration(entropy_and_index):
+    statistics = {}
+    record = generate_seeded_configuration(entropy_and_index, worker_context, statistics)
+    return record, statistics, instrumentation.collect() if instrumentation.enabled else None
+
+
+"""
+This function initializes a worker process of generate_configurations() with the context of the run, i.e., of its
+hyper-parameters, and the state of the instrumentation of the main process.
+"""
+def initialize_worker(hyper_parameters, instrumentation_enabled):
+    global worker_context
+    worker_context = GenerationContext(hyper_parameters)
+    if instrumentation_enabled:
+        instrumentation.enable()
+
+
+"""
+This function generates the records of the configurations first_index, ..., number_of_configurations - 1 seeded by the master
+seed, and yields them in the order of the configurations. The configurations are generated in a context of their own (see
+GenerationContext) with the hyper-parameters of the given context (those of the data generator by default) when the run
+starts, so neither np.random nor the state of the data generator is used. If number_of_workers is larger than one, the
+configurations are generated by a pool of processes, each of which receives those hyper-parameters. Since the seed of each
+configuration is spawned from the master seed, the records are identical whatever the number of workers is. (If the
+instrumentation is enabled, the timers and the counters of the workers are merged into those of the main process, so their
+stage times add up the time spent by all of the workers.) The statistics of the generation (see generate_configuration())
+are added to the given statistics as the records are yielded.
+"""
+def generate_configurations(number_of_configurations, master_seed, number_of_workers = 1, first_index = 0, chunk_size = 16,
+                            context = None, statistics = None):
+    if statistics is None:
+        statistics = {}
+    hyper_parameters = get_context(context).get_hyper_parameters()
+    entropy = np.random.SeedSequence(master_seed).entropy
+    tasks = ((entropy, index) for index in range(first_index, number_of_configurations))
+    if number_of_workers <= 1:
+        run_context = GenerationContext(hyper_parameters)
+        for task in tasks:
+            yield generate_seeded_configuration(task, run_context, statistics)
+    else:
+        with multiprocessing.Pool(number_of_workers, initializer=initialize_worker,
+                                  initargs=(hyper_parameters, instrumentation.enabled)) as pool:
+            for record, configuration_statistics, snapshot in pool.imap(generate_worker_configuration, tasks,
+                                                                        chunksize=chunk_size):
+                merge_generation_statistics(statistics, configuration_statistics)
+                if snapshot is not None:
+                    instrumentation.merge(snapshot)
+                yield record
+
+
+"""
+This function generates the dataset of the hyper-parameters of the given context (those of the data generator by default, see
+set_hyper_parameters()), or resumes it from its last checkpoint, and returns the name of its file. The hyper-parameters are
+taken into a context of the run when it starts, so changing those of the data generator meanwhile does not affect it. The
+statistics of the generation (see generate_configuration()) are kept in the state of the dataset, i.e., in its checkpoint (or
+its metadata), so they cover all of its records even if it is resumed, and they are printed at the end.
+"""
+def generate_dataset(context = None):
+    context = GenerationContext(get_context(context).get_hyper_parameters())
+    file_name = (create_dataset_file_name(context.number_of_robots, context.dataset_format)
+                 if context.dataset_file_name is None else context.dataset_file_name)
+
+    seed = np.random.SeedSequence().entropy if context.master_seed is None else context.master_seed
+
+    # the progress file is closed, and the instrumentation turned back off, even if the generation fails
+    instrumentation_enabled = instrumentation.enabled
+    progress_file = None
+    try:
+        if context.progress_file_name is not None:
+            progress_file = open(context.progress_file_name, "a")
+            instrumentation.enable()
+
+        with open_dataset_writer(file_name, context.dataset_format, {"master_seed": seed, "statistics": {}},
+                                 context) as writer:
+
+            # The master seed of a resumed dataset is that of its checkpoint.
+            seed = writer.state["master_seed"]
+            statistics = writer.state.setdefault("statistics", {})
+            counter = writer.number_of_records
+
+            if counter > 0:
+                print("Resuming the dataset {} from the configuration number {}.".format(file_name, counter + 1))
+            print("The master seed of this dataset is {}.".format(seed))
+
+            progress_reporter = None
+            if progress_file is not None:
+                progress_reporter = ProgressReporter(progress_file, context.number_of_configurations, counter,
+                                                     context.progress_interval)
+
+            for robot_location, cycle_cluster in generate_configurations(
+                    context.number_of_configurations, seed, context.number_of_workers, first_index=counter,
+                    context=context, statistics=statistics):
+
+                writer.write_record(robot_location, cycle_cluster)
+
+                counter = counter + 1
+
+                log_the_dataset_creation_process(counter, context)
+
+                if progress_reporter is not None:
+                    progress_reporter.update(counter)
+
+            if progress_reporter is not None:
+                progress_reporter.close(counter)
+
+        log_the_statistics_of_the_dataset(statistics)
+    finally:
+        if progress_file is not None:
+            progress_file.close()
+        if not instrumentation_enabled:
+            instrumentation.disable()
+
+    return file_name
+
+
+"""
+This function logs the progression of the accumulation of records in the csv dataset.
+"""
+def log_the_dataset_creation_process(counter, context = None):
+    if counter%10 == 0 and counter > 0:
+        print("The configuration number {}/{} is just added to the dataset.".format(
+            counter, get_context(context).number_of_configurations))
+
+
+"""
+This function logs the statistics of the generation of the dataset, i.e., the configurations drawn again and the records whose
+backbone cycles are not proven longest (whose indices are kept in the state of the dataset).
+"""
+def log_the_statistics_of_the_dataset(statistics):
+    if statistics.get("redrawn_configurations", 0) > 0:
+        print("{} configurations were drawn again since they had no topology ({} acyclic, {} without any cycle found within "
+              "the search budget, {} with unassigned orphan robots).".format(
+                  statistics["redrawn_configurations"], statistics.get("acyclic_configurations", 0),
+                  statistics.get("configurations_without_cycle_within_budget", 0),
+                  statistics.get("configurations_with_unassigned_orphan_robots", 0)))
+    if statistics.get("labels_not_proven_optimal", 0) > 0:
+        print("The backbone cycles of {} records are not proven longest within the search budget.".format(
+            statistics["labels_not_proven_optimal"]))
+
+###################################################################################################################
+###################################################################################################################
+###################################################################################################################
+
+"""
+Here is the main function of this data generator. (The hyper-parameters may also be given on the command line, see
+OpTopNET_CommandLine.)
+"""
+if __name__ == "__main__":
+
+    generate_dataset()
@@ -0,0 +1,350 @@
+"""
+This file streams the records of a dataset into its file as soon as their configurations are generated. The records are
+appended in buffered batches, and a checkpoint, i.e., the number of the records written so far, the size of the file at that
+point, and the state needed to generate the next records (e.g., the master seed), is recorded next to the file every once in a
+while. So, an interrupted run may resume from its last checkpoint instead of starting over.
+
+Two formats are supported: the space-delimited csv file with the header created by create_header(), and a binary columnar
+dataset, i.e., a directory holding the locations and the clusters of the records as two raw fixed-width arrays next to a
+metadata file (see BinaryDatasetWriter). The latter may be opened with np.memmap without parsing or copying anything.
+"""
+
+import csv
+import io
+import json
+import os
+
+import numpy as np
+
+
+"""
+This helper function creates the header of the dataset csv fine.
+"""
+def create_header(number_of_robots):
+    header = []
+    for i in range(1, number_of_robots + 1):
+        header.append("X" + str(i))
+        header.append("Y" + str(i))
+    for i in range(1, number_of_robots + 1):
+        header.append("C" + str(i))
+    return header
+
+
+"""
+This function returns the name of the checkpoint file of a dataset file.
+"""
+def get_checkpoint_file_name(file_name):
+    return file_name + ".checkpoint"
+
+
+"""
+This function reads a json file, or returns None if it does not exist.
+"""
+def read_json_file(file_name):
+    try:
+        with open(file_name) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+"""
+This function writes a json file into a temporary file first and then renames it, so an interruption never leaves a corrupted
+file behind.
+"""
+def write_json_file_atomically(file_name, content):
+    temporary_file_name = file_name + ".tmp"
+    with open(temporary_file_name, "w") as f:
+        json.dump(content, f)
+    os.replace(temporary_file_name, file_name)
+
+
+"""
+This function reads the checkpoint of a dataset csv file, or returns None if it does not have any.
+"""
+def read_checkpoint(file_name):
+    return read_json_file(get_checkpoint_file_name(file_name))
+
+
+"""
+This class holds what the dataset writers have in common: the records are buffered and written in batches of buffer_size,
+and a checkpoint is recorded every checkpoint_interval records. Each writer implements write_records(records),
+flush_files(), record_checkpoint() and close_files().
+"""
+class DatasetWriter():
+    def __init__(self, number_of_robots, buffer_size, checkpoint_interval):
+        self.number_of_robots = number_of_robots
+        self.buffer_size = buffer_size
+        self.checkpoint_interval = checkpoint_interval
+        self.buffer = []
+        self.records_since_checkpoint = 0
+        self.closed = False
+
+
+    """
+    This function appends a record, i.e., the locations of the robots of a configuration and their clusters, to the dataset.
+    """
+    def write_record(self, robot_location, cycle_cluster):
+        self.buffer.append((robot_location, cycle_cluster))
+        self.number_of_records += 1
+        self.records_since_checkpoint += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+        if self.records_since_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+
+
+    """
+    This function writes the buffered records into the file(s).
+    """
+    def flush(self):
+        if self.buffer:
+            self.write_records(self.buffer)
+            self.buffer = []
+        self.flush_files()
+
+
+    """
+    This function records a checkpoint of the dataset.
+    """
+    def checkpoint(self):
+        self.flush()
+        self.record_checkpoint()
+        self.records_since_checkpoint = 0
+
+
+    """
+    This function writes the remaining records, records the final checkpoint, and closes the file(s).
+    """
+    def close(self):
+        if not self.closed:
+            self.checkpoint()
+            self.close_files()
+            self.closed = True
+
+
+    """
+    This overridden function makes the writer usable as a context manager.
+    """
+    def __enter__(self):
+        return self
+
+
+    """
+    This overridden function closes the writer at the end of its context, so the records written so far are kept even if the
+    generation is interrupted.
+    """
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.close()
+
+
+"""
+This class writes the records of a dataset into a space-delimited csv file with the header created by create_header(). If
+resume is True and the file has a checkpoint, the file is truncated to its last checkpoint, the writing continues from there,
+and the state of that checkpoint is restored; otherwise, the file is created from scratch with the given state. (An existing
+file without any checkpoint is not overwritten when resuming, since it may not be told apart from a dataset of another run: a
+FileExistsError is raised instead.)
+"""
+class CSVDatasetWriter(DatasetWriter):
+    def __init__(self, file_name, number_of_robots, state = None, buffer_size = 1000, checkpoint_interval = 10000,
+                 resume = False):
+        DatasetWriter.__init__(self, number_of_robots, buffer_size, checkpoint_interval)
+        self.file_name = file_name
+        checkpoint = read_checkpoint(file_name) if resume else None
+        if resume and checkpoint is None and os.path.exists(file_name):
+            raise FileExistsError("{} exists but does not have any checkpoint to resume from, so it is not overwritten".format(
+                file_name))
+        if checkpoint is not None:
+            if checkpoint["number_of_robots"] != number_of_robots:
+                raise ValueError("the checkpoint of {} is for {} robots, not {}".format(
+                    file_name, checkpoint["number_of_robots"], number_of_robots))
+            self.number_of_records = checkpoint["number_of_records"]
+            self.state = checkpoint["state"]
+            # the records written after the checkpoint may be incomplete, so they are generated again (the file is opened in
+            # binary mode to keep its offsets exact)
+            self.file = open(file_name, "r+b")
+            self.file.truncate(checkpoint["offset"])
+            self.file.seek(checkpoint["offset"])
+        else:
+            self.number_of_records = 0
+            self.state = state
+            self.file = open(file_name, "wb")
+            self.write_rows([create_header(number_of_robots)])
+            self.checkpoint()
+
+
+    """
+    This function encodes rows the same way csv.writer(f, delimiter=" ") does and writes them into the file.
+    """
+    def write_rows(self, rows):
+        text = io.StringIO()
+        csv.writer(text, delimiter=" ").writerows(rows)
+        self.file.write(text.getvalue().encode())
+
+
+    """
+    This function writes records into the csv file.
+    """
+    def write_records(self, records):
+        self.write_rows([robot_location + cycle_cluster for robot_location, cycle_cluster in records])
+
+
+    """
+    This function flushes the csv file.
+    """
+    def flush_files(self):
+        self.file.flush()
+
+
+    """
+    This function records the number of the records and the size of the csv file in the checkpoint file.
+    """
+    def record_checkpoint(self):
+        os.fsync(self.file.fileno())
+        write_json_file_atomically(get_checkpoint_file_name(self.file_name), {
+            "number_of_robots": self.number_of_robots, "number_of_records": self.number_of_records,
+            "offset": self.file.tell(), "state": self.state})
+
+
+    """
+    This function closes the csv file.
+    """
+    def close_files(self):
+        self.file.close()
+
+
+"""
+This class writes the records of a dataset into a binary columnar dataset, i.e., a directory including
+    locations.bin: the locations of the robots of the records as a raw (number_of_records, 2*number_of_robots) array of
+                   location_dtype (float64 by default, the same precision as the locations are generated and labeled
+                   with), in the order of the columns X1, Y1, ..., XN, YN of the csv file,
+    clusters.bin:  the clusters of the robots of the records as a raw (number_of_records, number_of_robots) array of int16 (or
+                   int32 for more than 32767 robots), in the order of the columns C1, ..., CN of the csv file,
+    metadata.json: the number of the robots and the records, the data types of the arrays, the given metadata (e.g., the
+                   hyper-parameters of the data generator) and the state needed to resume the generation (e.g., the seed).
+The metadata file is rewritten at every checkpoint, so it always describes the records which have been completely written.
+If resume is True and the dataset already exists, the arrays are truncated to that number of records and the writing
+continues from there. (An existing file or non-empty directory without any metadata file is not overwritten when resuming: a
+FileExistsError is raised instead.)
+"""
+class BinaryDatasetWriter(DatasetWriter):
+    def __init__(self, directory_name, number_of_robots, state = None, metadata = None, buffer_size = 1000,
+                 checkpoint_interval = 10000, resume = False, location_dtype = "<f8"):
+        DatasetWriter.__init__(self, number_of_robots, buffer_size, checkpoint_interval)
+        self.directory_name = directory_name
+        existing_metadata = read_binary_dataset_metadata(directory_name) if resume else None
+        if resume and existing_metadata is None and os.path.exists(directory_name) and (
+                not os.path.isdir(directory_name) or os.listdir(directory_name)):
+            raise FileExistsError("{} exists but is not a binary dataset to resume from, so it is not overwritten".format(
+                directory_name))
+        if existing_metadata is not None:
+            if existing_metadata["number_of_robots"] != number_of_robots:
+                raise ValueError("the binary dataset {} is for {} robots, not {}".format(
+                    directory_name, existing_metadata["number_of_robots"], number_of_robots))
+            self.metadata = existing_metadata
+            self.number_of_records = existing_metadata["number_of_records"]
+            self.state = existing_metadata["state"]
+            mode = "r+b"
+        else:
+            os.makedirs(directory_name, exist_ok=True)
+            self.metadata = {"format": "OpTopNET binary dataset", "version": 1, "number_of_robots": number_of_robots,
+                             "number_of_records": 0, "location_dtype": np.dtype(location_dtype).str,
+                             "cluster_dtype": np.dtype("<i2" if number_of_robots < 2**15 else "<i4").str,
+                             "metadata": metadata, "state": state}
+            self.number_of_records = 0
+            self.state = state
+            mode = "wb"
+        self.location_dtype = np.dtype(self.metadata["location_dtype"])
+        self.cluster_dtype = np.dtype(self.metadata["cluster_dtype"])
+        self.locations_file = open(os.path.join(directory_name, "locations.bin"), mode)
+        self.clusters_file = open(os.path.join(directory_name, "clusters.bin"), mode)
+        for f, row_size in ((self.locations_file, 2*number_of_robots*self.location_dtype.itemsize),
+                            (self.clusters_file, number_of_robots*self.cluster_dtype.itemsize)):
+            f.truncate(self.number_of_records*row_size)
+            f.seek(self.number_of_records*row_size)
+        if existing_metadata is None:
+            self.checkpoint()
+
+
+    """
+    This function appends the locations and the clusters of records to their arrays.
+    """
+    def write_records(self, records):
+        self.locations_file.write(np.asarray([robot_location for robot_location, _ in records],
+                                             dtype=self.location_dtype).tobytes())
+        self.clusters_file.write(np.asarray([cycle_cluster for _, cycle_cluster in records],
+                                            dtype=self.cluster_dtype).tobytes())
+
+
+    """
+    This function appends many records at once, given as the array of their locations, of shape (number_of_records,
+    2*number_of_robots), and that of their clusters, of shape (number_of_records, number_of_robots), e.g., a chunk of a dataset
+    being preprocessed.
+    """
+    def write_arrays(self, locations, clusters):
+        if len(locations) != len(clusters):
+            raise ValueError("the numbers of the locations ({}) and the clusters ({}) of the records differ".format(
+                len(locations), len(clusters)))
+        self.flush()
+        self.locations_file.write(np.ascontiguousarray(locations, dtype=self.location_dtype).tobytes())
+        self.clusters_file.write(np.ascontiguousarray(clusters, dtype=self.cluster_dtype).tobytes())
+        self.number_of_records += len(locations)
+        self.records_since_checkpoint += len(locations)
+        if self.records_since_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+
+
+    """
+    This function flushes the array files.
+    """
+    def flush_files(self):
+        self.locations_file.flush()
+        self.clusters_file.flush()
+
+
+    """
+    This function records the number of the records in the metadata file.
+    """
+    def record_checkpoint(self):
+        os.fsync(self.locations_file.fileno())
+        os.fsync(self.clusters_file.fileno())
+        self.metadata["number_of_records"] = self.number_of_records
+        self.metadata["state"] = self.state
+        write_json_file_atomically(os.path.join(self.directory_name, "metadata.json"), self.metadata)
+
+
+    """
+    This function closes the array files.
+    """
+    def close_files(self):
+        self.locations_file.close()
+        self.clusters_file.close()
+
+
+"""
+This function reads the metadata of a binary dataset, or returns None if it does not exist.
+"""
+def read_binary_dataset_metadata(directory_name):
+    return read_json_file(os.path.join(directory_name, "metadata.json"))
+
+
+"""
+This function opens a binary dataset written by BinaryDatasetWriter without reading it: it returns the locations and the
+clusters of its records as np.memmap arrays of shapes (number_of_records, 2*number_of_robots) and (number_of_records,
+number_of_robots), respectively, and its metadata.
+"""
+def open_binary_dataset(directory_name, mode = "r"):
+    metadata = read_binary_dataset_metadata(directory_name)
+    if metadata is None:
+        raise FileNotFoundError("{} is not a binary dataset, since it does not include metadata.json".format(directory_name))
+    number_of_robots = metadata["number_of_robots"]
+    number_of_records = metadata["number_of_records"]
+    arrays = []
+    for file_name, dtype, number_of_columns in (("locations.bin", metadata["location_dtype"], 2*number_of_robots),
+                                                 ("clusters.bin", metadata["cluster_dtype"], number_of_robots)):
+        if number_of_records == 0:
+            arrays.append(np.empty((0, number_of_columns), dtype=dtype))
+        else:
+            arrays.append(np.memmap(os.path.join(directory_name, file_name), dtype=dtype, mode=mode,
+                                    shape=(number_of_records, number_of_columns)))
+    return arrays[0], arrays[1], metadata
@@ -0,0 +1,100 @@
+"""
+This file provides the compressed adjacency of the graph of the backbone cycle links of a robot network. The links used to be
+kept as a list of [node1, node2] lists, which took a scan of the whole list to check whether a link was new and to find the
+neighbors of a node. An AdjacencyGraph holds the same links deduplicated, and the indices of the neighbors of each node in
+a list, i.e., the neighbors of the i-th node are [nodes[j] for j in neighbor_lists[i]], so expanding a node costs as much as
+its degree. The degrees are kept in a CSR-style offset array, i.e., the degree of the i-th node is indptr[i + 1] - indptr[i].
+(The cycle finder walks the neighbor lists in Python, where indexing a list is cheaper than slicing a numpy array, so the
+neighbors are not kept in a flat CSR array too.)
+
+The nodes are indexed in the order of their first appearance in the links, and the neighbors of each node keep the order of
+the links they come from. The cycle finder relies on both orders to break the ties between equally long cycles the same way
+the enumeration over the list of links does.
+"""
+
+import numpy as np
+
+
+class AdjacencyGraph():
+    def __init__(self, links = []):
+        #nodes[i] is the robot id of the i-th node, in the order of their first appearance in the links.
+        self.nodes = []
+        self.index_of_node = {}
+        #links holds the deduplicated [node1, node2] links in their order.
+        self.links = []
+        neighbor_lists = []
+        linked_pairs = set()
+        for node1, node2 in links:
+            for node in (node1, node2):
+                if node not in self.index_of_node:
+                    self.index_of_node[node] = len(self.nodes)
+                    self.nodes.append(node)
+                    neighbor_lists.append([])
+            if node1 == node2 or (node1, node2) in linked_pairs or (node2, node1) in linked_pairs:
+                continue
+            linked_pairs.add((node1, node2))
+            self.links.append([node1, node2])
+            index1, index2 = self.index_of_node[node1], self.index_of_node[node2]
+            neighbor_lists[index1].append(index2)
+            neighbor_lists[index2].append(index1)
+        self.neighbor_lists = neighbor_lists
+        self.indptr = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        np.cumsum([len(neighbors) for neighbors in neighbor_lists], out=self.indptr[1:])
+
+
+    """
+    This function returns the indices of the neighbors of the i-th node, in the order of their links.
+    """
+    def get_neighbor_indices(self, index):
+        return self.neighbor_lists[index]
+
+
+    """
+    This function returns the neighbors of a node, in the order of their links.
+    """
+    def get_neighbors(self, node):
+        index = self.index_of_node.get(node)
+        if index is None:
+            return []
+        return [self.nodes[neighbor] for neighbor in self.neighbor_lists[index]]
+
+
+    """
+    This function returns the degree of a node, i.e., the number of its links.
+    """
+    def get_degree(self, node):
+        index = self.index_of_node.get(node)
+        if index is None:
+            return 0
+        return int(self.indptr[index + 1] - self.indptr[index])
+
+
+    """
+    This function returns the degrees of the nodes, in the order of the nodes.
+    """
+    def get_degrees(self):
+        return np.diff(self.indptr)
+
+
+    """
+    This overridden function returns the number of the links of the graph.
+    """
+    def __len__(self):
+        return len(self.links)
+
+
+    """
+    This overridden function makes the graph iterable over its links, like the list of links it replaces.
+    """
+    def __iter__(self):
+        return iter(self.links)
+
+
+"""
+This function builds the adjacency graph of the backbone cycle links of a robot network, i.e., the links between each robot
+and its reliable peers. The links are the same, and in the same order, as those generate_backbone_cycle_links() used to
+collect by scanning the list of links for each new link: the link [robot.id, peer] is added, in the order of the network and
+of the reliable set of the robot, unless the link [peer, robot.id] has been added before.
+"""
+def build_adjacency_graph_of_robot_network(robot_network):
+    return AdjacencyGraph([robot.id, peer] for robot in robot_network for peer in robot.reliable_id_set)
@@ -0,0 +1,222 @@
+"""
+This file labels the same configurations under many combinations of connectivity_threshold, epsilon and scale_factor. The
+configurations are sampled once, and the distances between the pairs of the robots of each configuration are computed and
+sorted once. Since the reliable (critical) peers of a combination are the pairs not farther than
+scale_factor*connectivity_threshold (scale_factor*(connectivity_threshold + epsilon)), the reliable and critical sets of a
+configuration under a combination are given by two binary searches on its sorted distances, i.e., by the numbers of the
+pairs within the two radii. Two combinations with the same numbers of pairs give the configuration the same sets, hence the
+same sorted network and the same topology, so the topology of a configuration is only synthesized once per distinct pair of
+numbers and reused by the other combinations.
+
+The records of each combination are those generate_configuration() would give for the configurations under its
+hyper-parameters, except that the cluster of an orphan robot without any peer, which does not have any, is 0 as in
+label_configurations(), so all of the records have the same columns. They are written either into one dataset per
+combination, whose name is tagged with the combination, or into a single csv file whose rows start with the combination (see
+write_sweep_datasets()).
+"""
+
+import csv
+import itertools
+from datetime import datetime
+
+import numpy as np
+
+import OpTopNET_DataGenerator as data_generator
+from OpTopNET_BatchLabeling import compute_sorted_orders, build_sorted_robot_network, sample_configurations
+from OpTopNET_DatasetIO import create_header
+
+"""
+Hyper-parameters
+
+connectivity_thresholds:  the values of connectivity_threshold swept
+epsilons:                 the values of epsilon swept
+scale_factors:            the values of scale_factor swept
+number_of_configurations: the number of the configurations sampled (with the hyper-parameters of the data generator)
+dataset_format:           the format of the datasets of the combinations ("csv" or "binary"), or "tagged" for a single csv
+                          file whose rows start with their combination
+"""
+connectivity_thresholds = [0.4, 0.5, 0.6]
+epsilons = [0.1, 0.2]
+scale_factors = [0.1, 0.2]
+number_of_configurations = 100
+dataset_format = "csv"
+
+#The names of the swept hyper-parameters, in the order of the tags of the records.
+swept_hyper_parameter_names = ["connectivity_threshold", "epsilon", "scale_factor"]
+
+
+"""
+This function returns the combinations of the swept hyper-parameters as dictionaries.
+"""
+def get_sweep_combinations(connectivity_thresholds = connectivity_thresholds, epsilons = epsilons,
+                           scale_factors = scale_factors):
+    return [dict(zip(swept_hyper_parameter_names, values))
+            for values in itertools.product(connectivity_thresholds, epsilons, scale_factors)]
+
+
+"""
+This function creates the context (see GenerationContext) of a combination, i.e., the hyper-parameters of the given context
+(those of the data generator by default) updated by the combination and the number of the robots of the configurations.
+"""
+def create_combination_context(combination, number_of_robots_in_network, context = None):
+    hyper_parameters = data_generator.get_context(context).get_hyper_parameters()
+    hyper_parameters.update(combination, number_of_robots=number_of_robots_in_network)
+    return data_generator.GenerationContext(hyper_parameters)
+
+
+"""
+This function computes the distances between the pairs of the robots of a batch of configurations, given as a (B, N, 2) array,
+the same way as compute_distances() does, and sorts them. It returns the (B, M) sorted distances of the M = N(N - 1)/2 pairs
+of each configuration, and the (B, M) indices of the pairs in that order (see np.triu_indices(N, 1)).
+"""
+def compute_sorted_pair_distances(locations):
+    first_robots, second_robots = np.triu_indices(locations.shape[1], 1)
+    differences = locations[:, first_robots, :] - locations[:, second_robots, :]
+    distances = np.sqrt(differences[..., 0] ** 2 + differences[..., 1] ** 2)
+    pair_orders = np.argsort(distances, axis=1, kind="stable")
+    return np.take_along_axis(distances, pair_orders, axis=1), pair_orders
+
+
+"""
+This function returns the numbers of the pairs of each configuration whose distances are not larger than a radius, by a
+binary search on its sorted distances.
+"""
+def count_pairs_within(sorted_distances, radius):
+    return np.asarray([np.searchsorted(row, radius, side="right") for row in sorted_distances])
+
+
+"""
+This function builds the (N, N) reliable and critical masks of a configuration from the indices of its pairs in the order of
+their distances and the numbers of its reliable pairs and of its reliable and critical pairs.
+"""
+def build_masks_of_pairs(pair_order, number_of_robots_in_network, number_of_reliable_pairs, number_of_peer_pairs):
+    first_robots, second_robots = np.triu_indices(number_of_robots_in_network, 1)
+    masks = []
+    for pairs in (pair_order[:number_of_reliable_pairs], pair_order[number_of_reliable_pairs:number_of_peer_pairs]):
+        mask = np.zeros((number_of_robots_in_network, number_of_robots_in_network), dtype=bool)
+        mask[first_robots[pairs], second_robots[pairs]] = True
+        mask[second_robots[pairs], first_robots[pairs]] = True
+        masks.append(mask)
+    return masks
+
+
+"""
+This function labels the configurations, given as a (B, N, 2) array, under each of the combinations (see
+get_sweep_combinations()), and yields each combination with the records of its configurations, i.e., the lists of
+(robot_location, cycle_cluster) records generate_configuration() returns, or None for a configuration without any topology
+under the combination. The records of each combination are made under its own context (see create_combination_context()), so
+the state of the data generator is neither read nor changed. The topologies are cached by the configuration and its numbers of
+reliable and critical pairs, and statistics, if given, counts the syntheses and the reuses.
+"""
+def sweep_configurations(locations, combinations, time_budget = None, node_budget = None, statistics = None, context = None):
+    locations = np.asarray(locations, dtype=float)
+    number_of_robots_in_network = locations.shape[1]
+    sorted_distances, pair_orders = compute_sorted_pair_distances(locations)
+    if statistics is None:
+        statistics = {}
+    statistics.setdefault("syntheses", 0)
+    statistics.setdefault("reused_topologies", 0)
+    #records maps (configuration, number of reliable pairs, number of reliable and critical pairs) to the record.
+    records = {}
+    for combination in combinations:
+        combination_context = create_combination_context(combination, number_of_robots_in_network, context)
+        reliable_radius, critical_radius = data_generator.get_peer_radii(combination_context)
+        numbers_of_reliable_pairs = count_pairs_within(sorted_distances, reliable_radius)
+        numbers_of_peer_pairs = count_pairs_within(sorted_distances, critical_radius)
+        combination_records = []
+        for index, (number_of_reliable_pairs, number_of_peer_pairs) in enumerate(
+                zip(numbers_of_reliable_pairs.tolist(), numbers_of_peer_pairs.tolist())):
+            key = index, number_of_reliable_pairs, number_of_peer_pairs
+            if key in records:
+                statistics["reused_topologies"] += 1
+            else:
+                statistics["syntheses"] += 1
+                records[key] = label_configuration_of_pairs(
+                    locations[index], pair_orders[index], number_of_robots_in_network, number_of_reliable_pairs,
+                    number_of_peer_pairs, time_budget, node_budget, combination_context)
+            combination_records.append(records[key])
+        yield combination, combination_records
+
+
+"""
+This function labels a configuration whose reliable and critical sets are given by its numbers of pairs (see
+build_masks_of_pairs()), under the hyper-parameters of the given context, and returns its record, or None if it does not have
+any topology. The i-th entry of the clusters of the record is the cluster of the robot whose id is i + 1 (0 for an orphan robot
+without any peer).
+"""
+def label_configuration_of_pairs(locations, pair_order, number_of_robots_in_network, number_of_reliable_pairs,
+                                 number_of_peer_pairs, time_budget = None, node_budget = None, context = None):
+    context = data_generator.create_context(context)
+    reliable_mask, critical_mask = build_masks_of_pairs(pair_order, number_of_robots_in_network, number_of_reliable_pairs,
+                                                        number_of_peer_pairs)
+    order = compute_sorted_orders(reliable_mask[np.newaxis], critical_mask[np.newaxis])[0]
+    sorted_robot_network = build_sorted_robot_network(locations.tolist(), reliable_mask, critical_mask, order, context)
+    try:
+        cycle_topology = data_generator.synthesize_cycle_topology_for_robot_network(
+            sorted_robot_network, time_budget, node_budget, context = context)
+    except data_generator.no_cycle_topology_errors:
+        return None
+    clusters = [0] * number_of_robots_in_network
+    for id, cluster_id in cycle_topology.clusters:
+        clusters[id - 1] = cluster_id
+    return data_generator.extract_robot_locations(sorted_robot_network), clusters
+
+
+"""
+This function returns the name of the dataset of a combination, tagged with its hyper-parameters.
+"""
+def create_sweep_dataset_file_name(number_of_robots, combination, dataset_format = "csv"):
+    tag = "_".join("{}{}".format(name, combination[name]) for name in swept_hyper_parameter_names)
+    return "cycle_Topo_dataset_" + str(number_of_robots) + "_" + tag + "___" + datetime.now().strftime(
+        "%Y_%m_%d-%I_%M_%S_%p") + (".csv" if dataset_format == "csv" else "")
+
+
+"""
+This function sweeps the configurations (see sweep_configurations()) and writes the records of each combination into its own
+dataset of the given format ("csv" or "binary"), or, if dataset_format is "tagged", all of the records into a single csv file
+whose columns are the swept hyper-parameters followed by those of create_header(). The configurations without any topology
+under a combination are left out of its records. It returns the names of the files written and the statistics of the sweep.
+The hyper-parameters of the combinations are those of the given context updated by them (see create_combination_context()).
+"""
+def write_sweep_datasets(locations, combinations, dataset_format = dataset_format, time_budget = None, node_budget = None,
+                         context = None):
+    number_of_robots_in_network = np.shape(locations)[1]
+    statistics = {}
+    file_names = []
+    if dataset_format == "tagged":
+        file_name = "cycle_Topo_sweep_dataset_" + str(number_of_robots_in_network) + "___" + datetime.now().strftime(
+            "%Y_%m_%d-%I_%M_%S_%p") + ".csv"
+        with open(file_name, "w", newline="") as f:
+            writer = csv.writer(f, delimiter=" ")
+            writer.writerow(swept_hyper_parameter_names + create_header(number_of_robots_in_network))
+            for combination, records in sweep_configurations(locations, combinations, time_budget, node_budget, statistics,
+                                                             context):
+                tags = [combination[name] for name in swept_hyper_parameter_names]
+                writer.writerows(tags + robot_location + cycle_cluster
+                                 for robot_location, cycle_cluster in filter(None, records))
+        return [file_name], statistics
+    for combination, records in sweep_configurations(locations, combinations, time_budget, node_budget, statistics, context):
+        file_name = create_sweep_dataset_file_name(number_of_robots_in_network, combination, dataset_format)
+        # the hyper-parameters of the combination are recorded in its metadata
+        with data_generator.open_dataset_writer(file_name, dataset_format, {"combination": combination},
+                                                create_combination_context(combination, number_of_robots_in_network,
+                                                                           context)) as writer:
+            for robot_location, cycle_cluster in list(filter(None, records))[writer.number_of_records:]:
+                writer.write_record(robot_location, cycle_cluster)
+        file_names.append(file_name)
+    return file_names, statistics
+
+
+###################################################################################################################
+###################################################################################################################
+###################################################################################################################
+
+"""
+Here is the main function of the sweep, which samples the configurations with the hyper-parameters of the data generator.
+"""
+if __name__ == "__main__":
+
+    configurations = sample_configurations(number_of_configurations, data_generator.sampling_method)
+    file_names, statistics = write_sweep_datasets(configurations, get_sweep_combinations())
+    print("The datasets {} are written ({} topologies synthesized, {} reused).".format(
+        file_names, statistics["syntheses"], statistics["reused_topologies"]))
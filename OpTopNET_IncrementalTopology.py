@@ -0,0 +1,262 @@
+"""
+This file provides an incremental engine of the cycle topology of a robot network whose robots move over time, e.g., along the
+trajectories of a simulation. Synthesizing the topology of each timestep from scratch costs the reliable and critical sets of
+all of the robots and, above all, a new backbone cycle search. An IncrementalTopology keeps the robots of the network in a
+uniform grid, and when a few robots move it only
+
+- recomputes the sets and the degrees of the moved robots and of their old and new peers,
+- keeps the backbone cycle if no reliable link was added and none of the removed ones belongs to the backbone cycle (a cycle of
+  a graph is also a cycle of the graph with more links, and removing links does not make any cycle longer, so the backbone
+  cycle is still a longest one), and searches it again otherwise, and
+- assigns again only the orphan robots whose assignment rule may give another cluster, i.e., those whose own sets or whose
+  peers changed, those assigned to a least-connected backbone peer of a degree some changed robot had or has, and those
+  assigned to the nearest backbone robot if a backbone robot moved; the others keep their rule and take the current cluster of
+  the robot they got their cluster from.
+
+The topology is the same as the one synthesize_cycle_topology_for_robot_network() computes for the same network sorted by
+sort_robot_network(), except that a kept backbone cycle may differ from the one a new search picks among equally long cycles.
+Each engine labels its network under the hyper-parameters of its own context (see GenerationContext), so several engines, e.g.,
+in threads, neither read nor change the state of the data generator.
+"""
+
+import itertools
+import time
+
+import numpy as np
+
+import OpTopNET_DataGenerator as data_generator
+from OpTopNET_SpatialIndex import build_uniform_grid_of_robot_network
+
+#The assignment rules whose cluster is that of the peer they got it from.
+peer_cluster_paths = {"orphans_assigned_to_clusters_of_reliable_peers", "orphans_assigned_to_clusters_of_critical_peers"}
+
+#The assignment rules whose cluster is the nearest least-connected robot of the degree they got.
+least_connected_peer_paths = {"orphans_assigned_to_reliable_backbone_peers", "orphans_assigned_to_critical_backbone_peers"}
+
+
+class IncrementalTopology():
+    def __init__(self, locations, time_budget = None, node_budget = None, context = None):
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.context = data_generator.create_context(context)
+        self.context.reset_robot_ids()
+        #robots holds the robots in the order of their ids, i.e., the i-th location is that of the robot whose id is i + 1.
+        self.robots = [data_generator.Robot(location, [], [], 0, context = self.context)
+                       for location in np.asarray(locations, dtype=float).reshape(-1, 2).tolist()]
+        self.spatial_index = build_uniform_grid_of_robot_network(self.robots, self.get_critical_radius() or
+                                                                 self.context.zone_range)
+        for robot in self.robots:
+            self.set_reliable_and_critical_sets_of_robot(robot)
+            robot.degree = len(robot.reliable_id_set)
+        start_time = time.perf_counter()
+        self.synthesize()
+        self.last_update = {"moved_robots": len(self.robots), "changed_robots": len(self.robots), "added_links": None,
+                            "removed_links": None, "backbone_reused": False,
+                            "reassigned_orphans": len(self.assignment_sources), "time": time.perf_counter() - start_time}
+
+
+    """
+    This function returns the radius of the critical sets, which is the size of the cells of the uniform grid.
+    """
+    def get_critical_radius(self):
+        return data_generator.get_peer_radii(self.context)[1]
+
+
+    """
+    This function sets the reliable and critical sets of a robot from the robots around it in the uniform grid. The peers are
+    in the order of their ids, the same as set_reliable_and_critical_sets_of_robot_network() gives.
+    """
+    def set_reliable_and_critical_sets_of_robot(self, robot):
+        candidates = np.asarray(self.spatial_index.query_candidates(robot.location, self.get_critical_radius()), dtype=int)
+        candidates = candidates[candidates != robot.id - 1]
+        locations = np.asarray([self.spatial_index.locations[index] for index in candidates], dtype=float).reshape(-1, 2)
+        reliable_mask, critical_mask = data_generator.classify_distances(
+            data_generator.compute_distances(robot.location, locations)[0], self.context)
+        robot.reliable_id_set = (candidates[reliable_mask] + 1).tolist()
+        robot.critical_id_set = (candidates[critical_mask] + 1).tolist()
+
+
+    """
+    This function synthesizes the cycle topology of the network from scratch. (The robots without any reliable peer have the
+    degree of 0, the same as the fresh robots of a new network.) If the network does not have any topology, i.e., it does not
+    have any backbone cycle or the rules cannot assign one of its orphan robots to a cluster (see assign_orphan_robot()),
+    cycle_topology is None.
+    """
+    def synthesize(self):
+        self.sorted_robots = data_generator.sort_robot_network(self.robots)
+        self.assignment_sources = {}
+        self.cycle_topology = None
+        try:
+            cycle_topology = data_generator.synthesize_cycle_topology_for_robot_network(
+                self.sorted_robots, self.time_budget, self.node_budget, assignment_sources = self.assignment_sources,
+                context = self.context)
+        except data_generator.no_cycle_topology_errors:
+            return
+        self.cycle_topology_index = data_generator.CycleTopologyIndex(self.sorted_robots, cycle_topology.backbone_cycle,
+                                                                      self.context)
+        self.cluster_ids = {id: cluster_id for id, cluster_id in cycle_topology.clusters}
+        self.cycle_topology = cycle_topology
+
+
+    """
+    This function moves some robots of the network, given a dictionary (or pairs) of their ids and new locations, and updates
+    the cycle topology. It returns the updated topology, whose statistics are kept in last_update, or None if the network does
+    not have any topology after the move (see synthesize()), in which case it is synthesized from scratch on the next move.
+    """
+    def move_robots(self, updates):
+        start_time = time.perf_counter()
+        updates = dict(updates)
+        moved_robots = [self.robots[id - 1] for id in updates]
+        # the old peers of the moved robots lose them, and their new peers gain them
+        affected_robots = {}
+        for robot in moved_robots:
+            for id in robot.reliable_id_set + robot.critical_id_set:
+                affected_robots[id] = self.robots[id - 1]
+            robot.location = np.asarray(updates[robot.id], dtype=float).reshape(2).tolist()
+            self.spatial_index.move(robot.id - 1, robot.location)
+        old_sets = {robot.id: (robot.reliable_id_set, robot.critical_id_set, robot.degree)
+                    for robot in itertools.chain(moved_robots, affected_robots.values())}
+        for robot in moved_robots:
+            self.set_reliable_and_critical_sets_of_robot(robot)
+            for id in robot.reliable_id_set + robot.critical_id_set:
+                if id not in old_sets:
+                    affected_robots[id] = self.robots[id - 1]
+                    old_sets[id] = self.robots[id - 1].reliable_id_set, self.robots[id - 1].critical_id_set, \
+                                   self.robots[id - 1].degree
+        for id, robot in affected_robots.items():
+            if id not in updates:
+                self.set_reliable_and_critical_sets_of_robot(robot)
+
+        # the robots which moved or whose sets changed, and the reliable links added and removed
+        changed_ids = set(updates)
+        added_links, removed_links = set(), set()
+        touched_degrees = set()
+        for id, (old_reliable_id_set, old_critical_id_set, old_degree) in old_sets.items():
+            robot = self.robots[id - 1]
+            if robot.reliable_id_set != old_reliable_id_set or robot.critical_id_set != old_critical_id_set:
+                changed_ids.add(id)
+            if id not in changed_ids:
+                continue
+            robot.degree = len(robot.reliable_id_set)
+            touched_degrees.update((old_degree, robot.degree))
+            new_peers, old_peers = set(robot.reliable_id_set), set(old_reliable_id_set)
+            added_links.update((min(id, peer), max(id, peer)) for peer in new_peers - old_peers)
+            removed_links.update((min(id, peer), max(id, peer)) for peer in old_peers - new_peers)
+
+        self.last_update = {"moved_robots": len(updates), "changed_robots": len(changed_ids),
+                            "added_links": len(added_links), "removed_links": len(removed_links),
+                            "backbone_reused": False, "reassigned_orphans": 0}
+        if self.cycle_topology is None or added_links or removed_links & self.get_backbone_links():
+            self.synthesize()
+            self.last_update["reassigned_orphans"] = len(self.assignment_sources)
+            self.last_update["time"] = time.perf_counter() - start_time
+            return self.cycle_topology
+        try:
+            self.repair(changed_ids, touched_degrees, bool(changed_ids & self.cycle_topology_index.backbone_id_set))
+        except data_generator.no_cycle_topology_errors:
+            self.cycle_topology = None
+        self.last_update["backbone_reused"] = True
+        self.last_update["time"] = time.perf_counter() - start_time
+        return self.cycle_topology
+
+
+    """
+    This function returns the links of the backbone cycle, including the one closing it, as (smaller id, larger id) pairs.
+    """
+    def get_backbone_links(self):
+        backbone_cycle = self.cycle_topology.backbone_cycle
+        return {(min(id1, id2), max(id1, id2)) for id1, id2 in zip(backbone_cycle, backbone_cycle[1:] + backbone_cycle[:1])}
+
+
+    """
+    This function sorts the network again and assigns the orphan robots to clusters on the kept backbone cycle, reusing the
+    assignment of each orphan robot which is still valid (see is_assignment_valid()).
+    """
+    def repair(self, changed_ids, touched_degrees, backbone_robot_moved):
+        changed_robots = [self.robots[id - 1] for id in changed_ids]
+        self.sorted_robots = sorted(self.sorted_robots, key=lambda robot: (
+            -len(robot.reliable_id_set), -len(robot.critical_id_set), robot.id))
+        ranks = {robot.id: rank for rank, robot in enumerate(self.sorted_robots)}
+
+        # the robots of the touched degrees are indexed again in the new order of the network
+        cycle_topology_index = self.cycle_topology_index
+        for degree in touched_degrees:
+            robots_of_degree = [robot for robot in cycle_topology_index.get_robots_of_degree(degree)
+                                if robot.id not in changed_ids]
+            robots_of_degree += [robot for robot in changed_robots if robot.degree == degree]
+            robots_of_degree.sort(key=lambda robot: ranks[robot.id])
+            if robots_of_degree:
+                cycle_topology_index.robots_by_degree[degree] = robots_of_degree
+            else:
+                cycle_topology_index.robots_by_degree.pop(degree, None)
+            cycle_topology_index.uniform_grids_by_degree.pop(degree, None)
+
+        backbone_id_set = cycle_topology_index.backbone_id_set
+        cycle_topology = data_generator.CycleTopology(self.cycle_topology.backbone_cycle, [],
+                                                      self.cycle_topology.proven_optimal)
+        cluster_ids = {id: id for id in cycle_topology.backbone_cycle}
+        for robot in self.sorted_robots:
+            if robot.id in backbone_id_set:
+                continue
+            assignment_path, source = self.assignment_sources[robot.id]
+            if self.is_assignment_valid(robot, assignment_path, source, changed_ids, touched_degrees, backbone_robot_moved):
+                cluster_id = cluster_ids[source] if assignment_path in peer_cluster_paths else self.cluster_ids.get(robot.id)
+            else:
+                cluster_id, assignment_path, source = data_generator.assign_orphan_robot(
+                    robot, self.sorted_robots, cycle_topology, cycle_topology_index, cluster_ids)
+                self.assignment_sources[robot.id] = assignment_path, source
+                self.last_update["reassigned_orphans"] += 1
+            if cluster_id is not None:
+                cluster_ids[robot.id] = cluster_id
+        cycle_topology.clusters = [[id, cluster_ids[id]] for id in sorted(cluster_ids)]
+        self.cluster_ids = cluster_ids
+        self.cycle_topology = cycle_topology
+
+
+    """
+    This function checks whether the kept assignment rule of an orphan robot gives the same cluster as before. The robots which
+    did not change keep their order relative to each other, so an orphan robot none of whose peers changed finds the same
+    peers assigned before it.
+    """
+    def is_assignment_valid(self, robot, assignment_path, source, changed_ids, touched_degrees, backbone_robot_moved):
+        if robot.id in changed_ids:
+            return False
+        if any(id in changed_ids for id in itertools.chain(robot.reliable_id_set, robot.critical_id_set)):
+            return False
+        if assignment_path in least_connected_peer_paths:
+            return source not in touched_degrees
+        if assignment_path == "orphans_assigned_to_the_nearest_backbone_robot":
+            return not backbone_robot_moved
+        return True
+
+
+    """
+    This function returns the current record of the network, i.e., the locations of its sorted robots and their clusters, the
+    same as generate_configuration() returns.
+    """
+    def get_record(self):
+        return (data_generator.extract_robot_locations(self.sorted_robots),
+                data_generator.extract_cycle_clusters(self.cycle_topology))
+
+
+"""
+This function streams the cycle topology of a robot network over a trajectory, i.e., an iterable of timesteps each of which is
+either an (N, 2) array of the locations of all of the robots (the i-th row being that of the robot whose id is i + 1) or a
+dictionary of the ids and the new locations of the robots which moved. The first timestep must hold all of the locations. The
+topology of a timestep at which the network does not have any topology is None. The topologies are labeled under the
+hyper-parameters of the given context (those of the data generator by default).
+"""
+def stream_cycle_topologies(trajectory, time_budget = None, node_budget = None, context = None):
+    incremental_topology = None
+    for locations in trajectory:
+        if incremental_topology is None:
+            incremental_topology = IncrementalTopology(locations, time_budget, node_budget, context)
+            yield incremental_topology.cycle_topology
+            continue
+        if isinstance(locations, dict):
+            updates = locations
+        else:
+            locations = np.asarray(locations, dtype=float).reshape(-1, 2)
+            old_locations = np.asarray(incremental_topology.spatial_index.locations, dtype=float)
+            updates = {index + 1: locations[index] for index in np.flatnonzero(np.any(locations != old_locations, axis=1))}
+        yield incremental_topology.move_robots(updates)
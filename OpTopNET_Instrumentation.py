@@ -0,0 +1,172 @@
+"""
+This file provides an opt-in instrumentation of the data generator: cumulative timers of the stages of the pipeline and
+counters of the events which make a run slow, e.g., the rejected robot draws of create_robot_network, the node expansions of
+the backbone cycle searches and the orphan robots falling back to the heuristics of the topology synthesis. The progress of a
+run, together with the timers and the counters, may be written as json lines (one json object per line) by a
+ProgressReporter.
+
+The instrumentation is disabled by default, in which case timing a stage only returns a shared no-op context manager and
+counting an event only checks a flag, so it costs almost nothing. (The hottest paths, e.g., findNewCycles, check
+instrumentation.enabled themselves before counting anything.) The timers and the counters are updated under a lock, so the
+threads generating configurations with their own contexts may share the instrumentation.
+"""
+
+import contextlib
+import json
+import threading
+import time
+from datetime import datetime
+
+
+class Instrumentation():
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+
+    """
+    This function clears the timers and the counters.
+    """
+    def reset(self):
+        #stage_times maps the name of each stage to its cumulative time (in seconds), and stage_calls to the number of its runs.
+        with self.lock:
+            self.stage_times = {}
+            self.stage_calls = {}
+            self.counters = {}
+
+
+    """
+    This function enables the instrumentation.
+    """
+    def enable(self):
+        self.enabled = True
+
+
+    """
+    This function disables the instrumentation (the timers and the counters are kept).
+    """
+    def disable(self):
+        self.enabled = False
+
+
+    """
+    This function adds an increment to a counter.
+    """
+    def count(self, name, increment = 1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + increment
+
+
+    """
+    This function returns a context manager which adds the time spent in its context to the timer of a stage. (The timers of
+    nested stages overlap, e.g., the time of the backbone cycle search is also a part of that of the topology synthesis.)
+    """
+    def time_stage(self, name):
+        if not self.enabled:
+            return disabled_stage_timer
+        return self.stage_timer(name)
+
+
+    """
+    This function times a stage while the instrumentation is enabled.
+    """
+    @contextlib.contextmanager
+    def stage_timer(self, name):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_time = time.perf_counter() - start_time
+            with self.lock:
+                self.stage_times[name] = self.stage_times.get(name, 0.0) + elapsed_time
+                self.stage_calls[name] = self.stage_calls.get(name, 0) + 1
+
+
+    """
+    This function returns a copy of the timers and the counters.
+    """
+    def snapshot(self):
+        with self.lock:
+            return {"stage_times": dict(self.stage_times), "stage_calls": dict(self.stage_calls),
+                    "counters": dict(self.counters)}
+
+
+    """
+    This function returns the timers and the counters and clears them, e.g., to send them from a worker process to the main
+    one.
+    """
+    def collect(self):
+        with self.lock:
+            snapshot = {"stage_times": self.stage_times, "stage_calls": self.stage_calls, "counters": self.counters}
+            self.stage_times, self.stage_calls, self.counters = {}, {}, {}
+        return snapshot
+
+
+    """
+    This function adds the timers and the counters of a snapshot (e.g., collected in a worker process) to these ones.
+    """
+    def merge(self, snapshot):
+        with self.lock:
+            for attribute in ("stage_times", "stage_calls", "counters"):
+                totals = getattr(self, attribute)
+                for name, value in snapshot[attribute].items():
+                    totals[name] = totals.get(name, 0) + value
+
+
+#The context manager of the stages while the instrumentation is disabled.
+disabled_stage_timer = contextlib.nullcontext()
+
+#The instrumentation shared by the modules of the data generator.
+instrumentation = Instrumentation()
+
+
+"""
+This class writes the progress of the generation of number_of_records records (of which first_record had been generated before
+this run, e.g., by a resumed run) as json lines into a file object, at most every interval seconds. Each line holds the number
+of the records generated so far, the rate of this run in records per second, the estimated time to finish (eta, in seconds),
+and the timers and the counters of the instrumentation with their rates per second.
+"""
+class ProgressReporter():
+    def __init__(self, file, number_of_records, first_record = 0, interval = 10.0, instrumentation = instrumentation):
+        self.file = file
+        self.number_of_records = number_of_records
+        self.first_record = first_record
+        self.interval = interval
+        self.instrumentation = instrumentation
+        self.start_time = self.last_report_time = time.perf_counter()
+
+
+    """
+    This function reports the progress if interval seconds have passed since the last report.
+    """
+    def update(self, record_count):
+        if time.perf_counter() - self.last_report_time >= self.interval:
+            self.report(record_count)
+
+
+    """
+    This function writes a progress record.
+    """
+    def report(self, record_count, final = False):
+        self.last_report_time = time.perf_counter()
+        elapsed_time = self.last_report_time - self.start_time
+        rate = (record_count - self.first_record) / elapsed_time if elapsed_time > 0 else None
+        remaining_records = self.number_of_records - record_count
+        snapshot = self.instrumentation.snapshot()
+        progress = {"time": datetime.now().isoformat(timespec="seconds"), "final": final, "records": record_count,
+                    "number_of_records": self.number_of_records, "elapsed_time": elapsed_time, "records_per_second": rate,
+                    "eta": remaining_records / rate if rate else None}
+        progress.update(snapshot)
+        progress["counter_rates"] = {name: value / elapsed_time if elapsed_time > 0 else None
+                                     for name, value in snapshot["counters"].items()}
+        self.file.write(json.dumps(progress) + "\n")
+        self.file.flush()
+
+
+    """
+    This function writes the final progress record.
+    """
+    def close(self, record_count):
+        self.report(record_count, final = True)
@@ -0,0 +1,362 @@
+"""
+This file provides a local topology oracle, i.e., an HTTP server which answers configurations with their ground-truth cycle
+topologies, e.g., to check the predictions of OpTopNET or to fall back on when its confidence is low. The planners do not have
+to import the data generator and set its hyper-parameters themselves: the server labels the configurations with the
+hyper-parameters of OpTopNET_DataGenerator it was started with, in a pool of worker processes.
+
+A request is a POST to /topology whose json body is {"configurations": [configuration, ...]}, each configuration being a list of
+the [x, y] locations of its robots (the i-th robot gets the id i + 1). The answer is {"topologies": [topology, ...]}, each
+topology being {"backbone_cycle": [...], "clusters": [...]} with the clusters of the robots in the order of their ids (0 for an
+orphan robot without any peer), or null for a configuration which does not have any topology (see label_configurations()). A
+malformed request is answered with the status 400, and a failure of the labeling with the status 500, each with an
+{"error": message} body.
+
+The configurations of the concurrent requests are micro-batched: the first queued configuration waits at most max_batch_delay
+seconds for up to max_batch_size others, and the batch is labeled by label_configurations() in a worker process (one task per
+number of robots). The topologies are kept in an LRU cache keyed by the configuration, and a configuration being labeled is not
+queued again. A GET to /stats returns the counters of the server and the percentiles of the latencies of its latest requests.
+"""
+
+import json
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import OpTopNET_DataGenerator as data_generator
+from OpTopNET_BatchLabeling import label_configurations
+
+"""
+Hyper-parameters
+
+host:                     the address the server listens on
+port:                     the port the server listens on
+number_of_workers:        the number of the worker processes labeling the batches (0: the batches are labeled by the server
+                          process itself)
+max_batch_size:           the maximum number of the configurations of a batch
+max_batch_delay:          the maximum time (in seconds) the first configuration of a batch waits for the others
+cache_size:               the number of the topologies kept in the LRU cache
+latency_window:           the number of the latest requests whose latencies the percentiles are computed over
+"""
+host = "127.0.0.1"
+port = 8765
+number_of_workers = 2
+max_batch_size = 64
+max_batch_delay = 0.005
+cache_size = 10000
+latency_window = 10000
+
+#The percentiles of the latencies reported by /stats.
+latency_percentiles = [50, 90, 99]
+
+#The number of the connections waiting to be accepted by the server, which is large enough for bursts of concurrent clients.
+request_queue_size = 128
+
+
+"""
+This function labels a batch of configurations of the same number of robots, in a worker process or in the server process,
+under a context of the given hyper-parameters.
+"""
+def label_configuration_batch(locations, hyper_parameters):
+    context = data_generator.GenerationContext(hyper_parameters)
+    return label_configurations(locations, context.time_budget, context.node_budget, context = context)
+
+
+"""
+This function converts a row of the arrays of label_configurations() into a topology of the answers.
+"""
+def convert_labels_to_topology(backbone_cycle, clusters):
+    if not backbone_cycle.any():
+        return None
+    return {"backbone_cycle": backbone_cycle[backbone_cycle > 0].tolist(), "clusters": clusters.tolist()}
+
+
+"""
+This function validates a configuration and returns its locations as an (N, 2) array together with its key in the cache.
+"""
+def get_configuration_key(configuration):
+    try:
+        locations = np.ascontiguousarray(configuration, dtype=float)
+    except (ValueError, TypeError):
+        locations = None
+    if locations is None or locations.ndim != 2 or locations.shape[1] != 2 or len(locations) == 0:
+        raise ValueError("a configuration must be a non-empty list of [x, y] locations")
+    return locations, (len(locations), locations.tobytes())
+
+
+"""
+This class answers the configurations with their topologies (see the top of this file) under the hyper-parameters of the given
+context (those of the data generator when the oracle is created, by default).
+"""
+class TopologyOracle():
+    def __init__(self, number_of_workers = number_of_workers, max_batch_size = max_batch_size,
+                 max_batch_delay = max_batch_delay, cache_size = cache_size, latency_window = latency_window,
+                 context = None):
+        self.hyper_parameters = data_generator.get_context(context).get_hyper_parameters()
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.cache_size = cache_size
+        #cache maps the keys of the configurations to their topologies, the least recently used first.
+        self.cache = OrderedDict()
+        #pending maps the keys of the configurations being labeled to the futures of their topologies.
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=latency_window)
+        self.counters = {"requests": 0, "configurations": 0, "cache_hits": 0, "pending_hits": 0, "batches": 0,
+                         "batched_configurations": 0, "errors": 0}
+        self.executor = None
+        if number_of_workers > 0:
+            # the workers are spawned, since forking a process whose other threads are running is not safe
+            self.executor = ProcessPoolExecutor(number_of_workers, multiprocessing.get_context("spawn"))
+        self.queue = queue.Queue()
+        self.batcher = threading.Thread(target=self.run_batcher, daemon=True)
+        self.batcher.start()
+
+
+    """
+    This function submits a configuration and returns the future of its topology, which is already done if the topology is
+    in the cache.
+    """
+    def submit(self, configuration):
+        locations, key = get_configuration_key(configuration)
+        with self.lock:
+            self.counters["configurations"] += 1
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.counters["cache_hits"] += 1
+                future = Future()
+                future.set_result(self.cache[key])
+                return future
+            if key in self.pending:
+                self.counters["pending_hits"] += 1
+                return self.pending[key]
+            future = self.pending[key] = Future()
+        self.queue.put((key, locations, future))
+        return future
+
+
+    """
+    This function answers a request, i.e., returns the topologies of its configurations, and records its latency.
+    """
+    def query(self, configurations):
+        start_time = time.perf_counter()
+        futures = [self.submit(configuration) for configuration in configurations]
+        topologies = [future.result() for future in futures]
+        with self.lock:
+            self.counters["requests"] += 1
+            self.latencies.append(time.perf_counter() - start_time)
+        return topologies
+
+
+    """
+    This function collects the queued configurations into batches and labels them until the oracle is closed.
+    """
+    def run_batcher(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.perf_counter() + self.max_batch_delay
+            closed = False
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    closed = True
+                    break
+                batch.append(item)
+            self.label_batch(batch)
+            if closed:
+                return
+
+
+    """
+    This function labels a batch of configurations, one task per number of robots.
+    """
+    def label_batch(self, batch):
+        groups = {}
+        for item in batch:
+            groups.setdefault(item[0][0], []).append(item)
+        with self.lock:
+            self.counters["batches"] += 1
+            self.counters["batched_configurations"] += len(batch)
+        for group in groups.values():
+            locations = np.stack([item[1] for item in group])
+            if self.executor is None:
+                labels = Future()
+                try:
+                    labels.set_result(label_configuration_batch(locations, self.hyper_parameters))
+                except Exception as error:
+                    labels.set_exception(error)
+                self.complete_batch(group, labels)
+            else:
+                self.executor.submit(label_configuration_batch, locations, self.hyper_parameters).add_done_callback(
+                    partial(self.complete_batch, group))
+
+
+    """
+    This function caches the topologies of a labeled batch and resolves their futures.
+    """
+    def complete_batch(self, group, labels):
+        try:
+            backbone_cycles, clusters = labels.result()
+        except Exception as error:
+            with self.lock:
+                self.counters["errors"] += len(group)
+                for key, _, _ in group:
+                    self.pending.pop(key, None)
+            for _, _, future in group:
+                future.set_exception(error)
+            return
+        topologies = [convert_labels_to_topology(backbone_cycle, cluster_vector)
+                      for backbone_cycle, cluster_vector in zip(backbone_cycles, clusters)]
+        with self.lock:
+            for (key, _, _), topology in zip(group, topologies):
+                self.pending.pop(key, None)
+                self.cache[key] = topology
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        for (_, _, future), topology in zip(group, topologies):
+            future.set_result(topology)
+
+
+    """
+    This function returns the counters of the oracle and the percentiles of the latencies (in milliseconds) of its latest
+    requests.
+    """
+    def get_statistics(self):
+        with self.lock:
+            statistics = dict(self.counters)
+            statistics["cache_size"] = len(self.cache)
+            latencies = np.asarray(self.latencies) * 1000
+        statistics["mean_batch_size"] = (statistics["batched_configurations"] / statistics["batches"]
+                                         if statistics["batches"] else None)
+        statistics["latency_ms"] = {"p{}".format(percentile): (float(np.percentile(latencies, percentile))
+                                                               if len(latencies) else None)
+                                    for percentile in latency_percentiles}
+        statistics["latency_ms"]["max"] = float(latencies.max()) if len(latencies) else None
+        return statistics
+
+
+    """
+    This function stops the batcher, once the queued configurations are labeled, and the worker processes.
+    """
+    def close(self):
+        self.queue.put(None)
+        self.batcher.join()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+
+"""
+This class handles the requests of the HTTP server of a TopologyOracle (see the top of this file).
+"""
+class TopologyRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path != "/topology":
+            self.send_json(404, {"error": "unknown path {}".format(self.path)})
+            return
+        try:
+            configurations = self.read_configurations()
+        except ValueError as error:
+            self.send_json(400, {"error": str(error)})
+            return
+        try:
+            topologies = self.server.oracle.query(configurations)
+        except Exception:
+            traceback.print_exc()
+            self.send_json(500, {"error": "the configurations could not be labeled"})
+            return
+        self.send_json(200, {"topologies": topologies})
+
+
+    """
+    This function reads the body of a request and returns its configurations, or raises a ValueError describing why the body
+    is malformed, so a failure of the labeling of the configurations is not taken for a malformed request.
+    """
+    def read_configurations(self):
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            raise ValueError("the body of the request must be a json object") from None
+        if not isinstance(request, dict) or "configurations" not in request:
+            raise ValueError('the body of the request must be a json object with a "configurations" entry')
+        if not isinstance(request["configurations"], list):
+            raise ValueError('"configurations" must be a list of configurations')
+        for configuration in request["configurations"]:
+            get_configuration_key(configuration)
+        return request["configurations"]
+
+
+    def do_GET(self):
+        if self.path != "/stats":
+            self.send_json(404, {"error": "unknown path {}".format(self.path)})
+            return
+        self.send_json(200, self.server.oracle.get_statistics())
+
+
+    """
+    This function sends a json answer.
+    """
+    def send_json(self, status, answer):
+        body = json.dumps(answer).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    """
+    This overridden function keeps the server from logging each request.
+    """
+    def log_message(self, format, *args):
+        pass
+
+
+"""
+This function creates the HTTP server of a topology oracle, which the caller serves (serve_forever()) and then closes together
+with its oracle (server.oracle.close()).
+"""
+def create_oracle_server(host = host, port = port, oracle = None):
+    server = ThreadingHTTPServer((host, port), TopologyRequestHandler, bind_and_activate=False)
+    server.request_queue_size = request_queue_size
+    try:
+        server.server_bind()
+        server.server_activate()
+    except BaseException:
+        server.server_close()
+        raise
+    server.daemon_threads = True
+    server.oracle = TopologyOracle() if oracle is None else oracle
+    return server
+
+
+###################################################################################################################
+###################################################################################################################
+###################################################################################################################
+
+"""
+Here is the main function of the oracle server.
+"""
+if __name__ == "__main__":
+
+    server = create_oracle_server()
+    print("The topology oracle is serving on http://{}:{} with {} workers.".format(host, port, number_of_workers))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.oracle.close()
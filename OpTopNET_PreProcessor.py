@@ -1,184 +1,405 @@
-"""
-This file prepares the train-validation-test multi-class dataset partitions associated with each each robot of the network.
-"""
-
-import pandas as pd
-
-from sklearn.preprocessing import LabelBinarizer
-from sklearn.model_selection import train_test_split
-
-
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_rows', None)
-
-test_size_ratio = 0.1
-validation_size_ratio = 0.2
-
-
-"""
-This function casts the normal index range [1,10] of robots to [0,9] to make dataset compatible with the indexing 
-conventions of output layers in Keras models. 
-"""
-def reindex_dataset(csv_file_name):
-    def change(value):
-        if value == 1:
-            return 0
-        elif value == 2:
-            return 1
-        elif value == 3:
-            return 2
-        elif value == 4:
-            return 3
-        elif value == 5:
-            return 4
-        elif value == 6:
-            return 5
-        elif value == 7:
-            return 6
-        elif value == 8:
-            return 7
-        elif value == 9:
-            return 8
-        elif value == 10:
-            return 9
-
-    df = pd.read_csv(csv_file_name, delimiter=" ")
-
-    for row_index in range(0, 2000, 1):
-        for item in range(20, 30, 1):
-            df.iat[row_index, item] = change(int(df.iat[row_index, item]))
-
-    df.to_csv("cycle_Topo_dataset_10_new.csv", sep=' ', index=False)
-
-reindex_dataset("cycle_Topo_dataset_10.csv")
-
-df = pd.read_csv("cycle_Topo_dataset_10_new.csv", delimiter=" ")
-
-
-df_1 = df.drop(["C2", "C3", "C4", "C5", "C6", "C7", "C8", "C9", "C10"], axis=1)
-df_2 = df.drop(["C1", "C3", "C4", "C5", "C6", "C7", "C8", "C9", "C10"], axis=1)
-df_3 = df.drop(["C1", "C2", "C4", "C5", "C6", "C7", "C8", "C9", "C10"], axis=1)
-df_4 = df.drop(["C1", "C2", "C3", "C5", "C6", "C7", "C8", "C9", "C10"], axis=1)
-df_5 = df.drop(["C1", "C2", "C3", "C4", "C6", "C7", "C8", "C9", "C10"], axis=1)
-df_6 = df.drop(["C1", "C2", "C3", "C4", "C5", "C7", "C8", "C9", "C10"], axis=1)
-df_7 = df.drop(["C1", "C2", "C3", "C4", "C5", "C6", "C8", "C9", "C10"], axis=1)
-df_8 = df.drop(["C1", "C2", "C3", "C4", "C5", "C6", "C7", "C9", "C10"], axis=1)
-df_9 = df.drop(["C1", "C2", "C3", "C4", "C5", "C6", "C7", "C8", "C10"], axis=1)
-df_10 = df.drop(["C1", "C2", "C3", "C4", "C5", "C6", "C7", "C8", "C9"], axis=1)
-
-def get_df_1():
-    return df_1
-
-lb = LabelBinarizer()
-
-df_data = df.loc[:, "X1":"Y10"]
-
-df_1['C1'] = lb.fit_transform(df_1['C1']).tolist()
-df_1 = df_1.sample(frac=1).reset_index(drop=True)
-df_1_target = df.loc[:, "C1"]
-
-df_2['C2'] = lb.fit_transform(df_2['C2']).tolist()
-df_2 = df_2.sample(frac=1).reset_index(drop=True)
-df_2_target = df.loc[:, "C2"]
-
-df_3['C3'] = lb.fit_transform(df_3['C3']).tolist()
-df_3 = df_3.sample(frac=1).reset_index(drop=True)
-df_3_target = df.loc[:, "C3"]
-
-df_4['C4'] = lb.fit_transform(df_4['C4']).tolist()
-df_4 = df_4.sample(frac=1).reset_index(drop=True)
-df_4_target = df.loc[:, "C4"]
-
-df_5['C5'] = lb.fit_transform(df_5['C5']).tolist()
-df_5 = df_5.sample(frac=1).reset_index(drop=True)
-df_5_target = df.loc[:, "C5"]
-
-df_6['C6'] = lb.fit_transform(df_6['C6']).tolist()
-df_6 = df_6.sample(frac=1).reset_index(drop=True)
-df_6_target = df.loc[:, "C6"]
-
-df_7['C7'] = lb.fit_transform(df_7['C7']).tolist()
-df_7 = df_7.sample(frac=1).reset_index(drop=True)
-df_7_target = df.loc[:, "C7"]
-
-df_8['C8'] = lb.fit_transform(df_8['C8']).tolist()
-df_8 = df_8.sample(frac=1).reset_index(drop=True)
-df_8_target = df.loc[:, "C8"]
-
-df_9['C9'] = lb.fit_transform(df_9['C9']).tolist()
-df_9 = df_9.sample(frac=1).reset_index(drop=True)
-df_9_target = df.loc[:, "C9"]
-
-df_10['C10'] = lb.fit_transform(df_10['C10']).tolist()
-df_10 = df_10.sample(frac=1).reset_index(drop=True)
-df_10_target = df.loc[:, "C10"]
-
-def get_train_valid_test_1():
-    X_train_full_1, X_test_1, y_train_full_1, y_test_1 = train_test_split(
-        df_data, df_1_target, test_size=test_size_ratio)
-    X_train_1, X_valid_1, y_train_1, y_valid_1 = train_test_split(
-        X_train_full_1, y_train_full_1, test_size=validation_size_ratio)
-    return X_train_1, y_train_1, X_valid_1, y_valid_1, X_test_1, y_test_1
-
-def get_train_valid_test_2():
-    X_train_full_2, X_test_2, y_train_full_2, y_test_2 = train_test_split(
-        df_data, df_2_target, test_size=test_size_ratio)
-    X_train_2, X_valid_2, y_train_2, y_valid_2 = train_test_split(
-        X_train_full_2, y_train_full_2, test_size=validation_size_ratio)
-    return X_train_2, y_train_2, X_valid_2, y_valid_2, X_test_2, y_test_2
-
-def get_train_valid_test_3():
-    X_train_full_3, X_test_3, y_train_full_3, y_test_3 = train_test_split(
-        df_data, df_3_target, test_size=test_size_ratio)
-    X_train_3, X_valid_3, y_train_3, y_valid_3 = train_test_split(
-        X_train_full_3, y_train_full_3, test_size=validation_size_ratio)
-    return X_train_3, y_train_3, X_valid_3, y_valid_3, X_test_3, y_test_3
-
-def get_train_valid_test_4():
-    X_train_full_4, X_test_4, y_train_full_4, y_test_4 = train_test_split(
-        df_data, df_4_target, test_size=test_size_ratio)
-    X_train_4, X_valid_4, y_train_4, y_valid_4 = train_test_split(
-        X_train_full_4, y_train_full_4, test_size=validation_size_ratio)
-    return X_train_4, y_train_4, X_valid_4, y_valid_4, X_test_4, y_test_4
-
-def get_train_valid_test_5():
-    X_train_full_5, X_test_5, y_train_full_5, y_test_5 = train_test_split(
-        df_data, df_5_target, test_size=test_size_ratio)
-    X_train_5, X_valid_5, y_train_5, y_valid_5 = train_test_split(
-        X_train_full_5, y_train_full_5, test_size=validation_size_ratio)
-    return X_train_5, y_train_5, X_valid_5, y_valid_5, X_test_5, y_test_5
-
-def get_train_valid_test_6():
-    X_train_full_6, X_test_6, y_train_full_6, y_test_6 = train_test_split(
-        df_data, df_6_target, test_size=test_size_ratio)
-    X_train_6, X_valid_6, y_train_6, y_valid_6 = train_test_split(
-        X_train_full_6, y_train_full_6, test_size=validation_size_ratio)
-    return X_train_6, y_train_6, X_valid_6, y_valid_6, X_test_6, y_test_6
-
-def get_train_valid_test_7():
-    X_train_full_7, X_test_7, y_train_full_7, y_test_7 = train_test_split(
-        df_data, df_7_target, test_size=test_size_ratio)
-    X_train_7, X_valid_7, y_train_7, y_valid_7 = train_test_split(
-        X_train_full_7, y_train_full_7, test_size=validation_size_ratio)
-    return X_train_7, y_train_7, X_valid_7, y_valid_7, X_test_7, y_test_7
-
-def get_train_valid_test_8():
-    X_train_full_8, X_test_8, y_train_full_8, y_test_8 = train_test_split(
-        df_data, df_8_target, test_size=test_size_ratio)
-    X_train_8, X_valid_8, y_train_8, y_valid_8 = train_test_split(
-        X_train_full_8, y_train_full_8, test_size=validation_size_ratio)
-    return X_train_8, y_train_8, X_valid_8, y_valid_8, X_test_8, y_test_8
-
-def get_train_valid_test_9():
-    X_train_full_9, X_test_9, y_train_full_9, y_test_9 = train_test_split(
-        df_data, df_9_target, test_size=test_size_ratio)
-    X_train_9, X_valid_9, y_train_9, y_valid_9 = train_test_split(
-        X_train_full_9, y_train_full_9, test_size=validation_size_ratio)
-    return X_train_9, y_train_9, X_valid_9, y_valid_9, X_test_9, y_test_9
-
-def get_train_valid_test_10():
-    X_train_full_10, X_test_10, y_train_full_10, y_test_10 = train_test_split(
-        df_data, df_10_target, test_size=test_size_ratio)
-    X_train_10, X_valid_10, y_train_10, y_valid_10 = train_test_split(
-        X_train_full_10, y_train_full_10, test_size=validation_size_ratio)
-    return X_train_10, y_train_10, X_valid_10, y_valid_10, X_test_10, y_test_10
+"""
+This file prepares the train-validation-test multi-class dataset partitions associated with each each robot of the network.
+
+Nothing is read at import time: a dataset is read and reindexed on the first request for its partitions, and is then cached
+together with its feature matrix, i.e., the columns X1, Y1, ..., XN, YN shared by all of the robots. The partitions of the
+i-th robot (i = 1, ..., N) are returned by get_train_valid_test(i), and those of all of the robots by
+iterate_train_valid_test(). The targets of all of the robots may also be encoded at once, as integer class arrays or as
+int8 dense or scipy-sparse one-hot matrices aligned with the feature matrix, by encode_targets().
+
+All of the robots share the same train-validation-test split of the rows, which is drawn once (per random_state) and held as
+integer index arrays (see get_split_indices()). So, the test rows of a robot are never in the training rows of another one,
+which keeps the stacking of the per-robot models consistent.
+
+Datasets larger than the memory may be preprocessed out of core by preprocess_dataset_in_chunks(), which reads a dataset in
+chunks of a fixed number of rows, reindexes their clusters, assigns their rows to the partitions, and appends them to a binary
+dataset (see OpTopNET_DatasetIO) of each partition. The batches of a partition are then read from its memory-mapped arrays by
+iterate_batches(). (The former get_train_valid_test_1(), ..., get_train_valid_test_10() and the df_* variables of the
+dataset of 10 robots are still available as attributes of this module, for any number of robots.)
+
+pandas, sklearn and scipy are only imported by the functions which use them, so importing this module, e.g., to iterate the
+batches of a preprocessed dataset, does not pay for them.
+"""
+
+import functools
+import os
+import re
+
+import numpy as np
+
+from OpTopNET_DatasetIO import create_header, open_binary_dataset, read_binary_dataset_metadata, BinaryDatasetWriter
+
+
+dataset_file_name = "cycle_Topo_dataset_10.csv"
+test_size_ratio = 0.1
+validation_size_ratio = 0.2
+
+#The partitions of the datasets preprocessed out of core.
+partition_names = ["train", "valid", "test"]
+
+#The reindexed datasets and their feature matrices read so far, by their file names.
+datasets = {}
+feature_matrices = {}
+#The split indices drawn so far and the feature matrices ordered by them, by their file names and split parameters.
+split_indices = {}
+split_feature_matrices = {}
+
+
+"""
+This function imports pandas on its first use and sets its display options.
+"""
+@functools.lru_cache(maxsize=None)
+def import_pandas():
+    import pandas as pd
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.max_rows', None)
+    return pd
+
+
+"""
+This function reads a dataset, either a csv file or a binary dataset directory (see OpTopNET_DatasetIO), into a DataFrame
+whose columns are those of the csv files. (To use a binary dataset without reading it into memory, its arrays may be opened
+by open_binary_dataset(directory_name), which memory-maps them.)
+"""
+def read_dataset(file_name):
+    pd = import_pandas()
+    if os.path.isdir(file_name):
+        locations, clusters, metadata = open_binary_dataset(file_name)
+        header = create_header(metadata["number_of_robots"])
+        return pd.concat([pd.DataFrame(locations, columns=header[:locations.shape[1]]),
+                          pd.DataFrame(clusters, columns=header[locations.shape[1]:])], axis=1)
+    return pd.read_csv(file_name, delimiter=" ")
+
+
+"""
+This function returns the names of the cluster columns, i.e., C1, ..., CN, of a dataset.
+"""
+def get_cluster_columns(df):
+    return [column for column in df.columns if column.startswith("C")]
+
+
+"""
+This function casts the normal index range [1,N] of the clusters of the robots to [0,N-1], in place, to make a dataset (or a
+chunk of it) compatible with the indexing conventions of output layers in Keras models. All of the cluster columns are
+shifted by one vectorized operation, whatever the numbers of the robots and the rows are.
+"""
+def reindex_clusters(df):
+    cluster_columns = get_cluster_columns(df)
+    df[cluster_columns] = df[cluster_columns].to_numpy() - 1
+    return df
+
+
+"""
+This function reads a dataset and reindexes its clusters (see reindex_clusters()) in memory.
+"""
+def reindex_dataset(csv_file_name):
+    return reindex_clusters(read_dataset(csv_file_name))
+
+"""
+This function returns the reindexed dataset of a file, reading it on its first use.
+"""
+def load_dataset(file_name = None):
+    file_name = dataset_file_name if file_name is None else file_name
+    if file_name not in datasets:
+        datasets[file_name] = reindex_dataset(file_name)
+    return datasets[file_name]
+
+
+"""
+This function forgets the cached datasets, e.g., once a dataset file has been regenerated.
+"""
+def clear_dataset_cache():
+    datasets.clear()
+    feature_matrices.clear()
+    split_indices.clear()
+    split_feature_matrices.clear()
+
+
+"""
+This function returns the number of the robots of a dataset.
+"""
+def get_number_of_robots(file_name = None):
+    return len(get_cluster_columns(load_dataset(file_name)))
+
+
+"""
+This function returns the feature matrix of a dataset, i.e., its columns X1, Y1, ..., XN, YN, which is shared by the
+partitions of all of the robots.
+"""
+def get_features(file_name = None):
+    file_name = dataset_file_name if file_name is None else file_name
+    if file_name not in feature_matrices:
+        df = load_dataset(file_name)
+        feature_matrices[file_name] = df.loc[:, "X1":"Y" + str(get_number_of_robots(file_name))]
+    return feature_matrices[file_name]
+
+
+"""
+This function returns the target of the i-th robot of a dataset, i.e., its (reindexed) cluster labels Ci.
+"""
+def get_target(robot_index, file_name = None):
+    df = load_dataset(file_name)
+    number_of_robots = len(get_cluster_columns(df))
+    if not 1 <= robot_index <= number_of_robots:
+        raise IndexError("the robot index must be in [1, {}], got {}".format(number_of_robots, robot_index))
+    return df.loc[:, "C" + str(robot_index)]
+
+
+"""
+This function returns the dataset of the i-th robot, i.e., the features and the one-hot encoded (by LabelBinarizer, as lists)
+cluster labels Ci of the robot, whose rows are shuffled.
+"""
+def get_df(robot_index, file_name = None, random_state = None):
+    pd = import_pandas()
+    from sklearn.preprocessing import LabelBinarizer
+    df = pd.concat([get_features(file_name), get_target(robot_index, file_name)], axis=1)
+    column = "C" + str(robot_index)
+    df[column] = LabelBinarizer().fit_transform(df[column]).tolist()
+    return df.sample(frac=1, random_state=random_state).reset_index(drop=True)
+
+
+"""
+This function returns the smallest integer data type which holds the class labels of the given number of robots.
+"""
+def get_label_dtype(number_of_robots):
+    return np.min_scalar_type(-max(number_of_robots, 1)).newbyteorder("=")
+
+
+"""
+This function encodes the (reindexed) cluster labels of the robots, an integer array of shape (number_of_rows,
+number_of_robots), whose classes are 0, ..., number_of_classes - 1:
+    "labels": the labels themselves, as an array of the smallest integer data type holding them,
+    "dense":  an int8 one-hot array of shape (number_of_rows, number_of_robots, number_of_classes),
+    "sparse": an int8 one-hot scipy.sparse.csr_matrix of shape (number_of_rows, number_of_robots*number_of_classes), whose
+              columns i*number_of_classes, ..., (i + 1)*number_of_classes - 1 belong to the (i + 1)-th robot of the labels.
+The sparse matrix only stores the number_of_rows*number_of_robots ones, e.g., about 250 MB for 10^6 rows and 50 robots.
+"""
+def encode_cluster_labels(labels, number_of_classes, encoding = "labels"):
+    labels = np.asarray(labels)
+    if labels.ndim == 1:
+        labels = labels[:, np.newaxis]
+    if labels.size and (labels.min() < 0 or labels.max() >= number_of_classes):
+        raise ValueError("the cluster labels must be in [0, {}), got [{}, {}]".format(
+            number_of_classes, labels.min(), labels.max()))
+    number_of_rows, number_of_robots = labels.shape
+    if encoding == "labels":
+        return labels.astype(get_label_dtype(number_of_classes))
+    elif encoding == "dense":
+        one_hot = np.zeros((number_of_rows, number_of_robots, number_of_classes), dtype=np.int8)
+        np.put_along_axis(one_hot, labels[:, :, np.newaxis].astype(np.intp), 1, axis=2)
+        return one_hot
+    elif encoding == "sparse":
+        try:
+            import scipy.sparse
+        except ImportError:
+            raise ImportError("the sparse encoding of the targets requires scipy") from None
+        indices = labels.astype(np.int32) + np.arange(number_of_robots, dtype=np.int32) * number_of_classes
+        return scipy.sparse.csr_matrix(
+            (np.ones(indices.size, dtype=np.int8), indices.ravel(),
+             np.arange(0, indices.size + 1, max(number_of_robots, 1), dtype=np.int64)[:number_of_rows + 1]),
+            shape=(number_of_rows, number_of_robots * number_of_classes))
+    raise ValueError("unknown encoding {!r}; it must be either 'labels', 'dense' or 'sparse'".format(encoding))
+
+
+"""
+This function encodes the targets of the robots of a dataset (all of them, or those of the given 1-based robot_indices, in
+that order) in one batched call (see encode_cluster_labels()). The rows are aligned with those of get_features(), and the
+classes of every robot are the N clusters of the dataset of N robots. (Note that LabelBinarizer, used by get_df(), only
+creates the columns of the clusters which occur in the labels of a robot.)
+"""
+def encode_targets(file_name = None, encoding = "labels", robot_indices = None):
+    df = load_dataset(file_name)
+    cluster_columns = get_cluster_columns(df)
+    if robot_indices is not None:
+        cluster_columns = ["C" + str(robot_index) for robot_index in robot_indices]
+    return encode_cluster_labels(df[cluster_columns].to_numpy(), len(get_cluster_columns(df)), encoding)
+
+
+"""
+This function returns the key of the split of a dataset in the caches.
+"""
+def get_split_key(file_name, test_size, validation_size, random_state):
+    return (dataset_file_name if file_name is None else file_name,
+            test_size_ratio if test_size is None else test_size,
+            validation_size_ratio if validation_size is None else validation_size, random_state)
+
+
+"""
+This function returns the train, validation and test row indices of a dataset as integer arrays: test_size of the rows are
+held out for the test first, and then validation_size of the rest for the validation, the same way two successive calls of
+train_test_split() split them. The split is drawn once for each random_state (including None) and then reused by all of the
+robots.
+"""
+def get_split_indices(file_name = None, test_size = None, validation_size = None, random_state = None):
+    key = get_split_key(file_name, test_size, validation_size, random_state)
+    if key not in split_indices:
+        from sklearn.model_selection import train_test_split
+        _, test_size, validation_size, _ = key
+        train_full_indices, test_indices = train_test_split(
+            np.arange(len(load_dataset(file_name))), test_size=test_size, random_state=random_state)
+        train_indices, validation_indices = train_test_split(
+            train_full_indices, test_size=validation_size, random_state=random_state)
+        split_indices[key] = train_indices, validation_indices, test_indices
+    return split_indices[key]
+
+
+"""
+This function returns the feature matrix of a dataset whose rows are ordered by its split, i.e., the train rows, then the
+validation rows and then the test rows, together with the boundaries of the partitions. It is built once for each split, so
+the partitions of the features of every robot are slices of it.
+"""
+def get_split_features(file_name = None, test_size = None, validation_size = None, random_state = None):
+    key = get_split_key(file_name, test_size, validation_size, random_state)
+    if key not in split_feature_matrices:
+        train_indices, validation_indices, test_indices = get_split_indices(
+            file_name, test_size, validation_size, random_state)
+        split_feature_matrices[key] = (
+            get_features(file_name).iloc[np.concatenate((train_indices, validation_indices, test_indices))],
+            len(train_indices), len(train_indices) + len(validation_indices))
+    return split_feature_matrices[key]
+
+
+"""
+This function returns the train, validation and test partitions of the features and the target of the i-th robot of a
+dataset, according to the split shared by all of the robots (see get_split_indices()). The partitions of the features are
+slices of the split feature matrix, and only the target of the robot is gathered by the split indices.
+"""
+def get_train_valid_test(robot_index, file_name = None, test_size = None, validation_size = None, random_state = None):
+    X, end_of_train, end_of_validation = get_split_features(file_name, test_size, validation_size, random_state)
+    y = get_target(robot_index, file_name).iloc[np.concatenate(
+        get_split_indices(file_name, test_size, validation_size, random_state))]
+    return (X.iloc[:end_of_train], y.iloc[:end_of_train], X.iloc[end_of_train:end_of_validation],
+            y.iloc[end_of_train:end_of_validation], X.iloc[end_of_validation:], y.iloc[end_of_validation:])
+
+
+"""
+This generator yields the index of each robot of a dataset and its train, validation and test partitions (see
+get_train_valid_test()), one robot at a time.
+"""
+def iterate_train_valid_test(file_name = None, test_size = None, validation_size = None, random_state = None):
+    for robot_index in range(1, get_number_of_robots(file_name) + 1):
+        yield robot_index, get_train_valid_test(robot_index, file_name, test_size, validation_size, random_state)
+
+
+"""
+This generator yields the rows of a dataset, either a csv file or a binary dataset directory, as DataFrames of at most
+chunk_size rows (see read_dataset()), without reading the whole dataset into the memory.
+"""
+def iterate_dataset_chunks(file_name, chunk_size = 100000):
+    pd = import_pandas()
+    if os.path.isdir(file_name):
+        locations, clusters, metadata = open_binary_dataset(file_name)
+        header = create_header(metadata["number_of_robots"])
+        for first_row in range(0, len(locations), chunk_size):
+            yield pd.concat([pd.DataFrame(np.asarray(locations[first_row:first_row + chunk_size]),
+                                          columns=header[:locations.shape[1]]),
+                             pd.DataFrame(np.asarray(clusters[first_row:first_row + chunk_size]),
+                                          columns=header[locations.shape[1]:])], axis=1)
+    else:
+        with pd.read_csv(file_name, delimiter=" ", chunksize=chunk_size) as reader:
+            yield from reader
+
+
+"""
+This function returns the partition, i.e., 0 (train), 1 (validation) or 2 (test), of each of a number of rows drawn from a
+random generator: a row is held out for the test with the probability test_size, and otherwise for the validation with the
+probability validation_size. Since the draws of the successive rows come from the same stream of the generator, the
+partitions do not depend on the size of the chunks the rows are drawn in.
+"""
+def draw_partitions(random_generator, number_of_rows, test_size, validation_size):
+    draws = random_generator.random((number_of_rows, 2))
+    partitions = np.where(draws[:, 1] < validation_size, 1, 0)
+    partitions[draws[:, 0] < test_size] = 2
+    return partitions
+
+
+"""
+This function preprocesses a dataset out of core: it reads the dataset in chunks of chunk_size rows, reindexes the clusters of
+each chunk, assigns its rows randomly (seeded by random_state) to the train, validation and test partitions in the ratios of
+the split of get_split_indices(), and appends them to the binary datasets output_directory/train, output_directory/valid and
+output_directory/test, so only a chunk is in the memory at a time. It returns the numbers of the rows of the partitions. (Unlike
+get_split_indices(), the sizes of the partitions are only expected to, not exactly, follow the ratios, since the number of the
+rows is not known before the end of the dataset. The clusters of a binary dataset which has been already preprocessed, e.g., a
+partition being split again, are not reindexed again.)
+"""
+def preprocess_dataset_in_chunks(file_name, output_directory, chunk_size = 100000, test_size = None, validation_size = None,
+                                 random_state = None, location_dtype = "<f4"):
+    test_size = test_size_ratio if test_size is None else test_size
+    validation_size = validation_size_ratio if validation_size is None else validation_size
+    random_generator = np.random.default_rng(random_state)
+    metadata = {"source": file_name, "reindexed": True, "test_size": test_size, "validation_size": validation_size,
+                "random_state": random_state}
+    already_reindexed = os.path.isdir(file_name) and bool(
+        (read_binary_dataset_metadata(file_name)["metadata"] or {}).get("reindexed"))
+    writers = None
+    try:
+        for chunk in iterate_dataset_chunks(file_name, chunk_size):
+            if not already_reindexed:
+                reindex_clusters(chunk)
+            cluster_columns = get_cluster_columns(chunk)
+            number_of_robots = len(cluster_columns)
+            if writers is None:
+                writers = [BinaryDatasetWriter(os.path.join(output_directory, partition_name), number_of_robots,
+                                               metadata=dict(metadata, partition=partition_name),
+                                               location_dtype=location_dtype)
+                           for partition_name in partition_names]
+            locations = chunk.loc[:, "X1":"Y" + str(number_of_robots)].to_numpy()
+            clusters = chunk[cluster_columns].to_numpy()
+            partitions = draw_partitions(random_generator, len(chunk), test_size, validation_size)
+            for partition, writer in enumerate(writers):
+                rows = partitions == partition
+                writer.write_arrays(locations[rows], clusters[rows])
+    finally:
+        for writer in writers or []:
+            writer.close()
+    return {partition_name: writer.number_of_records for partition_name, writer in zip(partition_names, writers or [])}
+
+
+"""
+This generator yields the batches of a partition ("train", "valid" or "test") of a dataset preprocessed by
+preprocess_dataset_in_chunks() as pairs of the feature array, of shape (batch_size, 2*number_of_robots), and the targets,
+encoded by encode_cluster_labels() (for all of the robots, or those of the given 1-based robot_indices). The batches are read
+from the memory-mapped arrays of the partition, so only a batch is in the memory at a time. If shuffle is True, the order of
+the batches (not the rows inside them) is shuffled, seeded by random_state, to keep the reads sequential.
+"""
+def iterate_batches(output_directory, partition_name = "train", batch_size = 1024, encoding = "labels", robot_indices = None,
+                    shuffle = False, random_state = None):
+    locations, clusters, metadata = open_binary_dataset(os.path.join(output_directory, partition_name))
+    number_of_robots = metadata["number_of_robots"]
+    columns = None if robot_indices is None else [robot_index - 1 for robot_index in robot_indices]
+    first_rows = np.arange(0, len(locations), batch_size)
+    if shuffle:
+        np.random.default_rng(random_state).shuffle(first_rows)
+    for first_row in first_rows:
+        batch_clusters = np.asarray(clusters[first_row:first_row + batch_size])
+        if columns is not None:
+            batch_clusters = batch_clusters[:, columns]
+        yield (np.asarray(locations[first_row:first_row + batch_size]),
+               encode_cluster_labels(batch_clusters, number_of_robots, encoding))
+
+
+"""
+This function provides the former module-level functions and variables of this file, which were created at import time for
+the dataset of 10 robots, lazily for the robots of the dataset of dataset_file_name: get_train_valid_test_i(),
+get_df_i(), df, df_data, df_i (see get_df()) and df_i_target. As the former ones, each of them is created once, at its first
+access, and then stored in the module, so that, e.g., two accesses to df_1 return the same shuffled frame.
+"""
+def __getattr__(name):
+    value = None
+    match = re.fullmatch(r"(get_train_valid_test|get_df|df)_(\d+)(_target)?", name)
+    if match is not None:
+        function_name, robot_index, target = match.group(1), int(match.group(2)), match.group(3)
+        if function_name == "get_train_valid_test" and target is None:
+            value = lambda: get_train_valid_test(robot_index)
+        elif function_name == "get_df" and target is None:
+            value = lambda: get_df(robot_index)
+        elif function_name == "df":
+            value = get_target(robot_index) if target else get_df(robot_index)
+    elif name == "df":
+        value = load_dataset()
+    elif name == "df_data":
+        value = get_features()
+    if value is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    globals()[name] = value
+    return value
@@ -0,0 +1,256 @@
+"""
+This file provides an array-backed representation of robot networks. Instead of one Robot object (with its own __dict__ and
+lists) per robot, a RobotNetwork holds the locations of all of its robots in a contiguous (N, 2) array, their ids and degrees
+in integer arrays, and their reliable and critical sets in CSR-style arrays, i.e., the ids of the reliable peers of the i-th
+robot are reliable_ids[reliable_indptr[i]:reliable_indptr[i + 1]]. The functions of the topology pipeline of
+OpTopNET_DataGenerator accept a RobotNetwork directly, and its robots are exposed to them as RobotView objects, say, thin
+views which behave like Robot instances.
+"""
+
+import numpy as np
+
+from OpTopNET_DataGenerator import Robot, compute_distances, classify_distances
+
+
+class RobotNetwork():
+    def __init__(self, locations, ids = None):
+        self.locations = np.ascontiguousarray(locations, dtype=float).reshape(-1, 2)
+        number_of_robots_in_network = len(self.locations)
+        self.ids = np.arange(1, number_of_robots_in_network + 1) if ids is None else np.asarray(ids, dtype=np.int64)
+        if len(self.ids) != number_of_robots_in_network:
+            raise ValueError("a robot network of {} locations may not have {} ids".format(
+                number_of_robots_in_network, len(self.ids)))
+        self.degrees = np.zeros(number_of_robots_in_network, dtype=np.int64)
+        self.reliable_indptr = np.zeros(number_of_robots_in_network + 1, dtype=np.int64)
+        self.reliable_ids = np.zeros(0, dtype=np.int64)
+        self.critical_indptr = np.zeros(number_of_robots_in_network + 1, dtype=np.int64)
+        self.critical_ids = np.zeros(0, dtype=np.int64)
+
+
+    """
+    This function creates a robot network from the locations of its robots and computes their reliable and critical sets under
+    the hyper-parameters of the given context.
+    """
+    @classmethod
+    def from_locations(cls, locations, ids = None, batch_size = None, context = None):
+        robot_network = cls(locations, ids)
+        robot_network.compute_reliable_and_critical_sets(batch_size, context)
+        return robot_network
+
+
+    """
+    This function converts a list of Robot instances into a robot network, keeping their order, sets and degrees.
+    """
+    @classmethod
+    def from_robots(cls, robots):
+        robot_network = cls([robot.location for robot in robots], [robot.id for robot in robots])
+        robot_network.degrees[:] = [robot.degree for robot in robots]
+        robot_network.reliable_indptr, robot_network.reliable_ids = build_csr([robot.reliable_id_set for robot in robots])
+        robot_network.critical_indptr, robot_network.critical_ids = build_csr([robot.critical_id_set for robot in robots])
+        return robot_network
+
+
+    """
+    This function computes the reliable and critical sets of all of the robots in blocks of batch_size rows of distances (all
+    of the rows at once by default). The sets are the same as those of set_reliable_and_critical_sets_of_robot_network().
+    """
+    def compute_reliable_and_critical_sets(self, batch_size = None, context = None):
+        number_of_robots_in_network = len(self)
+        if batch_size is None:
+            batch_size = max(number_of_robots_in_network, 1)
+        reliable_rows, reliable_columns, critical_rows, critical_columns = [], [], [], []
+        for first_row in range(0, number_of_robots_in_network, batch_size):
+            last_row = min(first_row + batch_size, number_of_robots_in_network)
+            reliable_mask, critical_mask = classify_distances(
+                compute_distances(self.locations[first_row:last_row], self.locations), context)
+            # a robot is not a peer of itself
+            rows = np.arange(last_row - first_row)
+            reliable_mask[rows, first_row + rows] = False
+            critical_mask[rows, first_row + rows] = False
+            for mask, mask_rows, mask_columns in ((reliable_mask, reliable_rows, reliable_columns),
+                                                  (critical_mask, critical_rows, critical_columns)):
+                row_indices, column_indices = np.nonzero(mask)
+                mask_rows.append(row_indices + first_row)
+                mask_columns.append(column_indices)
+        self.reliable_indptr, self.reliable_ids = self.build_csr_from_pairs(reliable_rows, reliable_columns)
+        self.critical_indptr, self.critical_ids = self.build_csr_from_pairs(critical_rows, critical_columns)
+
+
+    """
+    This function builds the CSR arrays of the sets from the (row, column) pairs of the robots being peers, which are sorted by
+    their rows and then by their columns.
+    """
+    def build_csr_from_pairs(self, rows, columns):
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        columns = np.concatenate(columns) if columns else np.zeros(0, dtype=np.int64)
+        indptr = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(self)), out=indptr[1:])
+        return indptr, self.ids[columns]
+
+
+    """
+    This function returns the number of the reliable peers of each robot.
+    """
+    def reliable_set_sizes(self):
+        return np.diff(self.reliable_indptr)
+
+
+    """
+    This function returns the number of the critical peers of each robot.
+    """
+    def critical_set_sizes(self):
+        return np.diff(self.critical_indptr)
+
+
+    """
+    This function returns a new robot network whose robots are those of this network in the given order.
+    """
+    def permute(self, order):
+        order = np.asarray(order, dtype=np.int64)
+        robot_network = RobotNetwork(self.locations[order], self.ids[order])
+        robot_network.degrees = self.degrees[order]
+        robot_network.reliable_indptr, robot_network.reliable_ids = permute_csr(
+            self.reliable_indptr, self.reliable_ids, order)
+        robot_network.critical_indptr, robot_network.critical_ids = permute_csr(
+            self.critical_indptr, self.critical_ids, order)
+        return robot_network
+
+
+    """
+    This function returns the robot network sorted the same way as sort_robot_network() sorts Robot instances, i.e., in the
+    descending order of the cardinalities of the reliable sets and then of those of the critical sets, keeping the order of
+    the robots with equal cardinalities.
+    """
+    def sorted(self):
+        return self.permute(np.lexsort((-self.critical_set_sizes(), -self.reliable_set_sizes())))
+
+
+    """
+    This function returns the flat list of the locations of the robots, the same as extract_robot_locations() returns.
+    """
+    def extract_locations(self):
+        return self.locations.ravel().tolist()
+
+
+    """
+    This overridden function returns the number of the robots of the network.
+    """
+    def __len__(self):
+        return len(self.ids)
+
+
+    """
+    This overridden function returns the view of the robot at an index, or a list of such views for a slice.
+    """
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [RobotView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("robot network index out of range")
+        return RobotView(self, index)
+
+
+    """
+    This overridden function makes the robot network iterable over the views of its robots.
+    """
+    def __iter__(self):
+        for index in range(len(self)):
+            yield RobotView(self, index)
+
+
+"""
+This class is a view of a robot of a RobotNetwork which provides the attributes and the functions of Robot instances, so the
+functions written for lists of Robot instances also work on robot networks. Its degree may be set, which updates the degree
+array of the network, while its sets are read-only (see RobotNetwork.compute_reliable_and_critical_sets()).
+"""
+class RobotView(Robot):
+    def __init__(self, robot_network, index):
+        self.robot_network = robot_network
+        self.index = index
+
+
+    """
+    These properties read the attributes of the robot from the arrays of its network.
+    """
+    @property
+    def id(self):
+        return int(self.robot_network.ids[self.index])
+
+
+    @property
+    def location(self):
+        return self.robot_network.locations[self.index].tolist()
+
+
+    @property
+    def reliable_id_set(self):
+        robot_network = self.robot_network
+        return robot_network.reliable_ids[
+            robot_network.reliable_indptr[self.index]:robot_network.reliable_indptr[self.index + 1]].tolist()
+
+
+    @property
+    def critical_id_set(self):
+        robot_network = self.robot_network
+        return robot_network.critical_ids[
+            robot_network.critical_indptr[self.index]:robot_network.critical_indptr[self.index + 1]].tolist()
+
+
+    @property
+    def degree(self):
+        return int(self.robot_network.degrees[self.index])
+
+
+    @degree.setter
+    def degree(self, value):
+        self.robot_network.degrees[self.index] = value
+
+
+    """
+    This overridden function makes the view iterable in the same order of attributes as Robot instances.
+    """
+    def __iter__(self):
+        yield self.id
+        yield self.location
+        yield self.reliable_id_set
+        yield self.critical_id_set
+        yield self.degree
+
+
+    """
+    This overridden function makes two views of the same robot equal.
+    """
+    def __eq__(self, other):
+        return (isinstance(other, RobotView) and self.robot_network is other.robot_network and
+                self.index == other.index)
+
+
+    """
+    This overridden function hashes the views consistently with their equality.
+    """
+    def __hash__(self):
+        return hash((id(self.robot_network), self.index))
+
+
+"""
+This function builds the CSR arrays of a list of id lists.
+"""
+def build_csr(id_lists):
+    indptr = np.zeros(len(id_lists) + 1, dtype=np.int64)
+    np.cumsum([len(id_list) for id_list in id_lists], out=indptr[1:])
+    ids = np.fromiter((id for id_list in id_lists for id in id_list), dtype=np.int64, count=indptr[-1])
+    return indptr, ids
+
+
+"""
+This function returns the CSR arrays whose rows are those of the given CSR arrays in the given order.
+"""
+def permute_csr(indptr, data, order):
+    sizes = np.diff(indptr)[order]
+    new_indptr = np.zeros(len(order) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=new_indptr[1:])
+    # the position of each entry of the new rows in the old data
+    positions = np.repeat(indptr[order] - new_indptr[:-1], sizes) + np.arange(new_indptr[-1])
+    return new_indptr, data[positions]
@@ -0,0 +1,135 @@
+"""
+This file provides a uniform-grid spatial index of robot locations. The neighbor radii of robots, i.e.,
+scale_factor*connectivity_threshold and scale_factor*(connectivity_threshold + epsilon), are tiny compared to zone_range. So,
+if the cells of the grid are as large as the largest of those radii, the neighbors of a robot may only reside in the 3x3 cells
+around it, and a neighbor query costs as much as the local density of the robots instead of the size of the network.
+"""
+
+from math import floor, sqrt
+
+
+class UniformGrid():
+    def __init__(self, cell_size):
+        if cell_size <= 0:
+            raise ValueError("the cell size of a uniform grid must be positive, got {}".format(cell_size))
+        self.cell_size = cell_size
+        #cells maps the (column, row) key of each non-empty cell to the indices of the items inserted into it.
+        self.cells = {}
+        self.locations = []
+        self.items = []
+
+
+    """
+    This function returns the (column, row) key of the cell containing a location.
+    """
+    def cell_of(self, location):
+        return floor(location[0] / self.cell_size), floor(location[1] / self.cell_size)
+
+
+    """
+    This function inserts an item, e.g., a robot, at a location into the grid and returns its index, i.e., its insertion order.
+    """
+    def insert(self, location, item = None):
+        index = len(self.items)
+        self.locations.append(location)
+        self.items.append(item)
+        self.cells.setdefault(self.cell_of(location), []).append(index)
+        return index
+
+
+    """
+    This function moves the item of an index to a new location, e.g., when its robot moves, keeping its index.
+    """
+    def move(self, index, location):
+        old_cell, new_cell = self.cell_of(self.locations[index]), self.cell_of(location)
+        self.locations[index] = location
+        if old_cell == new_cell:
+            return
+        old_cell_indices = self.cells[old_cell]
+        old_cell_indices.remove(index)
+        if not old_cell_indices:
+            del self.cells[old_cell]
+        self.cells.setdefault(new_cell, []).append(index)
+
+
+    """
+    This function returns the indices, in the insertion order, of the items residing in the cells which overlap the square
+    circumscribing the disc of the radius around a location. Each item within that radius of the location is among them.
+    """
+    def query_candidates(self, location, radius):
+        # The margin covers the round-off of the distance computations at the borders of the cells.
+        margin = radius * 1e-9 + 1e-12
+        first_column, first_row = self.cell_of((location[0] - radius - margin, location[1] - radius - margin))
+        last_column, last_row = self.cell_of((location[0] + radius + margin, location[1] + radius + margin))
+        candidates = []
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                candidates.extend(self.cells.get((column, row), ()))
+        candidates.sort()
+        return candidates
+
+
+    """
+    This function returns the indices, in the insertion order, of the items within the radius of a location (strictly closer
+    than the radius, if strict is True). The distance is computed the same way as Robot.compute_distance does.
+    """
+    def query_radius(self, location, radius, strict = False):
+        neighbors = []
+        for index in self.query_candidates(location, radius):
+            other_location = self.locations[index]
+            distance = sqrt((location[0] - other_location[0]) ** 2 + (location[1] - other_location[1]) ** 2)
+            if distance < radius or (not strict and distance == radius):
+                neighbors.append(index)
+        return neighbors
+
+
+    """
+    This function returns the index of the nearest item to a location, or None if the grid is empty. Among equally near items,
+    the earliest inserted one is returned, the same as the first minimum of a scan over the items in the insertion order. The
+    cells are visited in square rings around the cell of the location until no unvisited item may be as near as the nearest one.
+    """
+    def query_nearest(self, location):
+        column, row = self.cell_of(location)
+        margin = self.cell_size * 1e-9 + 1e-12
+        nearest_distance, nearest_index = float("inf"), None
+        number_of_unvisited_items = len(self.items)
+        ring = 0
+        while number_of_unvisited_items > 0:
+            for cell in ring_of_cells(column, row, ring):
+                for index in self.cells.get(cell, ()):
+                    number_of_unvisited_items -= 1
+                    other_location = self.locations[index]
+                    distance = sqrt((location[0] - other_location[0]) ** 2 + (location[1] - other_location[1]) ** 2)
+                    if distance < nearest_distance or (distance == nearest_distance and index < nearest_index):
+                        nearest_distance, nearest_index = distance, index
+            # the items outside of the rings visited so far are at least ring*cell_size away from the location
+            if nearest_distance < ring * self.cell_size - margin:
+                break
+            ring += 1
+        return nearest_index
+
+
+"""
+This function yields the keys of the cells on the square ring of the given radius (in cells) around a cell.
+"""
+def ring_of_cells(column, row, ring):
+    if ring == 0:
+        yield column, row
+        return
+    for i in range(-ring, ring + 1):
+        yield column + i, row - ring
+        yield column + i, row + ring
+    for i in range(-ring + 1, ring):
+        yield column - ring, row + i
+        yield column + ring, row + i
+
+
+"""
+This function builds a uniform grid of the robots of a network, in the order of the network, whose cells are as large as the
+given radius.
+"""
+def build_uniform_grid_of_robot_network(robot_network, radius):
+    uniform_grid = UniformGrid(radius)
+    for robot in robot_network:
+        uniform_grid.insert(robot.location, robot)
+    return uniform_grid
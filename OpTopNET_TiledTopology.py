@@ -0,0 +1,251 @@
+"""
+This file provides a large-scale mode of the topology synthesis for fields of thousands of robots, whose exact backbone cycle
+may not be searched. The field is partitioned into square tiles of about robots_per_tile robots each, and the backbone cycle
+of the graph of the reliable links inside each tile is searched (in parallel, by a pool of processes, if asked to). The tile
+cycles are then stitched into one backbone cycle through the boundary robots of the tiles: starting from the longest tile
+cycle, a tile cycle is merged into the backbone cycle whenever two consecutive robots of the backbone cycle have reliable links
+to two consecutive robots of the tile cycle, which replaces the two links between them by the two links across. Finally, each
+orphan robot which has reliable links to two consecutive robots of the backbone cycle is inserted between them, and the
+clusters of the orphan robots are assigned by the same rules as synthesize_cycle_topology_for_robot_network() does.
+
+The backbone cycle is a cycle of the graph of the reliable links, so the topology is a valid one, but it may be shorter than
+the exact backbone cycle. compare_with_exact_synthesis() reports the gap on the networks small enough to be solved exactly.
+"""
+
+import multiprocessing
+from math import ceil, sqrt
+
+import numpy as np
+
+import OpTopNET_DataGenerator as data_generator
+from OpTopNET_CycleFinder import NoCycleError, find_the_backbone_cycle_within_budget
+from OpTopNET_Graph import AdjacencyGraph, build_adjacency_graph_of_robot_network
+from OpTopNET_Instrumentation import instrumentation
+
+
+"""
+This function partitions the robots of a network into square tiles of about robots_per_tile robots each over the bounding box
+of their locations, and returns the tiles as lists of robots in the order of the network.
+"""
+def partition_robot_network_into_tiles(robot_network, robots_per_tile = 20):
+    locations = np.asarray([robot.location for robot in robot_network], dtype=float).reshape(-1, 2)
+    if len(locations) == 0:
+        return []
+    tiles_per_side = max(ceil(sqrt(len(locations) / robots_per_tile)), 1)
+    origin = locations.min(axis=0)
+    tile_size = max(float((locations.max(axis=0) - origin).max()) / tiles_per_side, np.finfo(float).tiny)
+    tile_keys = np.minimum(((locations - origin) / tile_size).astype(int), tiles_per_side - 1)
+    tiles = {}
+    for robot, (column, row) in zip(robot_network, tile_keys.tolist()):
+        tiles.setdefault((column, row), []).append(robot)
+    return [tiles[key] for key in sorted(tiles)]
+
+
+"""
+This function searches the backbone cycle of a tile, given the reliable links between its robots, within the budget (see
+find_the_backbone_cycle_within_budget()). It returns the cycle, empty if the tile does not have any, and whether it is proven
+longest.
+"""
+def find_the_backbone_cycle_of_tile(links_and_budget):
+    links, time_budget, node_budget = links_and_budget
+    if not links:
+        return [], True
+    backbone_cycle_search = find_the_backbone_cycle_within_budget(AdjacencyGraph(links), time_budget, node_budget)
+    return backbone_cycle_search.best_cycle, backbone_cycle_search.proven_optimal
+
+
+"""
+This function returns the reliable links between the robots of a tile, in the order of the network, the same as
+build_adjacency_graph_of_robot_network() collects for a whole network.
+"""
+def get_links_of_tile(tile):
+    tile_ids = {robot.id for robot in tile}
+    return [[robot.id, peer] for robot in tile for peer in robot.reliable_id_set if peer in tile_ids]
+
+
+"""
+This function merges a tile cycle into the backbone cycle if two consecutive robots of each have reliable links across (see
+the top of this file), given the reliable sets of the robots by their ids, and returns the merged cycle, or None if they may
+not be merged.
+"""
+def merge_cycles(backbone_cycle, tile_cycle, reliable_sets_by_id):
+    backbone_positions = {id: position for position, id in enumerate(backbone_cycle)}
+    length = len(backbone_cycle)
+    for position, id1 in enumerate(tile_cycle):
+        id2 = tile_cycle[(position + 1) % len(tile_cycle)]
+        # the tile cycle from id2 around to id1
+        rotated_tile_cycle = tile_cycle[position + 1:] + tile_cycle[:position + 1]
+        for peer in reliable_sets_by_id[id1]:
+            if peer not in backbone_positions:
+                continue
+            peer_position = backbone_positions[peer]
+            for neighbor_position in ((peer_position + 1) % length, (peer_position - 1) % length):
+                if backbone_cycle[neighbor_position] not in reliable_sets_by_id[id2]:
+                    continue
+                # the backbone cycle from the neighbor of the peer around to the peer, followed by the tile cycle from id1
+                # around to id2
+                if neighbor_position == (peer_position + 1) % length:
+                    rotated_backbone_cycle = backbone_cycle[neighbor_position:] + backbone_cycle[:neighbor_position]
+                else:
+                    rotated_backbone_cycle = backbone_cycle[:peer_position][::-1] + backbone_cycle[peer_position:][::-1]
+                return rotated_backbone_cycle + rotated_tile_cycle[::-1]
+    return None
+
+
+"""
+This function inserts each orphan robot (in the order of the network) which has reliable links to two consecutive robots of the
+backbone cycle between them, and returns the number of the inserted robots.
+"""
+def insert_orphan_robots_into_cycle(robot_network, backbone_cycle):
+    backbone_id_set = set(backbone_cycle)
+    #next_ids maps each robot of the backbone cycle to the next one.
+    next_ids = {id: backbone_cycle[(position + 1) % len(backbone_cycle)] for position, id in enumerate(backbone_cycle)}
+    number_of_inserted_robots = 0
+    for robot in robot_network:
+        if robot.id in backbone_id_set:
+            continue
+        peers = [peer for peer in robot.reliable_id_set if peer in backbone_id_set]
+        peer_set = set(peers)
+        for peer in peers:
+            if next_ids[peer] in peer_set:
+                next_ids[robot.id], next_ids[peer] = next_ids[peer], robot.id
+                backbone_id_set.add(robot.id)
+                number_of_inserted_robots += 1
+                break
+    first_id = backbone_cycle[0]
+    backbone_cycle[:] = [first_id]
+    while next_ids[backbone_cycle[-1]] != first_id:
+        backbone_cycle.append(next_ids[backbone_cycle[-1]])
+    return number_of_inserted_robots
+
+
+"""
+This function computes the cycle topology of a (sorted) robot network whose reliable and critical sets have been set, the same
+way as synthesize_cycle_topology_for_robot_network() does, except that the backbone cycle is stitched from the backbone cycles
+of the tiles of the field (see the top of this file). The backbone cycle of each tile is searched within time_budget and
+node_budget, by number_of_workers processes. The proven_optimal of the topology is only True if the network fits into a single
+tile whose backbone cycle is proven longest and nothing was inserted into it. A NoCycleError is raised if no tile has any cycle.
+The orphan robots are assigned under the hyper-parameters of the given context.
+"""
+def synthesize_cycle_topology_by_tiles(robot_network, robots_per_tile = 20, time_budget = None, node_budget = None,
+                                       number_of_workers = 1, context = None):
+    context = data_generator.create_context(context)
+    cycle_topology = data_generator.CycleTopology([], [])
+
+    with instrumentation.time_stage("generate_backbone_cycle_links"):
+        backbone_cycle_links = build_adjacency_graph_of_robot_network(robot_network)
+        data_generator.update_degrees_of_robot_network(robot_network, backbone_cycle_links)
+
+    with instrumentation.time_stage("find_the_backbone_cycles_of_tiles"):
+        tiles = partition_robot_network_into_tiles(robot_network, robots_per_tile)
+        tasks = [(get_links_of_tile(tile), time_budget, node_budget) for tile in tiles]
+        if number_of_workers <= 1:
+            results = list(map(find_the_backbone_cycle_of_tile, tasks))
+        else:
+            with multiprocessing.Pool(number_of_workers, initializer=data_generator.initialize_worker,
+                                      initargs=(context.get_hyper_parameters(), instrumentation.enabled)) as pool:
+                results = pool.map(find_the_backbone_cycle_of_tile, tasks)
+        instrumentation.count("tiles", len(tiles))
+
+    with instrumentation.time_stage("stitch_the_backbone_cycles_of_tiles"):
+        tile_cycles = sorted((cycle for cycle, _ in results if cycle), key=len, reverse=True)
+        if not tile_cycles:
+            raise NoCycleError("no tile of the robot network has any cycle")
+        reliable_sets_by_id = {robot.id: set(robot.reliable_id_set) for robot in robot_network}
+        backbone_cycle = list(tile_cycles[0])
+        unmerged_cycles = tile_cycles[1:]
+        merged = True
+        while merged and unmerged_cycles:
+            merged = False
+            for tile_cycle in list(unmerged_cycles):
+                merged_cycle = merge_cycles(backbone_cycle, tile_cycle, reliable_sets_by_id)
+                if merged_cycle is not None:
+                    backbone_cycle = merged_cycle
+                    unmerged_cycles.remove(tile_cycle)
+                    merged = True
+        instrumentation.count("stitched_tile_cycles", len(tile_cycles) - 1 - len(unmerged_cycles))
+        number_of_inserted_robots = insert_orphan_robots_into_cycle(robot_network, backbone_cycle)
+        instrumentation.count("inserted_orphan_robots", number_of_inserted_robots)
+        cycle_topology.backbone_cycle = backbone_cycle
+        cycle_topology.proven_optimal = len(tiles) == 1 and results[0][1] and number_of_inserted_robots == 0
+
+    with instrumentation.time_stage("assign_orphan_robots"):
+        data_generator.assign_orphan_robots_to_clusters(robot_network, cycle_topology, context = context)
+    return cycle_topology
+
+
+"""
+This function builds the sorted network of the given locations (the i-th robot gets the id i + 1) with its reliable and critical
+sets under the hyper-parameters of the given context, which are computed through a uniform grid of the robots.
+"""
+def build_sorted_robot_network(locations, context = None):
+    context = data_generator.create_context(context)
+    context.reset_robot_ids()
+    robot_network = [data_generator.Robot(location, [], [], context = context)
+                     for location in np.asarray(locations, dtype=float).reshape(-1, 2).tolist()]
+    spatial_index = data_generator.build_uniform_grid_of_robot_network(
+        robot_network, data_generator.get_peer_radii(context)[1] or context.zone_range)
+    data_generator.set_reliable_and_critical_sets_of_robot_network(robot_network, spatial_index=spatial_index,
+                                                                   context=context)
+    return data_generator.sort_robot_network(robot_network)
+
+
+"""
+This function compares the tiled synthesis of a configuration with the exact one, and returns the lengths of both backbone
+cycles, the relative gap of the tiled one, and the fraction of the robots which are assigned to the same cluster by both. Both
+are synthesized under the hyper-parameters of the given context.
+"""
+def compare_with_exact_synthesis(locations, robots_per_tile = 20, time_budget = None, node_budget = None, context = None):
+    context = data_generator.create_context(context)
+    exact_cycle_topology = data_generator.synthesize_cycle_topology_for_robot_network(
+        build_sorted_robot_network(locations, context), context = context)
+    tiled_cycle_topology = synthesize_cycle_topology_by_tiles(
+        build_sorted_robot_network(locations, context), robots_per_tile, time_budget, node_budget, context = context)
+    exact_clusters = {id: cluster_id for id, cluster_id in exact_cycle_topology.clusters}
+    tiled_clusters = {id: cluster_id for id, cluster_id in tiled_cycle_topology.clusters}
+    exact_length, tiled_length = len(exact_cycle_topology.backbone_cycle), len(tiled_cycle_topology.backbone_cycle)
+    return {"exact_length": exact_length, "tiled_length": tiled_length, "gap": 1 - tiled_length / exact_length,
+            "cluster_agreement": sum(exact_clusters.get(id) == cluster_id for id, cluster_id in tiled_clusters.items()) /
+                                 max(len(exact_clusters), 1)}
+
+
+"""
+This function reports the gap between the tiled and the exact syntheses over number_of_configurations configurations drawn by
+create_robot_network() for each number of robots, i.e., the means and the maxima of the gaps, and the means of the cluster
+agreements. The configurations whose exact or tiled topology does not exist are skipped. The configurations are drawn from a
+context of their own, seeded by seed, with the hyper-parameters of the given context (those of the data generator by default).
+"""
+def report_the_gap_to_exact_synthesis(numbers_of_robots = [20, 24, 28], number_of_configurations = 20, robots_per_tile = 8,
+                                      seed = 2023, context = None):
+    context = data_generator.GenerationContext(data_generator.get_context(context).get_hyper_parameters(), seed)
+    report = {}
+    for number_of_robots_in_network in numbers_of_robots:
+        context.hyper_parameters["number_of_robots"] = number_of_robots_in_network
+        comparisons = []
+        for _ in range(number_of_configurations):
+            context.reset_robot_ids()
+            locations = [robot.location for robot in data_generator.create_robot_network(context = context)]
+            try:
+                comparisons.append(compare_with_exact_synthesis(locations, robots_per_tile, context = context))
+            except data_generator.no_cycle_topology_errors:
+                continue
+        gaps = [comparison["gap"] for comparison in comparisons]
+        report[number_of_robots_in_network] = {
+            "configurations": len(comparisons), "mean_gap": float(np.mean(gaps)) if gaps else None,
+            "maximum_gap": max(gaps) if gaps else None,
+            "mean_cluster_agreement": float(np.mean([comparison["cluster_agreement"] for comparison in comparisons]))
+                                      if comparisons else None}
+    return report
+
+
+###################################################################################################################
+###################################################################################################################
+###################################################################################################################
+
+"""
+Here is the main function of the tiled synthesis, which reports its gap to the exact synthesis.
+"""
+if __name__ == "__main__":
+
+    for number_of_robots, gap in report_the_gap_to_exact_synthesis().items():
+        print("{} robots: {}".format(number_of_robots, gap))